@@ -0,0 +1,119 @@
+import asyncio
+import gzip
+from functools import lru_cache
+from typing import Callable, Coroutine, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.responses import StreamingResponse
+
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, see the `compression` extra
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional, see the `compression` extra
+    zstandard = None
+
+# Preferred first when the client accepts several with the same weight
+SUPPORTED_ENCODINGS: Tuple[str, ...] = tuple(
+    encoding for encoding, available in (("zstd", zstandard), ("br", brotli), ("gzip", gzip)) if available
+)
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a response body with the configured level of `encoding`.
+
+    Args:
+        body (bytes): The response body.
+        encoding (str): One of `SUPPORTED_ENCODINGS`.
+
+    Returns:
+        bytes: The compressed body.
+    """
+    if encoding == "zstd":
+        # Compressors are not thread-safe, and compression may run in a worker thread
+        return zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compress(body)
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+@lru_cache(maxsize=128)
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the encoding for an `Accept-Encoding` header, highest weight first, then `SUPPORTED_ENCODINGS` order.
+
+    Clients send a handful of distinct headers, so the result is cached per header value.
+
+    Args:
+        accept_encoding (str): The header value, e.g. "gzip, deflate, br;q=0.9".
+
+    Returns:
+        Optional[str]: The encoding to use, None to send the body uncompressed.
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip()] = weight
+
+    wildcard = weights.get("*", 0.0)
+    candidates = [
+        (weights.get(encoding, wildcard), -preference, encoding)
+        for preference, encoding in enumerate(SUPPORTED_ENCODINGS)
+    ]
+    weight, _, encoding = max(candidates)
+    return encoding if weight > 0 else None
+
+
+class CompressedRoute(APIRoute):
+    """Route compressing large JSON responses with the best encoding the client accepts.
+
+    Only bodies of at least `COMPRESSION_MIN_SIZE` bytes are compressed; bodies of at least
+    `COMPRESSION_THREAD_MIN_SIZE` bytes are compressed in a worker thread, so the event loop
+    keeps serving other requests meanwhile.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[None, None, Response]]:
+        handler = super().get_route_handler()
+
+        async def compressed_handler(request: Request) -> Response:
+            response = await handler(request)
+            if not settings.COMPRESSION_ENABLED or isinstance(response, StreamingResponse):
+                return response
+
+            body = response.body
+            if (
+                len(body) < settings.COMPRESSION_MIN_SIZE
+                or "content-encoding" in response.headers
+                or not response.headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                return response
+
+            response.headers.append("Vary", "Accept-Encoding")
+            encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+            if encoding is None:
+                return response
+
+            if len(body) >= settings.COMPRESSION_THREAD_MIN_SIZE:
+                compressed = await asyncio.to_thread(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+
+            response.body = compressed
+            response.headers["Content-Encoding"] = encoding
+            response.headers["Content-Length"] = str(len(compressed))
+            return response
+
+        return compressed_handler
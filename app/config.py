@@ -1,4 +1,5 @@
 from datetime import timedelta
+from typing import Literal, Optional
 
 from pydantic import PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -15,14 +16,103 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
+    # Web server, see app/serve.py
+    WEB_HOST: str = "0.0.0.0"
+    WEB_PORT: int = 8000
+    WEB_WORKERS: int = 1
+    WEB_GRACEFUL_SHUTDOWN: int = 30  # Seconds to finish in-flight requests on shutdown
+    # Database pool
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800  # Seconds, -1 disables recycling
+    DB_POOL_PRE_PING: bool = True
+    DB_WARMUP_CONNECTIONS: int = 5  # Opened by every worker before it accepts requests
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # Per connection, asyncpg adaptation layer
+    DB_COMPILED_CACHE_SIZE: int = 1200  # SQLAlchemy compiled statements per engine
+    DB_DAO_STATEMENT_CACHE_SIZE: int = 500  # Pre-built DAO statements per process, see app/dao/base.py
+    DB_PGBOUNCER: bool = False  # Transaction pooling mode: disables server-side prepared statement caching
+    # Read replicas, JSON list of SQLAlchemy URLs; empty sends every query to the primary
+    DATABASE_REPLICA_URLS: list[str] = []
+    DB_REPLICA_RETRY_AFTER: float = 30  # Seconds a failed replica stays out of rotation
+    DB_READ_YOUR_WRITES_WINDOW: float = 5  # Seconds reads stay on the primary after a write
+    DB_PRIMARY_PIN_COOKIE: str = "task_tracker_db_pin"
+    # Archival of completed tasks
+    ARCHIVE_COMPLETED_AFTER: timedelta = timedelta(days=30)  # Since the last update of a completed task
+    ARCHIVE_BATCH_SIZE: int = 500
+    ARCHIVE_BATCH_PAUSE: float = 0.5  # Seconds between batches, keeps the primary responsive
+    ARCHIVE_MAX_BATCHES: int = 200  # Per run, the rest waits for the next run
+    ARCHIVE_INTERVAL: timedelta = timedelta(hours=1)
+    # Background jobs, see app/jobs
+    JOBS_CHUNK_SIZE: int = 1000
+    JOBS_CHUNK_PAUSE: float = 0.2  # Seconds between chunks
+    JOBS_STALE_AFTER: timedelta = timedelta(minutes=10)  # Running jobs without progress this long can be resumed
+    JOBS_VISIBILITY_TIMEOUT: timedelta = timedelta(hours=12)  # Unacknowledged jobs are redelivered after this
+    # Bulk task deletion, DELETE /tasks
+    TASKS_DELETE_BATCH_SIZE: int = 1000
+    TASKS_DELETE_MAX_ROWS: int = 10000  # Larger selections have to be deleted with "background": true
+    TASKS_DELETE_LOCKED_RETRIES: int = 3  # Passes over rows skipped because other requests held their locks
+    TASKS_DELETE_RETRY_PAUSE: float = 0.2  # Seconds before such a pass
+    # Online migrations, see app/migrations/helpers.py
+    MIGRATIONS_LOCK_TIMEOUT: str = "5s"  # DDL gives up instead of queueing traffic behind its lock
+    MIGRATIONS_BACKFILL_BATCH_SIZE: int = 5000
+    MIGRATIONS_BACKFILL_PAUSE: float = 0.1  # Seconds between backfill batches
+    # Response compression on the task routers, see app/compression.py
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # Bytes, smaller bodies are sent as is
+    COMPRESSION_THREAD_MIN_SIZE: int = 256 * 1024  # Bytes, larger bodies are compressed off the event loop
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    # Request instrumentation
+    SLOW_REQUEST_QUERIES: int = 20  # Log requests issuing more queries than this
+    SLOW_REQUEST_DB_TIME: float = 0.5  # Log requests spending more seconds than this in the database
+    REQUEST_QUERY_BUDGET: Optional[int] = None  # Fail requests issuing more queries, meant for tests
+    REQUEST_QUERY_BUDGETS: dict[str, int] = {}  # Per route overrides, e.g. {"GET /tasks/{task_id}": 3}
+    # Profiling, requests are profiled only with a valid signed X-Profile-Token header
+    PROFILING_ENABLED: bool = False
+    PROFILING_DIR: str = "profiles"
+    PROFILING_TOKEN_TIMER: timedelta = timedelta(minutes=10)
     # Redis
     REDIS_HOST: str
     REDIS_PORT: int
+    REDIS_RATE_LIMIT_DB: int = 1  # Kept apart from the Celery broker database
+    # Admission control, rate limits are per user: a burst of CAPACITY requests, refilled at REFILL_RATE per second
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_TASKS_LIST_CAPACITY: int = 5
+    RATE_LIMIT_TASKS_LIST_REFILL_RATE: float = 1
+    RATE_LIMIT_TASKS_SEARCH_CAPACITY: int = 10
+    RATE_LIMIT_TASKS_SEARCH_REFILL_RATE: float = 2
+    RATE_LIMIT_MY_TASKS_CAPACITY: int = 20
+    RATE_LIMIT_MY_TASKS_REFILL_RATE: float = 5
+    RATE_LIMIT_BREAKER_FAILURES: int = 3  # Consecutive Redis errors after which rate limiting is skipped
+    RATE_LIMIT_BREAKER_RESET: float = 10  # Seconds rate limiting stays skipped before Redis is tried again
+    LOAD_SHED_MAX_IN_FLIGHT: int = 500  # Requests per worker above which new ones get 503
+    LOAD_SHED_POOL_WAIT: float = 0.5  # Seconds of recent pool wait above which new requests get 503
+    LOAD_SHED_RETRY_AFTER: int = 1
     # SMTP
     SMTP_HOST: str
     SMTP_PORT: int
     SMTP_USER: str
-    SMTP_PASS: str
+    SMTP_PASS: str  # Empty skips login, e.g. for a local SMTP sink
+    SMTP_USE_TLS: bool = True  # Implicit TLS, as smtplib.SMTP_SSL
+    # Notifications, "celery" sends each email in a prefork task, "redis" queues them for app/services/mail_worker.py
+    NOTIFICATIONS_BACKEND: Literal["celery", "redis"] = "celery"
+    NOTIFICATIONS_REDIS_DB: int = 2
+    NOTIFICATIONS_QUEUE: str = "notifications:email"
+    NOTIFICATIONS_DEAD_LETTER_QUEUE: str = "notifications:email:dead"
+    MAIL_WORKER_ID: Optional[str] = None  # Names the worker's processing list, a new one per run by default
+    MAIL_WORKER_HEARTBEAT_INTERVAL: float = 10  # Seconds between heartbeats and checks for stale processing lists
+    MAIL_WORKER_HEARTBEAT_TTL: float = 60  # Seconds without a heartbeat after which a worker's jobs are requeued
+    MAIL_WORKER_BATCH_SIZE: int = 200  # Jobs taken from the queue at once
+    MAIL_WORKER_CONNECTIONS: int = 8  # Concurrent SMTP connections, each reused across messages
+    MAIL_WORKER_RETRIES: int = 3  # Attempts per message after the first one, then it goes to the dead letter queue
+    MAIL_WORKER_RETRY_BACKOFF: float = 0.5  # Seconds, doubled on every attempt
+    MAIL_WORKER_SMTP_TIMEOUT: float = 10
+    # Debug mail sink, emails are stored here instead of being sent when DEBUG is on
+    MAIL_SINK_PATH: str = "app/services/send_email/mock_mail/mail.sqlite3"
+    MAIL_SINK_BATCH_SIZE: int = 100
+    MAIL_SINK_FLUSH_INTERVAL: float = 0.5  # Seconds buffered emails wait at most before being written
     # Auth
     SECRET_KEY: str
     ALGORITHM: str
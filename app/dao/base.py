@@ -1,37 +1,109 @@
-from sqlalchemy import select, insert, delete, update
+from typing import Callable, Hashable, Sequence
 
+from sqlalchemy import select, insert, delete, update, any_, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import Executable
+from sqlalchemy.util import LRUCache
+
+from app.config import settings
 from app.database import async_session_maker
 
 
+class StatementCache:
+    """Pre-built DAO statements, keyed by DAO, method and the shape of the call.
+
+    Every value is a bind parameter, so a cached statement is reused as is for any values:
+    nothing is constructed per call, and each shape maps to one SQLAlchemy compiled cache
+    entry and one asyncpg prepared statement per connection.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._statements = LRUCache(capacity)
+
+    def get(self, key: Hashable, build: Callable[[], Executable]) -> Executable:
+        statement = self._statements.get(key)
+        if statement is None:
+            self.misses += 1
+            statement = self._statements[key] = build()
+        else:
+            self.hits += 1
+        return statement
+
+    def status(self) -> dict:
+        return {
+            "dao_statements": len(self._statements),
+            "dao_statements_capacity": self.capacity,
+            "dao_statement_hits": self.hits,
+            "dao_statement_misses": self.misses,
+        }
+
+
+statement_cache = StatementCache(settings.DB_DAO_STATEMENT_CACHE_SIZE)
+
+
 class BaseDAO:
     model = None
 
+    @staticmethod
+    def _list_filter(column, values: list):
+        # Integer lists are sent as one array parameter: `= ANY($1)` keeps the SQL identical
+        # for any number of values, unlike an expanded `IN ($1, $2, ...)`
+        if isinstance(column.type, Integer):
+            return column == any_(bindparam(None, values, type_=ARRAY(column.type)))
+        return column.in_(values)
+
+    @staticmethod
+    def _bind_filter(column, name: str, value):
+        # Same rules as `_list_filter`, with the value left to a named bind parameter
+        if value is None:
+            return column.is_(None)
+        if isinstance(value, list):
+            if isinstance(column.type, Integer):
+                return column == any_(bindparam(name, type_=ARRAY(column.type)))
+            return column.in_(bindparam(name, expanding=True))
+        return column == bindparam(name)
+
     @classmethod
-    async def find_all(cls, **filter_by):
-        async with async_session_maker() as session:
-            base = select(cls.model)
+    def _filtered_select(cls, method: str, options: Sequence, filter_by: dict) -> Executable:
+        filters = sorted(filter_by.items())
+        shape = tuple((key, value is None, isinstance(value, list)) for key, value in filters)
+        options = tuple(options)
+
+        def build():
+            conditions = [cls._bind_filter(getattr(cls.model, key), key, value) for key, value in filters]
+            return select(cls.model).options(*options).where(*conditions)
 
-            for key, value in filter_by.items():
-                if isinstance(value, list):
-                    base = base.filter(getattr(cls.model, key).in_(value))
-                else:
-                    base = base.filter_by(**{key: value})
+        return statement_cache.get((cls, method, options, shape), build)
 
-            result = await session.execute(base)
+    @staticmethod
+    def _bind_values(filter_by: dict) -> dict:
+        return {key: value for key, value in filter_by.items() if value is not None}
+
+    @classmethod
+    async def find_all(cls, options: Sequence = (), **filter_by):
+        async with async_session_maker() as session:
+            query = cls._filtered_select("find_all", options, filter_by)
+            result = await session.execute(query, cls._bind_values(filter_by))
             return result.scalars().all()
 
     @classmethod
     async def find_one_or_none(cls, **filter_by):
         async with async_session_maker() as session:
-            query = select(cls.model).filter_by(**filter_by)
-            result = await session.execute(query)
+            query = cls._filtered_select("find_one_or_none", (), filter_by)
+            result = await session.execute(query, cls._bind_values(filter_by))
             return result.scalar_one_or_none()
 
     @classmethod
     async def find_by_id(cls, model_id: int):
         async with async_session_maker() as session:
-            query = select(cls.model).filter_by(id=model_id)
-            result = await session.execute(query)
+            query = statement_cache.get(
+                (cls, "find_by_id"),
+                lambda: select(cls.model).where(cls.model.id == bindparam("model_id"))
+            )
+            result = await session.execute(query, {"model_id": model_id})
             return result.scalar_one_or_none()
 
     @classmethod
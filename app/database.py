@@ -1,13 +1,335 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Callable, List, Optional
+from uuid import uuid4
+
+from sqlalchemy import Engine, Select, event, text
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
 
 DATABASE_URL = str(settings.db_url)
 
-engine = create_async_engine(DATABASE_URL)
 
-async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+class PoolWaitStats:
+    """Time spent waiting for a pooled connection, shared by all engines of the process."""
+
+    # Weight of the latest checkout in the recent wait average
+    RECENT_WEIGHT = 0.2
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent_wait = 0.0
+        self.waiting = 0
+        # Called on every checkout timeout, e.g. by the Prometheus counter
+        self.timeout_listeners: List[Callable[[], None]] = []
+
+    def is_congested(self, threshold: float) -> bool:
+        """Whether checkouts are queueing right now and recently waited longer than `threshold` seconds."""
+        return self.waiting > 0 and self.recent_wait > threshold
+
+    def record(self, wait: float, timed_out: bool = False):
+        self.checkouts += 1
+        self.timeouts += timed_out
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.recent_wait += (wait - self.recent_wait) * self.RECENT_WEIGHT
+        if timed_out:
+            for listener in self.timeout_listeners:
+                listener()
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+class CompiledCacheStats:
+    """Lookups of the SQLAlchemy compiled statement cache made by this process."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    def record(self, cache_hit):
+        if cache_hit == CACHE_HIT:
+            self.hits += 1
+        elif cache_hit == CACHE_MISS:
+            self.misses += 1
+        else:
+            self.uncached += 1
+
+
+compiled_cache_stats = CompiledCacheStats()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_compiled_cache(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        compiled_cache_stats.record(getattr(context, "cache_hit", None))
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waits for a free connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        pool_wait_stats.waiting += 1
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        finally:
+            pool_wait_stats.waiting -= 1
+        pool_wait_stats.record(time.perf_counter() - start)
+        return connection
+
+
+def get_engine_options() -> dict:
+    """Build the engine keyword arguments from the pool settings.
+
+    Returns:
+        dict: Keyword arguments for `create_async_engine`.
+    """
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "query_cache_size": settings.DB_COMPILED_CACHE_SIZE,
+        "connect_args": {"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE},
+    }
+    if settings.DB_PGBOUNCER:
+        # PgBouncer in transaction mode may hand each transaction a different server connection,
+        # so named prepared statements must be unique and never reused from a cache
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return options
+
+
+class ReplicaSet:
+    """Round-robin over read replicas, skipping the ones that recently failed."""
+
+    def __init__(self):
+        self.engines: List[AsyncEngine] = []
+        self._next = 0
+        self._down_until = {}
+
+    def add(self, replica: AsyncEngine):
+        self.engines.append(replica)
+        event.listen(replica.sync_engine, "handle_error", self._on_error)
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def choose(self) -> Optional[AsyncEngine]:
+        """Return the next healthy replica, or None if all of them are out of rotation."""
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            replica = self.engines[self._next % len(self.engines)]
+            self._next += 1
+            if self._down_until.get(replica.sync_engine, 0) <= now:
+                return replica
+        return None
+
+    def mark_down(self, replica_engine):
+        self._down_until[replica_engine] = time.monotonic() + settings.DB_REPLICA_RETRY_AFTER
+
+    def mark_up(self, replica_engine):
+        self._down_until.pop(replica_engine, None)
+
+    def _on_error(self, context):
+        # Connection level failures (refused, reset, failed pre-ping) take the replica out of rotation
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(context.engine)
+
+    async def check(self):
+        """Probe every replica and update its health."""
+        for replica in self.engines:
+            try:
+                async with replica.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+            except Exception:
+                self.mark_down(replica.sync_engine)
+            else:
+                self.mark_up(replica.sync_engine)
+
+
+class PrimaryPin:
+    """Read-your-writes state: until when reads must go to the primary, and whether this context wrote."""
+
+    def __init__(self, until: float = 0.0):
+        self.until = until
+        self.wrote = False
+
+    @property
+    def active(self) -> bool:
+        return self.until > time.time()
+
+    def pin(self):
+        self.until = time.time() + settings.DB_READ_YOUR_WRITES_WINDOW
+        self.wrote = True
+
+
+# Set per request by `ReadYourWritesMiddleware`; other contexts (workers, scripts) get one on first write
+primary_pin: ContextVar[Optional[PrimaryPin]] = ContextVar("primary_pin", default=None)
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """Whether an error means the database could not be reached, rather than a failed statement."""
+    if isinstance(error, DBAPIError):
+        return error.connection_invalidated or isinstance(error.orig, (OSError, asyncio.TimeoutError))
+    return isinstance(error, (OSError, asyncio.TimeoutError))
+
+
+class RoutingSession(Session):
+    """
+    Session that sends plain SELECTs to a read replica and everything else to the primary.
+
+    A session reads from a single replica, chosen on its first read, so a query and its eager
+    loads see the same snapshot. Reads failing to reach the replica are retried on the primary.
+    After a write, reads of the same session and of any session in the same request
+    (or client, through the pin cookie) stay on the primary for the read-your-writes window.
+    """
+
+    _wrote = False
+    _replica: Optional[AsyncEngine] = None
+    _replica_failed = False
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        is_read = isinstance(clause, Select) and clause._for_update_arg is None and not self._flushing
+        if not is_read:
+            self._wrote = True
+            pin = primary_pin.get()
+            if pin is None:
+                pin = PrimaryPin()
+                primary_pin.set(pin)
+            pin.pin()
+            return get_engine().sync_engine
+
+        pin = primary_pin.get()
+        if not replica_set or self._wrote or self._replica_failed or (pin is not None and pin.active):
+            return get_engine().sync_engine
+
+        if self._replica is None:
+            self._replica = replica_set.choose()
+        return (self._replica or get_engine()).sync_engine
+
+    def execute(self, statement, *args, **kw):
+        try:
+            return super().execute(statement, *args, **kw)
+        except Exception as e:
+            if self._replica is None or self._replica_failed or not is_connection_error(e):
+                raise
+            replica_set.mark_down(self._replica.sync_engine)
+            self._replica_failed = True
+        return super().execute(statement, *args, **kw)
+
+
+# Created by `init_engines`, from the app lifespan or on first use, so importing the app stays cheap
+engine: Optional[AsyncEngine] = None
+
+replica_set = ReplicaSet()
+
+
+def init_engines() -> AsyncEngine:
+    """Create the primary and replica engines once per process.
+
+    Returns:
+        AsyncEngine: The primary engine.
+    """
+    global engine
+    if engine is None:
+        engine = create_async_engine(DATABASE_URL, **get_engine_options())
+        for url in settings.DATABASE_REPLICA_URLS:
+            replica_set.add(create_async_engine(url, **get_engine_options()))
+    return engine
+
+
+def get_engine() -> AsyncEngine:
+    """Return the primary engine, creating the engines if needed."""
+    return engine or init_engines()
+
+
+# Sessions get their connections from `RoutingSession.get_bind`, so no engine is bound here
+async_session_maker = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False
+)
+
+
+async def warm_up_pool(db_engine: AsyncEngine, connections: int):
+    """Open `connections` pooled connections at once so the first requests don't pay for connecting.
+
+    Args:
+        db_engine (AsyncEngine): The engine whose pool is warmed up.
+        connections (int): Number of connections to open, capped by the pool size.
+    """
+    connections = min(connections, db_engine.pool.size())
+    opened = await asyncio.gather(*(db_engine.connect().start() for _ in range(connections)))
+    try:
+        await asyncio.gather(*(connection.execute(text("SELECT 1")) for connection in opened))
+    finally:
+        await asyncio.gather(*(connection.close() for connection in opened))
+
+
+async def dispose_engines():
+    """Close the pooled connections of the primary and replica engines."""
+    if engine is None:
+        return
+    await asyncio.gather(engine.dispose(), *(replica.dispose() for replica in replica_set.engines))
+
+
+def get_pool_status() -> dict:
+    """Snapshot of the primary engine pool and checkout wait times.
+
+    Returns:
+        dict: Pool size, checked-out, idle and overflow connections and wait statistics.
+    """
+    pool = get_engine().pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checkouts": pool_wait_stats.checkouts,
+        "timeouts": pool_wait_stats.timeouts,
+        "wait_time_avg": pool_wait_stats.total_wait / pool_wait_stats.checkouts if pool_wait_stats.checkouts else 0.0,
+        "wait_time_max": pool_wait_stats.max_wait,
+        "wait_time_recent": pool_wait_stats.recent_wait,
+    }
+
+
+def get_compiled_cache_status() -> dict:
+    """Snapshot of the compiled statement cache of the primary engine and the prepared statement setup.
+
+    Returns:
+        dict: Cache size, capacity, hits, misses and the per-connection prepared statement cache size.
+    """
+    compiled_cache = get_engine().sync_engine._compiled_cache
+    return {
+        "compiled_cache_size": len(compiled_cache) if compiled_cache is not None else 0,
+        "compiled_cache_capacity": settings.DB_COMPILED_CACHE_SIZE,
+        "compiled_cache_hits": compiled_cache_stats.hits,
+        "compiled_cache_misses": compiled_cache_stats.misses,
+        "compiled_cache_uncached": compiled_cache_stats.uncached,
+        "prepared_statement_cache_size": 0 if settings.DB_PGBOUNCER else settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    }
 
 
 class Base(DeclarativeBase):
@@ -65,3 +65,37 @@ TaskCreationFailedException = HTTPException(
     status_code=status.HTTP_400_BAD_REQUEST,
     detail="Failed to create task"
 )
+
+InvalidFieldsException = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Unknown task fields requested"
+)
+
+TooManyTasksToDeleteException = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Too many tasks match, delete them with background: true"
+)
+
+
+# Jobs
+JobNotFoundException = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND,
+    detail="Job not found"
+)
+
+JobNotResumableException = HTTPException(
+    status_code=status.HTTP_409_CONFLICT,
+    detail="Job not found, already succeeded, still running or still queued"
+)
+
+
+# Load
+TooManyRequestsException = HTTPException(
+    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+    detail="Too many requests"
+)
+
+ServiceOverloadedException = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Service is overloaded, retry later"
+)
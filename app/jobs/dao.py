@@ -0,0 +1,172 @@
+from datetime import timedelta
+from typing import Any, Optional
+
+from sqlalchemy import insert, update, func, and_, or_
+
+from app.dao.base import BaseDAO
+from app.database import async_session_maker
+from app.jobs.models import Jobs, JobStatus
+
+
+class JobsDAO(BaseDAO):
+    model = Jobs
+
+    @classmethod
+    async def create_job(cls, kind: str, params: dict, created_by_id: Optional[int] = None) -> Jobs:
+        """
+        Records a new pending job.
+
+        Args:
+            kind (str): The registered handler name.
+            params (dict): JSON parameters of the handler.
+            created_by_id (Optional[int]): ID of the user who requested the job.
+
+        Returns:
+            The created job.
+        """
+        async with async_session_maker() as session:
+            query = (
+                insert(cls.model)
+                .values(kind=kind, params=params, created_by_id=created_by_id, status=JobStatus.PENDING)
+                .returning(cls.model)
+            )
+            job = (await session.execute(query)).scalar_one()
+            await session.commit()
+            return job
+
+    @classmethod
+    async def start_job(cls, job_id: int, stale_after: timedelta) -> Optional[Jobs]:
+        """
+        Claims a pending job, marking it as running and counting the attempt.
+
+        The claim is a single conditional UPDATE, so of two deliveries of the same job only one runs it.
+        A running job is only taken over once it has gone `stale_after` without saving progress, i.e. its
+        worker was lost, and then resumes from its checkpoint.
+
+        Args:
+            job_id (int): ID of the job.
+            stale_after (timedelta): How long a running job may go without saving progress.
+
+        Returns:
+            The job with its checkpoint, or None if it does not exist, has finished or is running elsewhere.
+        """
+        async with async_session_maker() as session:
+            query = (
+                update(cls.model)
+                .where(
+                    cls.model.id == job_id,
+                    or_(
+                        cls.model.status == JobStatus.PENDING,
+                        and_(cls.model.status == JobStatus.RUNNING, cls.model.updated_at < func.now() - stale_after)
+                    )
+                )
+                .values(
+                    status=JobStatus.RUNNING,
+                    attempts=cls.model.attempts + 1,
+                    started_at=func.coalesce(cls.model.started_at, func.now()),
+                    error=None
+                )
+                .returning(cls.model)
+            )
+            job = (await session.execute(query)).scalar_one_or_none()
+            await session.commit()
+            return job
+
+    @classmethod
+    async def save_progress(
+            cls,
+            job_id: int,
+            processed: int,
+            checkpoint: Optional[dict] = None,
+            total: Optional[int] = None
+    ):
+        """
+        Saves the progress of a running job and the checkpoint the next chunk starts from.
+
+        Args:
+            job_id (int): ID of the job.
+            processed (int): Number of items processed so far.
+            checkpoint (Optional[dict]): Handler state to resume from.
+            total (Optional[int]): Number of items to process, if known.
+        """
+        values = {"processed": processed, "checkpoint": checkpoint}
+        if total is not None:
+            values["total"] = total
+        async with async_session_maker() as session:
+            await session.execute(update(cls.model).where(cls.model.id == job_id).values(**values))
+            await session.commit()
+
+    @classmethod
+    async def finish_job(cls, job_id: int, processed: int, result: Any = None):
+        """
+        Marks a job as succeeded.
+
+        Args:
+            job_id (int): ID of the job.
+            processed (int): Number of items processed.
+            result (Any): JSON result of the handler.
+        """
+        async with async_session_maker() as session:
+            await session.execute(
+                update(cls.model)
+                .where(cls.model.id == job_id)
+                .values(
+                    status=JobStatus.SUCCEEDED,
+                    processed=processed,
+                    result=result,
+                    checkpoint=None,
+                    finished_at=func.now()
+                )
+            )
+            await session.commit()
+
+    @classmethod
+    async def fail_job(cls, job_id: int, error: str):
+        """
+        Marks a job as failed, keeping its checkpoint so it can be resumed.
+
+        Args:
+            job_id (int): ID of the job.
+            error (str): Description of the error.
+        """
+        async with async_session_maker() as session:
+            await session.execute(
+                update(cls.model)
+                .where(cls.model.id == job_id)
+                .values(status=JobStatus.FAILED, error=error, finished_at=func.now())
+            )
+            await session.commit()
+
+    @classmethod
+    async def reset_job(cls, job_id: int, stale_after: timedelta) -> Optional[Jobs]:
+        """
+        Puts a failed job, or a running or pending one without progress for `stale_after`, back to pending.
+
+        A job stays pending when queueing it failed or its message was lost, so it is queued again too.
+
+        Args:
+            job_id (int): ID of the job.
+            stale_after (timedelta): How long a running or pending job may go without progress.
+
+        Returns:
+            The job, or None if it does not exist or is not resumable.
+        """
+        async with async_session_maker() as session:
+            query = (
+                update(cls.model)
+                .where(
+                    cls.model.id == job_id,
+                    or_(
+                        cls.model.status == JobStatus.FAILED,
+                        and_(
+                            cls.model.status.in_([JobStatus.RUNNING, JobStatus.PENDING]),
+                            cls.model.updated_at < func.now() - stale_after
+                        )
+                    )
+                )
+                .values(status=JobStatus.PENDING, finished_at=None)
+                .returning(cls.model)
+            )
+            job = (await session.execute(query)).scalar_one_or_none()
+            await session.commit()
+            return job
@@ -0,0 +1,122 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Type
+
+from pydantic import BaseModel
+
+from app.config import settings
+from app.jobs.schemas import SJobTasksArchive, SJobTasksBulkStatusUpdate
+from app.tasks.dao import TasksDAO
+from app.tasks.schemas import STasksSelection
+
+
+class JobChunk:
+    """Outcome of one chunk: items processed, the checkpoint to resume from and whether the job is done."""
+
+    __slots__ = ("processed", "checkpoint", "done")
+
+    def __init__(self, processed: int, checkpoint: Optional[dict] = None, done: bool = False):
+        self.processed = processed
+        self.checkpoint = checkpoint
+        self.done = done
+
+
+class JobHandler:
+    """A kind of background job, processed chunk by chunk.
+
+    Every chunk runs in its own transaction and the runner saves the returned checkpoint after it,
+    so chunks must be idempotent: a chunk interrupted before its checkpoint was saved runs again.
+    """
+
+    kind: str
+    params_schema: Type[BaseModel]
+
+    def parse_params(self, params: dict) -> BaseModel:
+        return self.params_schema.model_validate(params)
+
+    async def count(self, params: BaseModel) -> Optional[int]:
+        """Number of items the job will process, None if unknown."""
+        return None
+
+    async def run_chunk(self, params: BaseModel, checkpoint: Optional[dict]) -> JobChunk:
+        raise NotImplementedError
+
+    def result(self, processed: int, checkpoint: Optional[dict]) -> Any:
+        """The job result, from the items processed and the last checkpoint."""
+        return {"processed": processed}
+
+
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def register_job_handler(handler_class: Type[JobHandler]) -> Type[JobHandler]:
+    """Class decorator adding a handler to the registry under its `kind`."""
+    JOB_HANDLERS[handler_class.kind] = handler_class()
+    return handler_class
+
+
+@register_job_handler
+class TasksBulkDeleteHandler(JobHandler):
+    kind = "tasks.bulk_delete"
+    params_schema = STasksSelection
+
+    async def count(self, params: STasksSelection) -> Optional[int]:
+        return await TasksDAO.count_tasks(**params.criteria())
+
+    async def run_chunk(self, params: STasksSelection, checkpoint: Optional[dict]) -> JobChunk:
+        # Deleted rows are gone, so the next chunk simply takes the next matching ones
+        retries = (checkpoint or {}).get("locked_retries", 0)
+        deleted = await TasksDAO.delete_tasks_batch(settings.TASKS_DELETE_BATCH_SIZE, **params.criteria())
+        if deleted:
+            return JobChunk(deleted, {"locked_retries": retries})
+
+        # Batches skip locked rows, so matches left behind get passes like in `TasksDAO.delete_tasks_in_batches`
+        remaining = await TasksDAO.count_tasks(**params.criteria())
+        if not remaining or retries >= settings.TASKS_DELETE_LOCKED_RETRIES:
+            return JobChunk(0, {"locked_retries": retries, "remaining": remaining}, done=True)
+        await asyncio.sleep(settings.TASKS_DELETE_RETRY_PAUSE)
+        return JobChunk(0, {"locked_retries": retries + 1})
+
+    def result(self, processed: int, checkpoint: Optional[dict]) -> Any:
+        return {"deleted": processed, "remaining": (checkpoint or {}).get("remaining", 0)}
+
+
+@register_job_handler
+class TasksBulkStatusUpdateHandler(JobHandler):
+    kind = "tasks.bulk_status_update"
+    params_schema = SJobTasksBulkStatusUpdate
+
+    async def count(self, params: SJobTasksBulkStatusUpdate) -> Optional[int]:
+        return await TasksDAO.count_tasks(**params.criteria())
+
+    async def run_chunk(self, params: SJobTasksBulkStatusUpdate, checkpoint: Optional[dict]) -> JobChunk:
+        task_ids = await TasksDAO.update_status_batch(
+            params.new_status,
+            settings.JOBS_CHUNK_SIZE,
+            after_id=(checkpoint or {}).get("last_id", 0),
+            **params.criteria()
+        )
+        if not task_ids:
+            return JobChunk(0, checkpoint, done=True)
+        return JobChunk(len(task_ids), {"last_id": task_ids[-1]})
+
+    def result(self, processed: int, checkpoint: Optional[dict]) -> Any:
+        return {"updated": processed}
+
+
+@register_job_handler
+class TasksArchiveHandler(JobHandler):
+    kind = "tasks.archive"
+    params_schema = SJobTasksArchive
+
+    async def run_chunk(self, params: SJobTasksArchive, checkpoint: Optional[dict]) -> JobChunk:
+        completed_before = params.completed_before or datetime.now(timezone.utc) - settings.ARCHIVE_COMPLETED_AFTER
+        moved = await TasksDAO.archive_completed_batch(completed_before, settings.ARCHIVE_BATCH_SIZE)
+        return JobChunk(moved, done=moved < settings.ARCHIVE_BATCH_SIZE)
+
+    def result(self, processed: int, checkpoint: Optional[dict]) -> Any:
+        return {"archived": processed}
+
+
+def get_job_handler(kind: str) -> JobHandler:
+    return JOB_HANDLERS[kind]
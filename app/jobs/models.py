@@ -0,0 +1,40 @@
+import enum
+
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Index, DateTime, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.database import Base
+
+
+class JobStatus(str, enum.Enum):
+    PENDING = "Pending"
+    RUNNING = "Running"
+    SUCCEEDED = "Succeeded"
+    FAILED = "Failed"
+
+
+class Jobs(Base):
+    """A background job run in chunks by a Celery worker, see app/jobs/runner.py."""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.PENDING)
+    params = Column(JSONB, nullable=False, default=dict)
+    # Progress, saved after every chunk together with the checkpoint the next chunk resumes from
+    processed = Column(Integer, nullable=False, default=0)
+    total = Column(Integer)
+    checkpoint = Column(JSONB)
+    result = Column(JSONB)
+    error = Column(String)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_by_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index('idx_jobs_status_created_at', 'status', 'created_at'),
+    )
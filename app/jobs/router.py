@@ -0,0 +1,126 @@
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, status
+
+from app.config import settings
+from app.exceptions import JobNotFoundException, JobNotResumableException
+from app.jobs.dao import JobsDAO
+from app.jobs.handlers import TasksArchiveHandler, TasksBulkDeleteHandler, TasksBulkStatusUpdateHandler
+from app.jobs.runner import enqueue_job, queue_job
+from app.jobs.schemas import SJobCreated, SJobResponse, SJobTasksArchive, SJobTasksBulkStatusUpdate
+from app.tasks.schemas import STasksSelection
+from app.users.dependencies import get_current_pm_user
+from app.users.models import Users
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["Jobs"]
+)
+
+
+@router.post("/tasks/bulk-delete", response_model=SJobCreated, status_code=status.HTTP_202_ACCEPTED)
+async def create_tasks_bulk_delete_job(
+    selection: STasksSelection,
+    user: Users = Depends(get_current_pm_user)
+):
+    """
+    Queue the deletion of tasks selected by IDs and/or filters.
+
+    Args:
+        selection (STasksSelection): The task IDs and filters, combined with AND.
+        user (Users): The current PM user.
+
+    Returns:
+        SJobCreated: The queued job, poll it with `GET /jobs/{job_id}`.
+    """
+    return await enqueue_job(TasksBulkDeleteHandler.kind, selection.model_dump(mode="json"), user.id)
+
+
+@router.post("/tasks/bulk-status-update", response_model=SJobCreated, status_code=status.HTTP_202_ACCEPTED)
+async def create_tasks_bulk_status_update_job(
+    update_schema: SJobTasksBulkStatusUpdate,
+    user: Users = Depends(get_current_pm_user)
+):
+    """
+    Queue a status change of tasks selected by IDs and/or filters.
+
+    Status change emails are not sent for bulk updates.
+
+    Args:
+        update_schema (SJobTasksBulkStatusUpdate): The task IDs and filters and the new status.
+        user (Users): The current PM user.
+
+    Returns:
+        SJobCreated: The queued job, poll it with `GET /jobs/{job_id}`.
+    """
+    return await enqueue_job(TasksBulkStatusUpdateHandler.kind, update_schema.model_dump(mode="json"), user.id)
+
+
+@router.post("/tasks/archive", response_model=SJobCreated, status_code=status.HTTP_202_ACCEPTED)
+async def create_tasks_archive_job(
+    archive_schema: SJobTasksArchive,
+    user: Users = Depends(get_current_pm_user)
+):
+    """
+    Queue the archival of completed tasks, by default those not updated for `ARCHIVE_COMPLETED_AFTER`.
+
+    Args:
+        archive_schema (SJobTasksArchive): The moment completed tasks must have been last updated before.
+        user (Users): The current PM user.
+
+    Returns:
+        SJobCreated: The queued job, poll it with `GET /jobs/{job_id}`.
+    """
+    if archive_schema.completed_before is None:
+        # Fixed at enqueue time, so every chunk and every resume uses the same cut-off
+        archive_schema.completed_before = datetime.now(timezone.utc) - settings.ARCHIVE_COMPLETED_AFTER
+    return await enqueue_job(TasksArchiveHandler.kind, archive_schema.model_dump(mode="json"), user.id)
+
+
+@router.get("/{job_id}", response_model=SJobResponse)
+async def get_job(
+    job_id: int,
+    user: Users = Depends(get_current_pm_user)
+):
+    """
+    Retrieve the state and progress of a job.
+
+    Args:
+        job_id (int): The ID of the job.
+        user (Users): The current PM user.
+
+    Returns:
+        SJobResponse: The job with its status, progress and result.
+
+    Raises:
+        JobNotFoundException: If the job does not exist.
+    """
+    job = await JobsDAO.find_by_id(job_id)
+    if job is None:
+        raise JobNotFoundException
+    return job
+
+
+@router.post("/{job_id}/resume", response_model=SJobCreated, status_code=status.HTTP_202_ACCEPTED)
+async def resume_job(
+    job_id: int,
+    user: Users = Depends(get_current_pm_user)
+):
+    """
+    Queue a failed job, or a running or pending one that stopped making progress, again from its last checkpoint.
+
+    Args:
+        job_id (int): The ID of the job.
+        user (Users): The current PM user.
+
+    Returns:
+        SJobCreated: The queued job.
+
+    Raises:
+        JobNotResumableException: If the job does not exist, has succeeded or is still running or queued.
+    """
+    job = await JobsDAO.reset_job(job_id, settings.JOBS_STALE_AFTER)
+    if job is None:
+        raise JobNotResumableException
+    queue_job(job.id)
+    return job
@@ -0,0 +1,82 @@
+"""
+Background jobs: recorded in the `jobs` table and run chunk by chunk by Celery workers.
+
+The background work of the app (jobs, archival, notifications) follows the same rules:
+
+- Celery and the other worker-only dependencies are imported on first use, in the functions queueing
+  the work, so importing the API doesn't pay for them.
+- Bulk writes are split into short transactions with pauses between them, which keep lock times and
+  replication lag low.
+- Celery tasks run their coroutine with `asyncio.run` and dispose of the engines before returning,
+  as the pooled connections belong to the event loop `asyncio.run` closes.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from app.config import settings
+from app.jobs.dao import JobsDAO
+from app.jobs.handlers import get_job_handler
+from app.jobs.models import Jobs
+
+logger = logging.getLogger(__name__)
+
+
+async def enqueue_job(kind: str, params: dict, created_by_id: Optional[int] = None) -> Jobs:
+    """Record a job and queue it for a Celery worker.
+
+    Args:
+        kind (str): The registered handler name.
+        params (dict): JSON parameters of the handler.
+        created_by_id (Optional[int]): ID of the user who requested the job.
+
+    Returns:
+        Jobs: The pending job.
+    """
+    job = await JobsDAO.create_job(kind, params, created_by_id)
+    queue_job(job.id)
+    return job
+
+
+def queue_job(job_id: int):
+    from app.jobs.tasks import run_job
+
+    run_job.delay(job_id)
+
+
+async def run_job_chunks(job_id: int):
+    """Run a job chunk by chunk from its last checkpoint, saving progress after every chunk.
+
+    Args:
+        job_id (int): ID of the job.
+
+    Raises:
+        Exception: Whatever the handler raised, after the job has been marked as failed.
+    """
+    job = await JobsDAO.start_job(job_id, settings.JOBS_STALE_AFTER)
+    if job is None:
+        logger.info("Job %s not found, already finished or running in another worker", job_id)
+        return
+
+    handler = get_job_handler(job.kind)
+    params = handler.parse_params(job.params)
+    processed, checkpoint = job.processed, job.checkpoint
+    try:
+        if job.total is None:
+            total = await handler.count(params)
+            if total is not None:
+                await JobsDAO.save_progress(job_id, processed, checkpoint, total=total)
+
+        while True:
+            chunk = await handler.run_chunk(params, checkpoint)
+            processed += chunk.processed
+            checkpoint = chunk.checkpoint
+            if chunk.done:
+                await JobsDAO.finish_job(job_id, processed, handler.result(processed, checkpoint))
+                return
+            await JobsDAO.save_progress(job_id, processed, checkpoint)
+            await asyncio.sleep(settings.JOBS_CHUNK_PAUSE)
+    except Exception as e:
+        logger.exception("Job %s (%s) failed after %d items", job_id, job.kind, processed)
+        await JobsDAO.fail_job(job_id, repr(e))
+        raise
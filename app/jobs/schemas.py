@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from app.jobs.models import JobStatus
+from app.tasks.models import TaskStatus
+from app.tasks.schemas import STasksSelection
+
+
+class SJobResponse(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    params: dict
+    processed: int
+    total: Optional[int]
+    result: Optional[Any]
+    error: Optional[str]
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class SJobCreated(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+
+    class Config:
+        from_attributes = True
+
+
+class SJobTasksBulkStatusUpdate(STasksSelection):
+    new_status: TaskStatus
+
+
+class SJobTasksArchive(BaseModel):
+    completed_before: Optional[datetime] = None
@@ -0,0 +1,24 @@
+import asyncio
+
+from app.database import dispose_engines
+from app.jobs.runner import run_job_chunks
+from app.services.celery_app import celery
+
+
+@celery.task(acks_late=True, reject_on_worker_lost=True)
+def run_job(job_id: int):
+    """Celery task running a background job.
+
+    The message is acknowledged only once the job has finished, so a job interrupted by a lost
+    worker is delivered again and resumes from its last checkpoint.
+
+    Args:
+        job_id (int): ID of the job.
+    """
+    async def run():
+        try:
+            await run_job_chunks(job_id)
+        finally:
+            await dispose_engines()
+
+    asyncio.run(run())
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI
+from sqlalchemy.orm import configure_mappers
+
+from app.config import settings
+from app.database import dispose_engines, init_engines, replica_set, warm_up_pool
+from app.services.redis_client import close_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up_database():
+    """Open pool connections and compile the hot statements into the SQLAlchemy cache."""
+    from app.tasks.dao import TasksDAO
+    from app.users.dao import UsersDAO
+
+    configure_mappers()
+    engine = init_engines()
+    primary_result, *replica_results = await asyncio.gather(
+        warm_up_pool(engine, settings.DB_WARMUP_CONNECTIONS),
+        *(warm_up_pool(replica, settings.DB_WARMUP_CONNECTIONS) for replica in replica_set.engines),
+        return_exceptions=True
+    )
+    if isinstance(primary_result, BaseException):
+        raise primary_result
+    # An unreachable replica only leaves the rotation, reads go to the others or the primary until it's back
+    for replica, result in zip(replica_set.engines, replica_results):
+        if isinstance(result, BaseException):
+            logger.warning("Replica %s warm-up failed, out of rotation: %s", replica.url, result)
+            replica_set.mark_down(replica.sync_engine)
+    # Lookups of a missing id still compile and prepare the statements real requests use
+    await UsersDAO.find_by_id(0)
+    await TasksDAO.find_by_id(0)
+    await TasksDAO.find_task_by_id_join_performers(0)
+
+
+def warm_up_broker():
+    """Connect the Celery producer pool to Redis."""
+    from app.services.celery_app import celery
+
+    with celery.producer_pool.acquire(block=True) as producer:
+        producer.connection.ensure_connection(max_retries=3)
+
+
+async def check_replicas_periodically():
+    while True:
+        await asyncio.sleep(settings.DB_REPLICA_RETRY_AFTER)
+        await replica_set.check()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm up the worker before it reports ready and release its connections on shutdown.
+
+    Warm-up creates the database engines, opens pool connections, prepares the hot DAO statements, connects
+    to the Celery broker and the rate limiter Redis and builds the OpenAPI schema, so the first requests after a
+    deploy don't see cold-start latency.
+    """
+    await warm_up_database()
+    try:
+        await asyncio.to_thread(warm_up_broker)
+    except Exception as e:
+        # Notifications retry on their own, a broker hiccup must not keep the API down
+        logger.warning("Celery broker warm-up failed: %s", e)
+    try:
+        await get_redis().ping()
+    except Exception as e:
+        logger.warning("Rate limiter Redis warm-up failed: %s", e)
+    app.openapi()
+
+    replica_checks = asyncio.create_task(check_replicas_periodically()) if replica_set else None
+    try:
+        yield
+    finally:
+        if replica_checks:
+            replica_checks.cancel()
+            with suppress(asyncio.CancelledError):
+                await replica_checks
+        await close_redis()
+        await dispose_engines()
@@ -1,13 +1,49 @@
 import uvicorn
 from fastapi import FastAPI
+from app.config import settings
+from app.lifespan import lifespan
+from app.request_body import add_request_body_schemas
+from app.middleware import (
+    ReadYourWritesMiddleware,
+    QueryStatsMiddleware,
+    LoadSheddingMiddleware,
+    PrometheusMiddleware,
+    ProfilingMiddleware
+)
+from app.jobs.router import router as router_jobs
+from app.monitoring.router import router as router_monitoring, metrics_router as router_metrics
 from app.tasks.router import router as router_tasks
-from app.users.router import router as router_users
+from app.users.router import router as router_users, me_router as router_users_me
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(LoadSheddingMiddleware)
+app.add_middleware(PrometheusMiddleware)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
 
 app.include_router(router_tasks)
 app.include_router(router_users)
+app.include_router(router_users_me)
+app.include_router(router_jobs)
+app.include_router(router_monitoring)
+app.include_router(router_metrics)
+
+
+default_openapi = app.openapi
+
+
+def openapi() -> dict:
+    # Write endpoints parse their bodies with form_or_json, their schemas are added separately
+    if app.openapi_schema is None:
+        add_request_body_schemas(default_openapi())
+    return app.openapi_schema
+
+
+app.openapi = openapi
 
 
 if __name__ == '__main__':
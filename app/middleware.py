@@ -0,0 +1,223 @@
+import math
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.database import PrimaryPin, pool_wait_stats, primary_pin
+from app.exceptions import ServiceOverloadedException
+from app.monitoring.metrics import (
+    LOAD_SHED_REQUESTS,
+    REQUEST_LATENCY,
+    REQUESTS_IN_FLIGHT,
+    REQUESTS_TOTAL
+)
+from app.monitoring.profiling import PROFILE_HEADER, RequestProfiler, verify_profile_token
+from app.monitoring.queries import QueryBudgetExceeded, RequestQueryStats, log_slow_request, request_query_stats
+
+
+class ReadYourWritesMiddleware:
+    """
+    Keeps a client's reads on the primary database for a short window after it wrote.
+
+    The pin lives in a context variable for the request and in a cookie holding its expiry,
+    so the client's next requests also read their own writes while replicas catch up.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        pin = PrimaryPin(until=self._read_pin_cookie(scope))
+        token = primary_pin.set(pin)
+
+        async def send_with_pin_cookie(message: Message):
+            if message["type"] == "http.response.start" and pin.wrote:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{settings.DB_PRIMARY_PIN_COOKIE}={pin.until:.3f}; "
+                    f"Max-Age={math.ceil(settings.DB_READ_YOUR_WRITES_WINDOW)}; Path=/; HttpOnly; SameSite=lax"
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_pin_cookie)
+        finally:
+            primary_pin.reset(token)
+
+    @staticmethod
+    def _read_pin_cookie(scope: Scope) -> float:
+        value = HTTPConnection(scope).cookies.get(settings.DB_PRIMARY_PIN_COOKIE)
+        try:
+            until = float(value) if value else 0.0
+        except ValueError:
+            return 0.0
+        if not math.isfinite(until):
+            return 0.0
+        # The client controls the cookie: it can't pin itself to the primary for longer than one window
+        return min(until, time.time() + settings.DB_READ_YOUR_WRITES_WINDOW)
+
+
+def route_name(scope: Scope) -> str:
+    """Method and path template of the matched route, e.g. `GET /tasks/{task_id}`."""
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route else scope['path']}"
+
+
+class QueryStatsMiddleware:
+    """
+    Counts queries, pool checkouts and database time per request.
+
+    Reports them in a `Server-Timing` header, logs requests crossing the slow thresholds
+    and, when a query budget is configured, fails requests that exceed it.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = request_query_stats.set(stats)
+
+        async def send_with_server_timing(message: Message):
+            if message["type"] == "http.response.start":
+                self._check_budget(scope, stats)
+                MutableHeaders(scope=message).append("server-timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            request_query_stats.reset(token)
+            log_slow_request(route_name(scope), stats, settings.SLOW_REQUEST_QUERIES, settings.SLOW_REQUEST_DB_TIME)
+
+    @staticmethod
+    def _check_budget(scope: Scope, stats: RequestQueryStats):
+        route = route_name(scope)
+        budget = settings.REQUEST_QUERY_BUDGETS.get(route, settings.REQUEST_QUERY_BUDGET)
+        if budget is not None and stats.queries > budget:
+            raise QueryBudgetExceeded(f"{route} issued {stats.queries} queries, budget is {budget}")
+
+
+class PrometheusMiddleware:
+    """Records request latency, status codes and in-flight requests per route template."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # Unmatched paths share one label so random URLs can't blow up the series count
+            route = scope["route"].path if "route" in scope else "<unmatched>"
+            REQUEST_LATENCY.labels(scope["method"], route).observe(time.perf_counter() - start)
+            REQUESTS_TOTAL.labels(scope["method"], route, status_code).inc()
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests carrying a valid `X-Profile-Token` header and saves the result to `PROFILING_DIR`.
+
+    Only added to the app when `PROFILING_ENABLED` is set, so it costs nothing otherwise.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._header = PROFILE_HEADER.encode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        token = None
+        if scope["type"] == "http":
+            token = next((value for name, value in scope["headers"] if name == self._header), None)
+
+        if token is None or not await verify_profile_token(token.decode("latin-1"), scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = None
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        profiler = RequestProfiler()
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            profiler.stop()
+            profiler.save(scope, status_code, time.perf_counter() - start)
+
+
+class LoadSheddingMiddleware:
+    """
+    Rejects new requests with 503 and `Retry-After` while the worker is overloaded.
+
+    Overload means too many requests in flight, or checkouts queueing on the database pool
+    with a recent wait above `LOAD_SHED_POOL_WAIT`. Shedding early keeps tail latency
+    bounded for the requests already admitted.
+    """
+
+    EXEMPT_PATHS = ("/metrics",)
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.in_flight = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        reason = None
+        if self.in_flight >= settings.LOAD_SHED_MAX_IN_FLIGHT:
+            reason = "in_flight"
+        elif pool_wait_stats.is_congested(settings.LOAD_SHED_POOL_WAIT):
+            reason = "pool_wait"
+
+        if reason:
+            LOAD_SHED_REQUESTS.labels(reason).inc()
+            response = JSONResponse(
+                {"detail": ServiceOverloadedException.detail},
+                status_code=ServiceOverloadedException.status_code,
+                headers={"Retry-After": str(settings.LOAD_SHED_RETRY_AFTER)}
+            )
+            await response(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
@@ -6,8 +6,11 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
+from alembic.operations import Operations
 
 from app.database import Base, DATABASE_URL
+from app.jobs.models import *
+from app.migrations.helpers import get_lock_timeout, is_dry_run, logger as helpers_logger, uses_helpers
 from app.tasks.models import *
 from app.users.models import *
 
@@ -62,6 +65,33 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def run_dry_run(connection) -> None:
+    """Estimate the pending upgrades with `-x dry_run=true`, changing nothing.
+
+    Only revisions using app/migrations/helpers.py are run, their helpers report instead of executing;
+    the session is read-only, so DDL or writes they issue outside the helpers fail instead of running.
+    Other revisions, and the version table, are left alone and listed as not estimated.
+    """
+    migration_context = context.get_context()
+    not_estimated = []
+    with connection.begin() as transaction, Operations.context(migration_context):
+        revisions = context.script.iterate_revisions(
+            context.get_revision_argument(), migration_context.get_current_heads()
+        )
+        for revision in reversed(list(revisions)):
+            if not uses_helpers(revision.module):
+                not_estimated.append(revision)
+                continue
+            helpers_logger.info("[dry run] %s, %s", revision.revision, revision.doc)
+            revision.module.upgrade()
+        transaction.rollback()
+
+    for revision in not_estimated:
+        helpers_logger.warning(
+            "[dry run] Not estimated, does not use the helpers: %s, %s", revision.revision, revision.doc
+        )
+
+
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode.
 
@@ -69,10 +99,18 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    server_settings = {
+        # Statements waiting for a lock fail after this, instead of queueing the app's queries behind them
+        "lock_timeout": get_lock_timeout(),
+    }
+    if is_dry_run():
+        server_settings["default_transaction_read_only"] = "on"
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
+        connect_args={"server_settings": server_settings},
     )
 
     with connectable.connect() as connection:
@@ -80,6 +118,10 @@ def run_migrations_online() -> None:
             connection=connection, target_metadata=target_metadata
         )
 
+        if is_dry_run():
+            run_dry_run(connection)
+            return
+
         with context.begin_transaction():
             context.run_migrations()
 
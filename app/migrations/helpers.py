@@ -0,0 +1,390 @@
+"""
+Helpers for schema changes that run while the service takes traffic.
+
+Indexes are built with `CREATE INDEX CONCURRENTLY` outside the migration transaction, and data is
+backfilled in small committed batches that resume where an interrupted run stopped. Every session
+of `alembic` runs with `lock_timeout`, so a statement waiting for a lock fails instead of queueing
+the application's queries behind it.
+
+Usage in a revision:
+    from app.migrations.helpers import batched_backfill, create_index_concurrently
+
+Options, passed with `-x`:
+    alembic -x dry_run=true upgrade head      # Report the locks each helper would take, change nothing
+    alembic -x lock_timeout=10s upgrade head  # Override MIGRATIONS_LOCK_TIMEOUT
+
+A dry run only runs the `upgrade()` of revisions that use these helpers, in a read-only session;
+the other revisions are listed as not estimated, see `uses_helpers`.
+"""
+import json
+import logging
+import math
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Dict, List, Optional, Sequence
+
+import sqlalchemy as sa
+from alembic import context, op
+
+from app.config import settings
+
+# Child of the "alembic" logger configured in alembic.ini, so it is printed along the migrations
+logger = logging.getLogger("alembic.helpers")
+
+BACKFILL_PROGRESS_TABLE = "alembic_backfill_progress"
+
+# Table lock modes and the modes they conflict with, as documented for explicit locking in Postgres
+LOCK_CONFLICTS: Dict[str, Sequence[str]] = {
+    "ACCESS SHARE": ("ACCESS EXCLUSIVE",),
+    "ROW SHARE": ("EXCLUSIVE", "ACCESS EXCLUSIVE"),
+    "ROW EXCLUSIVE": ("SHARE", "SHARE ROW EXCLUSIVE", "EXCLUSIVE", "ACCESS EXCLUSIVE"),
+    "SHARE UPDATE EXCLUSIVE": (
+        "SHARE UPDATE EXCLUSIVE", "SHARE", "SHARE ROW EXCLUSIVE", "EXCLUSIVE", "ACCESS EXCLUSIVE"
+    ),
+    "SHARE": ("ROW EXCLUSIVE", "SHARE UPDATE EXCLUSIVE", "SHARE ROW EXCLUSIVE", "EXCLUSIVE", "ACCESS EXCLUSIVE"),
+    "SHARE ROW EXCLUSIVE": (
+        "ROW EXCLUSIVE", "SHARE UPDATE EXCLUSIVE", "SHARE", "SHARE ROW EXCLUSIVE", "EXCLUSIVE", "ACCESS EXCLUSIVE"
+    ),
+    "EXCLUSIVE": (
+        "ROW SHARE", "ROW EXCLUSIVE", "SHARE UPDATE EXCLUSIVE", "SHARE", "SHARE ROW EXCLUSIVE", "EXCLUSIVE",
+        "ACCESS EXCLUSIVE"
+    ),
+    "ACCESS EXCLUSIVE": (
+        "ACCESS SHARE", "ROW SHARE", "ROW EXCLUSIVE", "SHARE UPDATE EXCLUSIVE", "SHARE", "SHARE ROW EXCLUSIVE",
+        "EXCLUSIVE", "ACCESS EXCLUSIVE"
+    ),
+}
+
+
+def _x_arguments() -> Dict[str, str]:
+    return context.get_x_argument(as_dictionary=True)
+
+
+def is_dry_run() -> bool:
+    """Return True if alembic was run with `-x dry_run=true`."""
+    return _x_arguments().get("dry_run", "").lower() in ("1", "true", "yes")
+
+
+def uses_helpers(module: ModuleType) -> bool:
+    """Return True if a revision module imports any of the helpers below.
+
+    Such a revision is expected to make all of its changes through them, so its `upgrade()` is safe
+    to run in a dry run; DDL or writes it issues otherwise fail in the read-only dry run session.
+
+    Args:
+        module (ModuleType): The revision module.
+    """
+    return any(
+        getattr(value, "__module__", None) == __name__ and callable(value)
+        for value in vars(module).values()
+    )
+
+
+def get_lock_timeout() -> str:
+    """Return the `lock_timeout` of migration sessions, `-x lock_timeout=...` or `MIGRATIONS_LOCK_TIMEOUT`."""
+    return _x_arguments().get("lock_timeout", settings.MIGRATIONS_LOCK_TIMEOUT)
+
+
+def _pg_lock_name(mode: str) -> str:
+    # "SHARE UPDATE EXCLUSIVE" -> "ShareUpdateExclusiveLock", as in pg_locks.mode
+    return "".join(word.capitalize() for word in mode.split()) + "Lock"
+
+
+def estimate_lock_impact(table: str, lock_mode: str) -> dict:
+    """Estimate what taking `lock_mode` on `table` would cost right now, without taking it.
+
+    Args:
+        table (str): The table name.
+        lock_mode (str): A table lock mode, one of `LOCK_CONFLICTS`.
+
+    Returns:
+        dict: `rows` (planner estimate) and `total_bytes` of the table, whether the lock `blocks_reads`
+        and `blocks_writes` of the application while held, the `conflicting_sessions` holding or awaiting
+        conflicting locks on the table, and the age in seconds of the `oldest_transaction`.
+    """
+    bind = op.get_bind()
+    conflicts = LOCK_CONFLICTS[lock_mode]
+
+    size = bind.execute(
+        sa.text(
+            "SELECT c.reltuples::bigint AS rows, pg_total_relation_size(c.oid) AS total_bytes "
+            "FROM pg_class c WHERE c.oid = to_regclass(:table)"
+        ),
+        {"table": table}
+    ).mappings().one_or_none()
+
+    sessions = bind.execute(
+        sa.text(
+            "SELECT a.pid, l.mode, l.granted, a.state, "
+            "extract(epoch FROM now() - a.xact_start)::int AS transaction_seconds, left(a.query, 120) AS query "
+            "FROM pg_locks l JOIN pg_stat_activity a ON a.pid = l.pid "
+            "WHERE l.relation = to_regclass(:table) AND l.mode = ANY(:modes) AND a.pid <> pg_backend_pid() "
+            "ORDER BY a.xact_start"
+        ),
+        {"table": table, "modes": [_pg_lock_name(mode) for mode in conflicts]}
+    ).mappings().all()
+
+    oldest_transaction = bind.execute(
+        sa.text(
+            "SELECT extract(epoch FROM max(now() - xact_start))::int FROM pg_stat_activity "
+            "WHERE xact_start IS NOT NULL AND pid <> pg_backend_pid()"
+        )
+    ).scalar()
+
+    return {
+        "rows": size["rows"] if size else None,
+        "total_bytes": size["total_bytes"] if size else None,
+        "blocks_reads": "ACCESS SHARE" in conflicts,
+        "blocks_writes": "ROW EXCLUSIVE" in conflicts,
+        "conflicting_sessions": [dict(session) for session in sessions],
+        "oldest_transaction": oldest_transaction,
+    }
+
+
+def report_lock_impact(operation: str, table: str, lock_mode: str, note: Optional[str] = None):
+    """Log what an operation would lock, for `-x dry_run=true`.
+
+    Args:
+        operation (str): Description of the operation, e.g. its SQL.
+        table (str): The table it locks.
+        lock_mode (str): The table lock mode it takes.
+        note (Optional[str]): Anything else worth knowing about the operation.
+    """
+    impact = estimate_lock_impact(table, lock_mode)
+    if impact["blocks_reads"]:
+        blocked = "reads and writes"
+    elif impact["blocks_writes"]:
+        blocked = "writes"
+    else:
+        blocked = "no queries of the application"
+
+    logger.info("[dry run] %s", operation)
+    if impact["rows"] is None:
+        logger.info("    %s does not exist yet", table)
+    else:
+        logger.info(
+            "    takes %s on %s (~%d rows, %.1f MB), blocking %s while held",
+            lock_mode, table, max(impact["rows"], 0), impact["total_bytes"] / 2 ** 20, blocked
+        )
+    for session in impact["conflicting_sessions"]:
+        logger.info(
+            "    waits for pid %d: %s %s, %s for %ss: %s",
+            session["pid"], session["mode"], "held" if session["granted"] else "awaited", session["state"],
+            session["transaction_seconds"], session["query"]
+        )
+    if impact["oldest_transaction"]:
+        logger.info("    oldest open transaction started %ds ago", impact["oldest_transaction"])
+    if note:
+        logger.info("    %s", note)
+
+
+def execute_ddl(statement: str, table: str, lock_mode: str = "ACCESS EXCLUSIVE"):
+    """Run a DDL statement in the migration transaction, or report its lock in a dry run.
+
+    Meant for statements that are quick once they hold their lock, e.g. adding a nullable column;
+    the session `lock_timeout` makes them fail rather than wait behind long transactions.
+
+    Args:
+        statement (str): The SQL statement.
+        table (str): The table it locks.
+        lock_mode (str): The table lock mode it takes, ACCESS EXCLUSIVE for most ALTER TABLE forms.
+    """
+    if is_dry_run():
+        report_lock_impact(statement, table, lock_mode)
+        return
+    op.execute(statement)
+
+
+@contextmanager
+def _without_lock_timeout():
+    # Concurrent index builds wait for every older transaction, not for the app's locks: they may wait long
+    op.execute("SET lock_timeout = 0")
+    try:
+        yield
+    finally:
+        op.execute(f"SET lock_timeout = '{get_lock_timeout()}'")
+
+
+def _index_is_invalid(name: str) -> bool:
+    return bool(op.get_bind().execute(
+        sa.text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": name}
+    ).scalar())
+
+
+def create_index_concurrently(
+        name: str,
+        table: str,
+        columns: List[str],
+        unique: bool = False,
+        **kw
+):
+    """Build an index with `CREATE INDEX CONCURRENTLY`, committing the migration transaction before.
+
+    The table stays readable and writable during the build, which waits without `lock_timeout` for
+    the transactions older than it. A build that failed earlier leaves an INVALID index behind, it is
+    dropped and built again; an existing valid index is kept.
+
+    Args:
+        name (str): The index name.
+        table (str): The table name.
+        columns (List[str]): The indexed columns or expressions.
+        unique (bool): Whether the index is unique.
+        **kw: Passed to `op.create_index`, e.g. `postgresql_where` or `postgresql_using`.
+    """
+    if is_dry_run():
+        report_lock_impact(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY {name} ON {table} ({', '.join(columns)})",
+            table,
+            "SHARE UPDATE EXCLUSIVE",
+            note="scans the table twice and waits for every transaction older than each scan"
+        )
+        return
+
+    with op.get_context().autocommit_block(), _without_lock_timeout():
+        if not context.is_offline_mode() and _index_is_invalid(name):
+            logger.warning("Dropping invalid index %s left by a failed build", name)
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        op.create_index(
+            name, table, columns, unique=unique, postgresql_concurrently=True, if_not_exists=True, **kw
+        )
+
+
+def drop_index_concurrently(name: str, table: str):
+    """Drop an index with `DROP INDEX CONCURRENTLY`, committing the migration transaction before.
+
+    Args:
+        name (str): The index name.
+        table (str): The table name.
+    """
+    if is_dry_run():
+        report_lock_impact(f"DROP INDEX CONCURRENTLY {name}", table, "SHARE UPDATE EXCLUSIVE")
+        return
+
+    with op.get_context().autocommit_block(), _without_lock_timeout():
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def batched_backfill(
+        name: str,
+        table: str,
+        set_clause: str,
+        where: Optional[str] = None,
+        key: str = "id",
+        batch_size: Optional[int] = None,
+        pause: Optional[float] = None
+) -> int:
+    """Update the rows of a table in batches of consecutive keys, each committed on its own.
+
+    Every batch locks only its rows, and commits with the last key it reached in
+    `alembic_backfill_progress`. An interrupted backfill, e.g. by `lock_timeout`, resumes after
+    that key on the next `alembic upgrade`; the progress row is removed once the backfill ends.
+    Online mode only.
+
+    Args:
+        name (str): Unique name of the backfill, e.g. "<revision>_<column>".
+        table (str): The table name.
+        set_clause (str): The SET clause, e.g. "version = 1"; the updated row is aliased `t`.
+        where (Optional[str]): Condition of the rows to update, e.g. "version IS NULL".
+        key (str): An integer, unique and indexed column, the primary key usually.
+        batch_size (Optional[int]): Rows per batch, `MIGRATIONS_BACKFILL_BATCH_SIZE` by default.
+        pause (Optional[float]): Seconds between batches, `MIGRATIONS_BACKFILL_PAUSE` by default.
+
+    Returns:
+        int: Number of rows updated by this run, 0 in a dry run.
+    """
+    batch_size = batch_size or settings.MIGRATIONS_BACKFILL_BATCH_SIZE
+    pause = settings.MIGRATIONS_BACKFILL_PAUSE if pause is None else pause
+    condition = f" AND ({where})" if where else ""
+    bind = op.get_bind()
+
+    if is_dry_run():
+        last_key = None
+        if bind.execute(sa.text("SELECT to_regclass(:table)"), {"table": BACKFILL_PROGRESS_TABLE}).scalar():
+            last_key = bind.execute(
+                sa.text(f"SELECT last_key FROM {BACKFILL_PROGRESS_TABLE} WHERE name = :name"), {"name": name}
+            ).scalar()
+        start = "" if last_key is None else f"{key} > {int(last_key)}"
+        filters = " AND ".join(part for part in (start, f"({where})" if where else "") if part)
+        plan = bind.execute(
+            sa.text(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {table}" + (f" WHERE {filters}" if filters else ""))
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        rows = plan[0]["Plan"]["Plan Rows"]
+        batches = math.ceil(rows / batch_size)
+        report_lock_impact(
+            f"UPDATE {table} SET {set_clause}" + (f" WHERE {where}" if where else "") + f" in batches of {batch_size}",
+            table,
+            "ROW EXCLUSIVE",
+            note=(
+                f"~{rows} rows left{f' after {key} {last_key}' if last_key is not None else ''}, {batches} batches, "
+                f"at least {batches * pause:.0f}s of pauses; each batch locks only its own rows"
+            )
+        )
+        return 0
+
+    statement = sa.text(f"""
+        WITH batch AS (
+            SELECT {key} AS batch_key FROM {table}
+            WHERE {key} > CAST(:last_key AS bigint){condition}
+            ORDER BY {key}
+            LIMIT :batch_size
+        ),
+        updated AS (
+            UPDATE {table} AS t SET {set_clause}
+            FROM batch
+            WHERE t.{key} = batch.batch_key
+            RETURNING t.{key} AS batch_key
+        )
+        INSERT INTO {BACKFILL_PROGRESS_TABLE} AS p (name, last_key, rows_done, updated_at)
+        SELECT :name, max(batch_key), count(*), now() FROM updated
+        HAVING count(*) > 0
+        ON CONFLICT (name) DO UPDATE SET
+            last_key = EXCLUDED.last_key,
+            rows_done = p.rows_done + EXCLUDED.rows_done,
+            updated_at = EXCLUDED.updated_at
+        RETURNING last_key, rows_done
+    """)
+
+    updated = 0
+    with op.get_context().autocommit_block():
+        # Step 1: Find where a previous run stopped
+        bind.execute(sa.text(f"""
+            CREATE TABLE IF NOT EXISTS {BACKFILL_PROGRESS_TABLE} (
+                name text PRIMARY KEY,
+                last_key bigint NOT NULL,
+                rows_done bigint NOT NULL,
+                updated_at timestamptz NOT NULL
+            )
+        """))
+        progress = bind.execute(
+            sa.text(f"SELECT last_key, rows_done FROM {BACKFILL_PROGRESS_TABLE} WHERE name = :name"),
+            {"name": name}
+        ).one_or_none()
+        last_key = progress.last_key if progress else -2 ** 63
+        done_before = progress.rows_done if progress else 0
+        if progress:
+            logger.info("Resuming backfill %s after %s %d, %d rows done", name, key, last_key, progress.rows_done)
+
+        # Step 2: Update one batch per statement; each commits its rows together with its progress
+        while True:
+            started = time.perf_counter()
+            row = bind.execute(statement, {"name": name, "last_key": last_key, "batch_size": batch_size}).one_or_none()
+            if row is None:
+                break
+            updated = row.rows_done - done_before
+            last_key = row.last_key
+            logger.info(
+                "Backfill %s: %d rows up to %s %d (%.3fs)", name, row.rows_done, key, last_key,
+                time.perf_counter() - started
+            )
+            if pause:
+                time.sleep(pause)
+
+        # Step 3: Done, a later run of the same revision starts over
+        bind.execute(sa.text(f"DELETE FROM {BACKFILL_PROGRESS_TABLE} WHERE name = :name"), {"name": name})
+
+    logger.info("Backfill %s finished, %d rows updated", name, updated)
+    return updated
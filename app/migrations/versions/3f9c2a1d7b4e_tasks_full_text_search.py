@@ -0,0 +1,39 @@
+"""Tasks full-text search
+
+Revision ID: 3f9c2a1d7b4e
+Revises: 7313a00c8ee0
+Create Date: 2024-10-02 11:12:45.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a1d7b4e'
+down_revision: Union[str, None] = '7313a00c8ee0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.add_column('tasks', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))", persisted=True),
+        nullable=True
+    ))
+    op.create_index('idx_tasks_search_vector', 'tasks', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index(
+        'idx_tasks_title_trgm', 'tasks', ['title'], unique=False,
+        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_tasks_title_trgm', table_name='tasks')
+    op.drop_index('idx_tasks_search_vector', table_name='tasks')
+    op.drop_column('tasks', 'search_vector')
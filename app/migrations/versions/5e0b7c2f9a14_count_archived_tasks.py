@@ -0,0 +1,161 @@
+"""Count archived tasks
+
+Revision ID: 5e0b7c2f9a14
+Revises: 8b2f6d0e4c37
+Create Date: 2024-10-21 09:41:17.392518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b7c2f9a14'
+down_revision: Union[str, None] = '8b2f6d0e4c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Archival deletes from `tasks`, which takes the task out of `task_stats` and `user_task_summary`;
+    # inserting it into the archive in the same transaction counts it again, so archived tasks stay done
+    op.execute("""
+        CREATE TRIGGER tasks_archive_stats_insert_delete
+        AFTER INSERT OR DELETE ON tasks_archive
+        FOR EACH ROW EXECUTE FUNCTION task_stats_apply()
+    """)
+
+    # As for `tasks`, deletes run BEFORE the row goes, while its performers can still be read
+    op.execute("""
+        CREATE FUNCTION user_task_summary_archive_apply() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM user_task_summary_add(NEW.responsible_user_id, false, NEW.status, 1);
+                RETURN NULL;
+            END IF;
+            PERFORM user_task_summary_add(OLD.responsible_user_id, false, OLD.status, -1);
+            PERFORM user_task_summary_add(tp.user_id, true, OLD.status, -1)
+            FROM task_performers_archive tp
+            WHERE tp.task_id = OLD.id;
+            RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_archive_user_summary_insert
+        AFTER INSERT ON tasks_archive
+        FOR EACH ROW EXECUTE FUNCTION user_task_summary_archive_apply()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_archive_user_summary_delete
+        BEFORE DELETE ON tasks_archive
+        FOR EACH ROW EXECUTE FUNCTION user_task_summary_archive_apply()
+    """)
+
+    op.execute("""
+        CREATE FUNCTION user_task_summary_archive_performers_apply() RETURNS trigger AS $$
+        DECLARE
+            task_status taskstatus;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                SELECT status INTO task_status FROM tasks_archive WHERE id = OLD.task_id;
+                IF FOUND THEN
+                    PERFORM user_task_summary_add(OLD.user_id, true, task_status, -1);
+                END IF;
+            ELSE
+                SELECT status INTO task_status FROM tasks_archive WHERE id = NEW.task_id;
+                IF FOUND THEN
+                    PERFORM user_task_summary_add(NEW.user_id, true, task_status, 1);
+                END IF;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER task_performers_archive_user_summary
+        AFTER INSERT OR DELETE ON task_performers_archive
+        FOR EACH ROW EXECUTE FUNCTION user_task_summary_archive_performers_apply()
+    """)
+
+    # Count the tasks archived so far, blocking archival (not the app) until the triggers take over
+    op.execute('LOCK TABLE tasks_archive, task_performers_archive IN SHARE MODE')
+    op.execute("""
+        INSERT INTO task_stats AS s (status, priority, responsible_user_id, tasks_count)
+        SELECT status, priority, responsible_user_id, count(*)
+        FROM tasks_archive
+        GROUP BY status, priority, responsible_user_id
+        ON CONFLICT (status, priority, responsible_user_id)
+        DO UPDATE SET tasks_count = s.tasks_count + EXCLUDED.tasks_count
+    """)
+    op.execute("""
+        INSERT INTO user_task_summary AS s (
+            user_id,
+            responsible_todo, responsible_in_progress, responsible_completed,
+            performer_todo, performer_in_progress, performer_completed
+        )
+        SELECT
+            user_id,
+            count(*) FILTER (WHERE NOT performer AND status = 'TODO'),
+            count(*) FILTER (WHERE NOT performer AND status = 'IN_PROGRESS'),
+            count(*) FILTER (WHERE NOT performer AND status = 'COMPLETED'),
+            count(*) FILTER (WHERE performer AND status = 'TODO'),
+            count(*) FILTER (WHERE performer AND status = 'IN_PROGRESS'),
+            count(*) FILTER (WHERE performer AND status = 'COMPLETED')
+        FROM (
+            SELECT responsible_user_id AS user_id, false AS performer, status FROM tasks_archive
+            UNION ALL
+            SELECT tp.user_id, true, t.status
+            FROM task_performers_archive tp
+            JOIN tasks_archive t ON t.id = tp.task_id
+        ) AS memberships
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET
+            responsible_todo = s.responsible_todo + EXCLUDED.responsible_todo,
+            responsible_in_progress = s.responsible_in_progress + EXCLUDED.responsible_in_progress,
+            responsible_completed = s.responsible_completed + EXCLUDED.responsible_completed,
+            performer_todo = s.performer_todo + EXCLUDED.performer_todo,
+            performer_in_progress = s.performer_in_progress + EXCLUDED.performer_in_progress,
+            performer_completed = s.performer_completed + EXCLUDED.performer_completed
+    """)
+
+
+def downgrade() -> None:
+    op.execute('LOCK TABLE tasks_archive, task_performers_archive IN SHARE MODE')
+    op.execute('DROP TRIGGER task_performers_archive_user_summary ON task_performers_archive')
+    op.execute('DROP TRIGGER tasks_archive_user_summary_delete ON tasks_archive')
+    op.execute('DROP TRIGGER tasks_archive_user_summary_insert ON tasks_archive')
+    op.execute('DROP TRIGGER tasks_archive_stats_insert_delete ON tasks_archive')
+    op.execute('DROP FUNCTION user_task_summary_archive_performers_apply()')
+    op.execute('DROP FUNCTION user_task_summary_archive_apply()')
+
+    # Take the archived tasks out of the counters again
+    op.execute("""
+        UPDATE task_stats s SET tasks_count = s.tasks_count - a.tasks_count
+        FROM (
+            SELECT status, priority, responsible_user_id, count(*) AS tasks_count
+            FROM tasks_archive
+            GROUP BY status, priority, responsible_user_id
+        ) AS a
+        WHERE s.status = a.status AND s.priority = a.priority AND s.responsible_user_id = a.responsible_user_id
+    """)
+    op.execute("""
+        UPDATE user_task_summary s SET
+            responsible_completed = s.responsible_completed - a.responsible_completed,
+            performer_completed = s.performer_completed - a.performer_completed
+        FROM (
+            SELECT
+                user_id,
+                count(*) FILTER (WHERE NOT performer) AS responsible_completed,
+                count(*) FILTER (WHERE performer) AS performer_completed
+            FROM (
+                SELECT responsible_user_id AS user_id, false AS performer FROM tasks_archive
+                UNION ALL
+                SELECT user_id, true FROM task_performers_archive
+            ) AS memberships
+            GROUP BY user_id
+        ) AS a
+        WHERE s.user_id = a.user_id
+    """)
@@ -0,0 +1,122 @@
+"""Summary decrements skip deleted users
+
+Revision ID: 8b2f6d0e4c37
+Revises: d7c41a9e5f28
+Create Date: 2024-10-21 08:52:30.184467
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2f6d0e4c37'
+down_revision: Union[str, None] = 'd7c41a9e5f28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Deleting a user cascades to their tasks before their summary row. From the second task on,
+    # the decrement updated a row this transaction had already changed, and Postgres checked its
+    # foreign key again against the deleted user. Decrements now leave rows of deleted users alone.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION user_task_summary_add(
+            p_user_id integer, p_performer boolean, p_status taskstatus, p_delta integer
+        ) RETURNS void AS $$
+        BEGIN
+            IF p_delta < 0 THEN
+                UPDATE user_task_summary SET
+                    responsible_todo = responsible_todo
+                        + CASE WHEN NOT p_performer AND p_status = 'TODO' THEN p_delta ELSE 0 END,
+                    responsible_in_progress = responsible_in_progress
+                        + CASE WHEN NOT p_performer AND p_status = 'IN_PROGRESS' THEN p_delta ELSE 0 END,
+                    responsible_completed = responsible_completed
+                        + CASE WHEN NOT p_performer AND p_status = 'COMPLETED' THEN p_delta ELSE 0 END,
+                    performer_todo = performer_todo
+                        + CASE WHEN p_performer AND p_status = 'TODO' THEN p_delta ELSE 0 END,
+                    performer_in_progress = performer_in_progress
+                        + CASE WHEN p_performer AND p_status = 'IN_PROGRESS' THEN p_delta ELSE 0 END,
+                    performer_completed = performer_completed
+                        + CASE WHEN p_performer AND p_status = 'COMPLETED' THEN p_delta ELSE 0 END
+                WHERE user_id = p_user_id
+                  AND EXISTS (SELECT 1 FROM users WHERE id = p_user_id);
+                RETURN;
+            END IF;
+
+            INSERT INTO user_task_summary AS s (
+                user_id,
+                responsible_todo, responsible_in_progress, responsible_completed,
+                performer_todo, performer_in_progress, performer_completed
+            )
+            VALUES (
+                p_user_id,
+                CASE WHEN NOT p_performer AND p_status = 'TODO' THEN p_delta ELSE 0 END,
+                CASE WHEN NOT p_performer AND p_status = 'IN_PROGRESS' THEN p_delta ELSE 0 END,
+                CASE WHEN NOT p_performer AND p_status = 'COMPLETED' THEN p_delta ELSE 0 END,
+                CASE WHEN p_performer AND p_status = 'TODO' THEN p_delta ELSE 0 END,
+                CASE WHEN p_performer AND p_status = 'IN_PROGRESS' THEN p_delta ELSE 0 END,
+                CASE WHEN p_performer AND p_status = 'COMPLETED' THEN p_delta ELSE 0 END
+            )
+            ON CONFLICT (user_id) DO UPDATE SET
+                responsible_todo = s.responsible_todo + EXCLUDED.responsible_todo,
+                responsible_in_progress = s.responsible_in_progress + EXCLUDED.responsible_in_progress,
+                responsible_completed = s.responsible_completed + EXCLUDED.responsible_completed,
+                performer_todo = s.performer_todo + EXCLUDED.performer_todo,
+                performer_in_progress = s.performer_in_progress + EXCLUDED.performer_in_progress,
+                performer_completed = s.performer_completed + EXCLUDED.performer_completed;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION user_task_summary_add(
+            p_user_id integer, p_performer boolean, p_status taskstatus, p_delta integer
+        ) RETURNS void AS $$
+        BEGIN
+            IF p_delta < 0 THEN
+                UPDATE user_task_summary SET
+                    responsible_todo = responsible_todo
+                        + CASE WHEN NOT p_performer AND p_status = 'TODO' THEN p_delta ELSE 0 END,
+                    responsible_in_progress = responsible_in_progress
+                        + CASE WHEN NOT p_performer AND p_status = 'IN_PROGRESS' THEN p_delta ELSE 0 END,
+                    responsible_completed = responsible_completed
+                        + CASE WHEN NOT p_performer AND p_status = 'COMPLETED' THEN p_delta ELSE 0 END,
+                    performer_todo = performer_todo
+                        + CASE WHEN p_performer AND p_status = 'TODO' THEN p_delta ELSE 0 END,
+                    performer_in_progress = performer_in_progress
+                        + CASE WHEN p_performer AND p_status = 'IN_PROGRESS' THEN p_delta ELSE 0 END,
+                    performer_completed = performer_completed
+                        + CASE WHEN p_performer AND p_status = 'COMPLETED' THEN p_delta ELSE 0 END
+                WHERE user_id = p_user_id;
+                RETURN;
+            END IF;
+
+            INSERT INTO user_task_summary AS s (
+                user_id,
+                responsible_todo, responsible_in_progress, responsible_completed,
+                performer_todo, performer_in_progress, performer_completed
+            )
+            VALUES (
+                p_user_id,
+                CASE WHEN NOT p_performer AND p_status = 'TODO' THEN p_delta ELSE 0 END,
+                CASE WHEN NOT p_performer AND p_status = 'IN_PROGRESS' THEN p_delta ELSE 0 END,
+                CASE WHEN NOT p_performer AND p_status = 'COMPLETED' THEN p_delta ELSE 0 END,
+                CASE WHEN p_performer AND p_status = 'TODO' THEN p_delta ELSE 0 END,
+                CASE WHEN p_performer AND p_status = 'IN_PROGRESS' THEN p_delta ELSE 0 END,
+                CASE WHEN p_performer AND p_status = 'COMPLETED' THEN p_delta ELSE 0 END
+            )
+            ON CONFLICT (user_id) DO UPDATE SET
+                responsible_todo = s.responsible_todo + EXCLUDED.responsible_todo,
+                responsible_in_progress = s.responsible_in_progress + EXCLUDED.responsible_in_progress,
+                responsible_completed = s.responsible_completed + EXCLUDED.responsible_completed,
+                performer_todo = s.performer_todo + EXCLUDED.performer_todo,
+                performer_in_progress = s.performer_in_progress + EXCLUDED.performer_in_progress,
+                performer_completed = s.performer_completed + EXCLUDED.performer_completed;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
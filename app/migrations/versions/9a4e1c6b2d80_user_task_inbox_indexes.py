@@ -0,0 +1,31 @@
+"""User task inbox indexes
+
+Revision ID: 9a4e1c6b2d80
+Revises: 3f9c2a1d7b4e
+Create Date: 2024-10-04 09:41:27.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4e1c6b2d80'
+down_revision: Union[str, None] = '3f9c2a1d7b4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_task_performers_user_id_task_id', 'task_performers', ['user_id', 'task_id'], unique=False)
+    op.create_index('idx_tasks_responsible_user_id_status', 'tasks', ['responsible_user_id', 'status'], unique=False)
+    # Covered by the leading column of idx_tasks_responsible_user_id_status
+    op.drop_index('ix_tasks_responsible_user_id', table_name='tasks')
+
+
+def downgrade() -> None:
+    op.create_index('ix_tasks_responsible_user_id', 'tasks', ['responsible_user_id'], unique=False)
+    op.drop_index('idx_tasks_responsible_user_id_status', table_name='tasks')
+    op.drop_index('idx_task_performers_user_id_task_id', table_name='task_performers')
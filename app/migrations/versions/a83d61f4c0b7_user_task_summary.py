@@ -0,0 +1,195 @@
+"""User task summary
+
+Revision ID: a83d61f4c0b7
+Revises: f1a7c3e9d205
+Create Date: 2024-10-18 11:46:09.873214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a83d61f4c0b7'
+down_revision: Union[str, None] = 'f1a7c3e9d205'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_task_summary',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('responsible_todo', sa.Integer(), nullable=False),
+    sa.Column('responsible_in_progress', sa.Integer(), nullable=False),
+    sa.Column('responsible_completed', sa.Integer(), nullable=False),
+    sa.Column('performer_todo', sa.Integer(), nullable=False),
+    sa.Column('performer_in_progress', sa.Integer(), nullable=False),
+    sa.Column('performer_completed', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Adds `delta` to one counter of a user. Only increments create the user's row: decrements
+    # also run in cascades from a deleted user, whose row may already be gone
+    op.execute("""
+        CREATE FUNCTION user_task_summary_add(
+            p_user_id integer, p_performer boolean, p_status taskstatus, p_delta integer
+        ) RETURNS void AS $$
+        BEGIN
+            IF p_delta < 0 THEN
+                UPDATE user_task_summary SET
+                    responsible_todo = responsible_todo
+                        + CASE WHEN NOT p_performer AND p_status = 'TODO' THEN p_delta ELSE 0 END,
+                    responsible_in_progress = responsible_in_progress
+                        + CASE WHEN NOT p_performer AND p_status = 'IN_PROGRESS' THEN p_delta ELSE 0 END,
+                    responsible_completed = responsible_completed
+                        + CASE WHEN NOT p_performer AND p_status = 'COMPLETED' THEN p_delta ELSE 0 END,
+                    performer_todo = performer_todo
+                        + CASE WHEN p_performer AND p_status = 'TODO' THEN p_delta ELSE 0 END,
+                    performer_in_progress = performer_in_progress
+                        + CASE WHEN p_performer AND p_status = 'IN_PROGRESS' THEN p_delta ELSE 0 END,
+                    performer_completed = performer_completed
+                        + CASE WHEN p_performer AND p_status = 'COMPLETED' THEN p_delta ELSE 0 END
+                WHERE user_id = p_user_id;
+                RETURN;
+            END IF;
+
+            INSERT INTO user_task_summary AS s (
+                user_id,
+                responsible_todo, responsible_in_progress, responsible_completed,
+                performer_todo, performer_in_progress, performer_completed
+            )
+            VALUES (
+                p_user_id,
+                CASE WHEN NOT p_performer AND p_status = 'TODO' THEN p_delta ELSE 0 END,
+                CASE WHEN NOT p_performer AND p_status = 'IN_PROGRESS' THEN p_delta ELSE 0 END,
+                CASE WHEN NOT p_performer AND p_status = 'COMPLETED' THEN p_delta ELSE 0 END,
+                CASE WHEN p_performer AND p_status = 'TODO' THEN p_delta ELSE 0 END,
+                CASE WHEN p_performer AND p_status = 'IN_PROGRESS' THEN p_delta ELSE 0 END,
+                CASE WHEN p_performer AND p_status = 'COMPLETED' THEN p_delta ELSE 0 END
+            )
+            ON CONFLICT (user_id) DO UPDATE SET
+                responsible_todo = s.responsible_todo + EXCLUDED.responsible_todo,
+                responsible_in_progress = s.responsible_in_progress + EXCLUDED.responsible_in_progress,
+                responsible_completed = s.responsible_completed + EXCLUDED.responsible_completed,
+                performer_todo = s.performer_todo + EXCLUDED.performer_todo,
+                performer_in_progress = s.performer_in_progress + EXCLUDED.performer_in_progress,
+                performer_completed = s.performer_completed + EXCLUDED.performer_completed;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Task writes move the responsible user's counters, and the performers' ones when the status changes.
+    # Deletes run BEFORE the row goes, while its performers can still be read; the cascade that
+    # removes them then finds no task and leaves the counters alone.
+    op.execute("""
+        CREATE FUNCTION user_task_summary_tasks_apply() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM user_task_summary_add(OLD.responsible_user_id, false, OLD.status, -1);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM user_task_summary_add(NEW.responsible_user_id, false, NEW.status, 1);
+            END IF;
+            IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.status IS DISTINCT FROM NEW.status) THEN
+                PERFORM user_task_summary_add(tp.user_id, true, OLD.status, -1)
+                FROM task_performers tp
+                WHERE tp.task_id = OLD.id AND tp.user_id IS NOT NULL;
+            END IF;
+            IF TG_OP = 'UPDATE' AND OLD.status IS DISTINCT FROM NEW.status THEN
+                PERFORM user_task_summary_add(tp.user_id, true, NEW.status, 1)
+                FROM task_performers tp
+                WHERE tp.task_id = NEW.id AND tp.user_id IS NOT NULL;
+            END IF;
+            IF TG_OP = 'DELETE' THEN
+                RETURN OLD;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_user_summary_insert
+        AFTER INSERT ON tasks
+        FOR EACH ROW EXECUTE FUNCTION user_task_summary_tasks_apply()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_user_summary_update
+        AFTER UPDATE OF status, responsible_user_id ON tasks
+        FOR EACH ROW
+        WHEN (OLD.status IS DISTINCT FROM NEW.status
+              OR OLD.responsible_user_id IS DISTINCT FROM NEW.responsible_user_id)
+        EXECUTE FUNCTION user_task_summary_tasks_apply()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_user_summary_delete
+        BEFORE DELETE ON tasks
+        FOR EACH ROW EXECUTE FUNCTION user_task_summary_tasks_apply()
+    """)
+
+    op.execute("""
+        CREATE FUNCTION user_task_summary_performers_apply() RETURNS trigger AS $$
+        DECLARE
+            task_status taskstatus;
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL THEN
+                SELECT status INTO task_status FROM tasks WHERE id = OLD.task_id;
+                IF FOUND THEN
+                    PERFORM user_task_summary_add(OLD.user_id, true, task_status, -1);
+                END IF;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL THEN
+                SELECT status INTO task_status FROM tasks WHERE id = NEW.task_id;
+                IF FOUND THEN
+                    PERFORM user_task_summary_add(NEW.user_id, true, task_status, 1);
+                END IF;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER task_performers_user_summary
+        AFTER INSERT OR UPDATE OR DELETE ON task_performers
+        FOR EACH ROW EXECUTE FUNCTION user_task_summary_performers_apply()
+    """)
+
+    # Backfill from the existing rows, blocking writers until the triggers take over
+    op.execute('LOCK TABLE tasks, task_performers IN SHARE ROW EXCLUSIVE MODE')
+    op.execute("""
+        INSERT INTO user_task_summary (
+            user_id,
+            responsible_todo, responsible_in_progress, responsible_completed,
+            performer_todo, performer_in_progress, performer_completed
+        )
+        SELECT
+            user_id,
+            count(*) FILTER (WHERE NOT performer AND status = 'TODO'),
+            count(*) FILTER (WHERE NOT performer AND status = 'IN_PROGRESS'),
+            count(*) FILTER (WHERE NOT performer AND status = 'COMPLETED'),
+            count(*) FILTER (WHERE performer AND status = 'TODO'),
+            count(*) FILTER (WHERE performer AND status = 'IN_PROGRESS'),
+            count(*) FILTER (WHERE performer AND status = 'COMPLETED')
+        FROM (
+            SELECT responsible_user_id AS user_id, false AS performer, status FROM tasks
+            UNION ALL
+            SELECT tp.user_id, true, t.status
+            FROM task_performers tp
+            JOIN tasks t ON t.id = tp.task_id
+            WHERE tp.user_id IS NOT NULL
+        ) AS memberships
+        GROUP BY user_id
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER task_performers_user_summary ON task_performers')
+    op.execute('DROP TRIGGER tasks_user_summary_delete ON tasks')
+    op.execute('DROP TRIGGER tasks_user_summary_update ON tasks')
+    op.execute('DROP TRIGGER tasks_user_summary_insert ON tasks')
+    op.execute('DROP FUNCTION user_task_summary_performers_apply()')
+    op.execute('DROP FUNCTION user_task_summary_tasks_apply()')
+    op.execute('DROP FUNCTION user_task_summary_add(integer, boolean, taskstatus, integer)')
+    op.drop_table('user_task_summary')
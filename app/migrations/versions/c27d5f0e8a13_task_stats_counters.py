@@ -0,0 +1,81 @@
+"""Task stats counters
+
+Revision ID: c27d5f0e8a13
+Revises: 9a4e1c6b2d80
+Create Date: 2024-10-07 14:03:52.117640
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c27d5f0e8a13'
+down_revision: Union[str, None] = '9a4e1c6b2d80'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('task_stats',
+    sa.Column('status', postgresql.ENUM(name='taskstatus', create_type=False), nullable=False),
+    sa.Column('priority', postgresql.ENUM(name='taskpriority', create_type=False), nullable=False),
+    sa.Column('responsible_user_id', sa.Integer(), nullable=False),
+    sa.Column('tasks_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['responsible_user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('status', 'priority', 'responsible_user_id')
+    )
+
+    # Every write to `tasks` moves one unit between counter rows in the same transaction
+    op.execute("""
+        CREATE FUNCTION task_stats_apply() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE task_stats SET tasks_count = tasks_count - 1
+                WHERE status = OLD.status
+                  AND priority = OLD.priority
+                  AND responsible_user_id = OLD.responsible_user_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO task_stats (status, priority, responsible_user_id, tasks_count)
+                VALUES (NEW.status, NEW.priority, NEW.responsible_user_id, 1)
+                ON CONFLICT (status, priority, responsible_user_id)
+                DO UPDATE SET tasks_count = task_stats.tasks_count + 1;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_stats_insert_delete
+        AFTER INSERT OR DELETE ON tasks
+        FOR EACH ROW EXECUTE FUNCTION task_stats_apply()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_stats_update
+        AFTER UPDATE OF status, priority, responsible_user_id ON tasks
+        FOR EACH ROW
+        WHEN (OLD.status IS DISTINCT FROM NEW.status
+              OR OLD.priority IS DISTINCT FROM NEW.priority
+              OR OLD.responsible_user_id IS DISTINCT FROM NEW.responsible_user_id)
+        EXECUTE FUNCTION task_stats_apply()
+    """)
+
+    # Backfill from the existing rows, blocking writers until the triggers take over
+    op.execute('LOCK TABLE tasks IN SHARE ROW EXCLUSIVE MODE')
+    op.execute("""
+        INSERT INTO task_stats (status, priority, responsible_user_id, tasks_count)
+        SELECT status, priority, responsible_user_id, count(*)
+        FROM tasks
+        GROUP BY status, priority, responsible_user_id
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER tasks_stats_update ON tasks')
+    op.execute('DROP TRIGGER tasks_stats_insert_delete ON tasks')
+    op.execute('DROP FUNCTION task_stats_apply()')
+    op.drop_table('task_stats')
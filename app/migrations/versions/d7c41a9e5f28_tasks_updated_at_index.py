@@ -0,0 +1,29 @@
+"""Tasks updated_at index
+
+Revision ID: d7c41a9e5f28
+Revises: b4e92f07d3a6
+Create Date: 2024-10-19 10:27:53.618240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7c41a9e5f28'
+down_revision: Union[str, None] = 'b4e92f07d3a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Task selections by `updated_before` of bulk deletes and jobs, any status
+    create_index_concurrently('idx_tasks_updated_at', 'tasks', ['updated_at'])
+
+
+def downgrade() -> None:
+    drop_index_concurrently('idx_tasks_updated_at', 'tasks')
@@ -0,0 +1,55 @@
+"""Tasks archive
+
+Revision ID: e5b8d3a9c461
+Revises: c27d5f0e8a13
+Create Date: 2024-10-16 10:27:38.554902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8d3a9c461'
+down_revision: Union[str, None] = 'c27d5f0e8a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('tasks_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('responsible_user_id', sa.Integer(), nullable=False),
+    sa.Column('status', postgresql.ENUM(name='taskstatus', create_type=False), nullable=False),
+    sa.Column('priority', postgresql.ENUM(name='taskpriority', create_type=False), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['responsible_user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tasks_archive_responsible_user_id'), 'tasks_archive', ['responsible_user_id'], unique=False)
+    op.create_table('task_performers_archive',
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['task_id'], ['tasks_archive.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE')
+    )
+    op.create_index(op.f('ix_task_performers_archive_task_id'), 'task_performers_archive', ['task_id'], unique=False)
+    op.create_index(
+        'idx_tasks_completed_updated_at', 'tasks', ['updated_at'], unique=False,
+        postgresql_where=sa.text("status = 'COMPLETED'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_tasks_completed_updated_at', table_name='tasks')
+    op.drop_index(op.f('ix_task_performers_archive_task_id'), table_name='task_performers_archive')
+    op.drop_table('task_performers_archive')
+    op.drop_index(op.f('ix_tasks_archive_responsible_user_id'), table_name='tasks_archive')
+    op.drop_table('tasks_archive')
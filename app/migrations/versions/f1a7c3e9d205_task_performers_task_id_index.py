@@ -0,0 +1,29 @@
+"""Task performers task_id index
+
+Revision ID: f1a7c3e9d205
+Revises: e5b8d3a9c461
+Create Date: 2024-10-17 09:12:44.301587
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a7c3e9d205'
+down_revision: Union[str, None] = 'e5b8d3a9c461'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently, task_performers stays writable meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index('idx_task_performers_task_id', 'task_performers', ['task_id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_task_performers_task_id', table_name='task_performers', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,148 @@
+import os
+import time
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+
+from app.database import get_pool_status, pool_wait_stats
+
+# Multi-worker servers set PROMETHEUS_MULTIPROC_DIR so every worker writes its samples to shared files
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"],
+)
+REQUESTS_TOTAL = Counter(
+    "http_requests_total",
+    "HTTP requests by route and status code",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests being handled",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Primary database pool connections by state",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT_RECENT = Gauge(
+    "db_pool_wait_recent_seconds",
+    "Moving average of the time spent waiting for a pooled connection",
+    multiprocess_mode="max",
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts",
+    "Pool checkouts that timed out",
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"],
+)
+RATE_LIMIT_DECISIONS = Counter(
+    "rate_limit_decisions_total",
+    "Rate limiter decisions by route",
+    ["route", "result"],
+)
+LOAD_SHED_REQUESTS = Counter(
+    "load_shed_requests_total",
+    "Requests rejected by load shedding",
+    ["reason"],
+)
+
+_STATEMENT_CACHE_RESULTS = {CACHE_HIT: "hit", CACHE_MISS: "miss"}
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _count_statement_cache(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        result = _STATEMENT_CACHE_RESULTS.get(getattr(context, "cache_hit", None), "uncached")
+        CACHE_REQUESTS.labels("sqlalchemy_compiled", result).inc()
+
+
+pool_wait_stats.timeout_listeners.append(DB_POOL_TIMEOUTS.inc)
+
+
+def update_pool_metrics():
+    """Copy the live pool state of this worker into the pool gauges, called when `/metrics` is scraped.
+
+    With several workers, a scrape refreshes the gauges of the worker serving it; the others
+    keep the values of the last scrape they served.
+    """
+    status = get_pool_status()
+    DB_POOL_CONNECTIONS.labels("checked_out").set(status["checked_out"])
+    DB_POOL_CONNECTIONS.labels("idle").set(status["idle"])
+    DB_POOL_CONNECTIONS.labels("overflow").set(status["overflow"])
+    DB_POOL_WAIT_RECENT.set(status["wait_time_recent"])
+
+
+class CeleryQueueCollector:
+    """Reports the length of the Celery queues in the broker, cached briefly to keep scrapes cheap.
+
+    The queues are the default one plus those declared in `task_queues` and `task_routes`, read from
+    the Celery app on the first scrape, so neither Celery nor the broker is touched on import.
+    """
+
+    CACHE_SECONDS = 5.0
+
+    def __init__(self):
+        self._lengths = {}
+        self._collected_at = 0.0
+
+    def describe(self):
+        # Without it, registering the collector would call `collect()` to learn its metrics
+        return []
+
+    def collect(self):
+        if time.monotonic() - self._collected_at > self.CACHE_SECONDS:
+            self._lengths = self._read_lengths()
+            self._collected_at = time.monotonic()
+
+        metric = GaugeMetricFamily("celery_queue_length", "Messages waiting in the Celery queue", labels=["queue"])
+        for queue, length in self._lengths.items():
+            metric.add_metric([queue], length)
+        yield metric
+
+    @staticmethod
+    def _queue_names(celery) -> list:
+        names = {celery.conf.task_default_queue}
+        names.update(queue.name for queue in celery.conf.task_queues or ())
+        routes = celery.conf.task_routes
+        if isinstance(routes, dict):
+            names.update(route["queue"] for route in routes.values() if isinstance(route, dict) and "queue" in route)
+        return sorted(names)
+
+    def _read_lengths(self) -> dict:
+        from app.services.celery_app import celery
+
+        try:
+            with celery.connection_for_read() as connection:
+                client = connection.channel().client
+                return {queue: client.llen(queue) for queue in self._queue_names(celery)}
+        except Exception:
+            return {}
+
+
+celery_queue_collector = CeleryQueueCollector()
+
+if not MULTIPROCESS:
+    REGISTRY.register(celery_queue_collector)
+
+
+def render_metrics() -> bytes:
+    """Render the metrics of this process, or of all workers in multiprocess mode."""
+    if not MULTIPROCESS:
+        return generate_latest(REGISTRY)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(celery_queue_collector)
+    return generate_latest(registry)
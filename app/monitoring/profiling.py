@@ -0,0 +1,142 @@
+import hashlib
+import hmac
+import json
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qsl
+
+from app.config import settings
+from app.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile-token"
+
+# Request details that must never end up in profile metadata
+SENSITIVE_HEADERS = frozenset({"authorization", "cookie", "set-cookie", PROFILE_HEADER})
+SENSITIVE_PARAMS = ("password", "token", "secret", "key")
+
+# Used signatures are kept in Redis until the token expires, so one token records one request across all workers
+USED_TOKEN_KEY = "profiling:used_token:{signature}"
+
+
+def _sign(expires: int, method: str, path: str) -> str:
+    message = f"{expires}:{method.upper()}:{path}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def create_profile_token(method: str, path: str) -> str:
+    """
+    Create a signed token that enables profiling of one request to `method` `path`.
+
+    Args:
+        method (str): HTTP method of the request to profile.
+        path (str): Exact request path, e.g. `/tasks/42`.
+
+    Returns:
+        str: The token to send in the `X-Profile-Token` header.
+    """
+    expires = int(time.time() + settings.PROFILING_TOKEN_TIMER.total_seconds())
+    return f"{expires}.{_sign(expires, method, path)}"
+
+
+async def verify_profile_token(token: str, method: str, path: str) -> bool:
+    """
+    Check a profile token against the request and consume it.
+
+    Args:
+        token (str): Value of the `X-Profile-Token` header.
+        method (str): HTTP method of the request.
+        path (str): Request path.
+
+    Returns:
+        bool: True if the token is valid, unexpired and not used before, by any worker.
+    """
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    if not hmac.compare_digest(signature, _sign(int(expires), method, path)):
+        return False
+
+    try:
+        return bool(await get_redis().set(USED_TOKEN_KEY.format(signature=signature), 1, nx=True, exat=int(expires)))
+    except Exception as e:
+        # Without Redis a token can't be consumed once for all workers, so none is accepted
+        logger.warning("Profiling token store unavailable, not profiling: %s", e)
+        return False
+
+
+def _redact_query(query_string: str) -> dict:
+    return {
+        key: "***" if any(word in key.lower() for word in SENSITIVE_PARAMS) else value
+        for key, value in parse_qsl(query_string)
+    }
+
+
+class RequestProfiler:
+    """Profiles one request with pyinstrument, or cProfile when pyinstrument is not installed."""
+
+    def __init__(self):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:  # pyinstrument is optional, fall back to cProfile
+            import cProfile
+            self._pyinstrument = False
+            self._profiler = cProfile.Profile()
+        else:
+            self._pyinstrument = True
+            self._profiler = Profiler(async_mode="enabled")
+
+    def start(self):
+        if self._pyinstrument:
+            self._profiler.start()
+        else:
+            # cProfile sees the whole thread, so concurrent requests show up in the profile too
+            self._profiler.enable()
+
+    def stop(self):
+        if self._pyinstrument:
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+
+    def save(self, scope: dict, status_code: Optional[int], duration: float) -> Path:
+        """
+        Write the profile and its redacted request metadata to `PROFILING_DIR`.
+
+        Returns:
+            Path: The written profile file.
+        """
+        directory = Path(settings.PROFILING_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        slug = scope["path"].strip("/").replace("/", "_") or "root"
+        stem = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}_{scope['method']}_{slug}_{uuid.uuid4().hex[:8]}"
+
+        if self._pyinstrument:
+            profile_path = directory / f"{stem}.html"
+            profile_path.write_text(self._profiler.output_html(), encoding="utf-8")
+        else:
+            profile_path = directory / f"{stem}.pstats"
+            self._profiler.dump_stats(profile_path)
+
+        # Only function names and timings are recorded, so the request itself is the secret-bearing part
+        metadata = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": _redact_query(scope.get("query_string", b"").decode("latin-1")),
+            "headers": {
+                name.decode("latin-1"): value.decode("latin-1")
+                for name, value in scope["headers"]
+                if name.decode("latin-1").lower() not in SENSITIVE_HEADERS
+            },
+            "status_code": status_code,
+            "duration": duration,
+            "profile": profile_path.name,
+        }
+        (directory / f"{stem}.json").write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+        return profile_path
@@ -0,0 +1,84 @@
+import logging
+import time
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a request issues more queries than its configured budget."""
+
+
+class RequestQueryStats:
+    """Database work done while handling one request."""
+
+    # Statements kept for the slow request log
+    MAX_STATEMENTS = 50
+
+    __slots__ = ("queries", "checkouts", "db_time", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.checkouts = 0
+        self.db_time = 0.0
+        self.statements: List[Tuple[str, float]] = []
+
+    def server_timing(self) -> str:
+        """Render the stats as a `Server-Timing` header value."""
+        return (
+            f'db;dur={self.db_time * 1000:.2f};desc="queries={self.queries} checkouts={self.checkouts}"'
+        )
+
+
+# Set per request by `QueryStatsMiddleware`; None outside of requests, which makes the hooks no-ops
+request_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if request_query_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = request_query_stats.get()
+    if stats is None or not conn.info.get("query_start_time"):
+        return
+
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats.queries += 1
+    stats.db_time += elapsed
+    if len(stats.statements) < stats.MAX_STATEMENTS:
+        stats.statements.append((statement, elapsed))
+
+
+@event.listens_for(Pool, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    stats = request_query_stats.get()
+    if stats is not None:
+        stats.checkouts += 1
+
+
+def log_slow_request(route: str, stats: RequestQueryStats, slow_queries: int, slow_db_time: float):
+    """Log the request with its statements if it crossed one of the thresholds.
+
+    Args:
+        route (str): Method and path template of the request.
+        stats (RequestQueryStats): Database work done by the request.
+        slow_queries (int): Query count threshold.
+        slow_db_time (float): Database time threshold in seconds.
+    """
+    if stats.queries <= slow_queries and stats.db_time <= slow_db_time:
+        return
+
+    statements = "\n".join(f"  {elapsed * 1000:8.2f} ms  {statement}" for statement, elapsed in stats.statements)
+    logger.warning(
+        "Slow request %s: %d queries, %d checkouts, %.2f ms in database\n%s",
+        route, stats.queries, stats.checkouts, stats.db_time * 1000, statements
+    )
@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from app.dao.base import statement_cache
+from app.database import get_compiled_cache_status, get_pool_status
+from app.monitoring.metrics import render_metrics, update_pool_metrics
+from app.monitoring.profiling import PROFILE_HEADER, create_profile_token
+from app.monitoring.schemas import SPoolStatus, SProfileToken, SProfileTokenRequest, SStatementCacheStatus
+from app.users.dependencies import get_current_pm_user
+from app.users.models import Users
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"]
+)
+
+metrics_router = APIRouter(
+    tags=["Internal"]
+)
+
+
+@router.get("/db/pool", response_model=SPoolStatus)
+async def get_db_pool_status(
+    user: Users = Depends(get_current_pm_user)
+):
+    """
+    Report the live state of the database connection pool.
+
+    Args:
+        user (Users): The current PM user.
+
+    Returns:
+        SPoolStatus: Checked-out, idle and overflow connections and checkout wait times in seconds.
+    """
+    return get_pool_status()
+
+
+@router.get("/db/statement-cache", response_model=SStatementCacheStatus)
+async def get_db_statement_cache_status(
+    user: Users = Depends(get_current_pm_user)
+):
+    """
+    Report the statement caches of this worker.
+
+    Args:
+        user (Users): The current PM user.
+
+    Returns:
+        SStatementCacheStatus: SQLAlchemy compiled cache and pre-built DAO statement sizes, hits and misses.
+    """
+    return {**get_compiled_cache_status(), **statement_cache.status()}
+
+
+@router.post("/profiling/token", response_model=SProfileToken)
+async def create_profiling_token(
+    token_request: SProfileTokenRequest,
+    user: Users = Depends(get_current_pm_user)
+):
+    """
+    Issue a one-shot token that profiles the next request to the given method and path.
+
+    The token only has an effect when `PROFILING_ENABLED` is set.
+
+    Args:
+        token_request (SProfileTokenRequest): Method and exact path of the request to profile.
+        user (Users): The current PM user.
+
+    Returns:
+        SProfileToken: The header name and the signed token to send with the request.
+    """
+    return SProfileToken(
+        header=PROFILE_HEADER,
+        token=create_profile_token(token_request.method, token_request.path)
+    )
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """
+    Expose Prometheus metrics for scraping.
+
+    Returns:
+        Response: The metrics in the Prometheus text format.
+    """
+    update_pool_metrics()
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field
+
+
+class SPoolStatus(BaseModel):
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    max_overflow: int
+    checkouts: int
+    timeouts: int
+    wait_time_avg: float
+    wait_time_max: float
+    wait_time_recent: float
+
+
+class SStatementCacheStatus(BaseModel):
+    compiled_cache_size: int
+    compiled_cache_capacity: int
+    compiled_cache_hits: int
+    compiled_cache_misses: int
+    compiled_cache_uncached: int
+    prepared_statement_cache_size: int
+    dao_statements: int
+    dao_statements_capacity: int
+    dao_statement_hits: int
+    dao_statement_misses: int
+
+
+class SProfileTokenRequest(BaseModel):
+    method: str = "GET"
+    path: str = Field(pattern=r"^/")
+
+
+class SProfileToken(BaseModel):
+    header: str
+    token: str
@@ -0,0 +1,108 @@
+import types
+from typing import Any, Callable, Coroutine, Dict, List, Type, TypeVar, Union, get_args, get_origin
+
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+BODY_CONTENT_TYPES = ("application/json", "application/x-www-form-urlencoded", "multipart/form-data")
+REF_TEMPLATE = "#/components/schemas/{model}"
+
+# Schemas of the bodies parsed by `form_or_json`, added to the OpenAPI components by `add_request_body_schemas`
+_body_schemas: Dict[str, dict] = {}
+
+
+def _is_list_annotation(annotation: Any) -> bool:
+    """Check whether a field annotation is a list, or a union containing one."""
+    origin = get_origin(annotation)
+    if origin in (list, List):
+        return True
+    if origin in (Union, types.UnionType):
+        return any(_is_list_annotation(arg) for arg in get_args(annotation))
+    return False
+
+
+def form_or_json(schema: Type[SchemaT]) -> Callable[[Request], Coroutine[Any, Any, SchemaT]]:
+    """
+    Build a dependency that parses the request body into `schema` from either JSON or form data.
+
+    `application/json` bodies are validated straight from the raw bytes, skipping the
+    multipart parser; any other content type is read as a form, as the browser UI sends it.
+    Validation errors are reported in the same 422 format FastAPI uses for body parameters.
+
+    Args:
+        schema (Type[SchemaT]): The Pydantic schema of the request body.
+
+    Returns:
+        Callable: The FastAPI dependency returning a validated `schema` instance.
+    """
+    list_fields = frozenset(
+        name for name, field in schema.model_fields.items() if _is_list_annotation(field.annotation)
+    )
+
+    async def dependency(request: Request) -> SchemaT:
+        try:
+            media_type = request.headers.get("content-type", "").partition(";")[0].strip().lower()
+            if media_type == "application/json":
+                return schema.model_validate_json(await request.body())
+
+            form = await request.form()
+            data = {}
+            for key in form.keys():
+                # Empty form inputs mean "not provided", as with FastAPI's Form() parameters
+                if key in list_fields:
+                    values = [value for value in form.getlist(key) if value != ""]
+                    if values:
+                        data[key] = values
+                elif form.get(key) != "":
+                    data[key] = form.get(key)
+            return schema.model_validate(data)
+
+        except ValidationError as e:
+            errors = e.errors(include_url=False)
+            raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in errors])
+
+    return dependency
+
+
+def request_body_openapi(schema: Type[BaseModel]) -> dict:
+    """
+    Build the `openapi_extra` of a route whose body is parsed by `form_or_json(schema)`.
+
+    The dependency reads the raw request, so FastAPI can't document the body by itself.
+
+    Args:
+        schema (Type[BaseModel]): The Pydantic schema of the request body.
+
+    Returns:
+        dict: The operation's `requestBody`, the same schema under every accepted content type.
+    """
+    json_schema = schema.model_json_schema(ref_template=REF_TEMPLATE)
+    _body_schemas.update(json_schema.pop("$defs", {}))
+    _body_schemas[schema.__name__] = json_schema
+
+    reference = {"$ref": REF_TEMPLATE.format(model=schema.__name__)}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {content_type: {"schema": reference} for content_type in BODY_CONTENT_TYPES}
+        }
+    }
+
+
+def add_request_body_schemas(openapi_schema: dict) -> dict:
+    """
+    Add the schemas referenced by `request_body_openapi` to the components of an OpenAPI document.
+
+    Args:
+        openapi_schema (dict): The document generated by FastAPI, updated in place.
+
+    Returns:
+        dict: The same document.
+    """
+    components = openapi_schema.setdefault("components", {}).setdefault("schemas", {})
+    for name, json_schema in _body_schemas.items():
+        components.setdefault(name, json_schema)
+    return openapi_schema
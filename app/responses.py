@@ -0,0 +1,20 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+
+    Returning it from an endpoint bypasses FastAPI's `response_model` validation,
+    so the content must already be plain data produced by a schema adapter
+    (see `app.tasks.helpers.serialize_tasks`). `response_model` is still used for the docs.
+
+    Datetimes are written like pydantic's JSON mode, which FastAPI uses for the other endpoints:
+    orjson would write UTC as `+00:00`, `OPT_UTC_Z` keeps pydantic's `Z`.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
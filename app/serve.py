@@ -0,0 +1,36 @@
+"""
+Production entry point: multi-worker uvicorn with uvloop and httptools.
+
+Usage:
+    python -m app.serve
+"""
+import os
+import shutil
+
+import uvicorn
+
+from app.config import settings
+
+
+def main():
+    # Multiprocess metrics from a previous run would be merged into the new one
+    metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir, exist_ok=True)
+
+    uvicorn.run(
+        "app.main:app",
+        host=settings.WEB_HOST,
+        port=settings.WEB_PORT,
+        workers=settings.WEB_WORKERS,
+        loop="uvloop",
+        http="httptools",
+        lifespan="on",
+        timeout_graceful_shutdown=settings.WEB_GRACEFUL_SHUTDOWN,
+        proxy_headers=True,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+import asyncio
+from datetime import datetime, timezone
+
+from app.config import settings
+from app.database import dispose_engines
+from app.services.celery_app import celery
+from app.tasks.dao import TasksDAO
+
+
+async def archive_completed_tasks_in_batches() -> int:
+    """Move completed tasks older than `ARCHIVE_COMPLETED_AFTER` to the archive, batch by batch.
+
+    Returns:
+        int: Number of tasks archived in this run.
+    """
+    completed_before = datetime.now(timezone.utc) - settings.ARCHIVE_COMPLETED_AFTER
+    archived = 0
+    try:
+        for _ in range(settings.ARCHIVE_MAX_BATCHES):
+            moved = await TasksDAO.archive_completed_batch(completed_before, settings.ARCHIVE_BATCH_SIZE)
+            archived += moved
+            if moved < settings.ARCHIVE_BATCH_SIZE:
+                break
+            await asyncio.sleep(settings.ARCHIVE_BATCH_PAUSE)
+    finally:
+        await dispose_engines()
+    return archived
+
+
+@celery.task
+def archive_completed_tasks() -> int:
+    """Celery task, scheduled by beat every `ARCHIVE_INTERVAL`, archiving completed tasks.
+
+    Returns:
+        int: Number of tasks archived.
+    """
+    return asyncio.run(archive_completed_tasks_in_batches())
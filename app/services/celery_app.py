@@ -6,7 +6,7 @@ from app.config import settings
 
 celery = Celery(
     "tasks",
-    include=["app.services.tasks"],
+    include=["app.services.tasks", "app.services.archive", "app.jobs.tasks"],
 )
 celery.conf.broker_url = os.environ.get(
     "CELERY_BROKER_URL",
@@ -16,3 +16,14 @@ celery.conf.result_backend = os.environ.get(
     "CELERY_RESULT_BACKEND",
     f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}"
 )
+# Jobs are acknowledged late, so a message stays unacknowledged for as long as its job runs and Redis
+# redelivers it after this; it has to exceed the longest job
+celery.conf.broker_transport_options = {
+    "visibility_timeout": int(settings.JOBS_VISIBILITY_TIMEOUT.total_seconds()),
+}
+celery.conf.beat_schedule = {
+    "archive-completed-tasks": {
+        "task": "app.services.archive.archive_completed_tasks",
+        "schedule": settings.ARCHIVE_INTERVAL,
+    },
+}
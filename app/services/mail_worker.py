@@ -0,0 +1,340 @@
+"""
+Asyncio notification worker: sends queued emails in batches over a pool of reused SMTP connections.
+
+Jobs are pushed to the `NOTIFICATIONS_QUEUE` Redis list by `notify_task_status_changed` when
+`NOTIFICATIONS_BACKEND=redis`. Messages that still fail after `MAIL_WORKER_RETRIES` retries, or are
+rejected permanently, are pushed with the last error to `NOTIFICATIONS_DEAD_LETTER_QUEUE`.
+
+Jobs are moved to the worker's own processing list while they are sent, and removed from it once
+sent or dead-lettered. Every worker refreshes a heartbeat key while it runs, and puts back in the
+queue the processing lists whose heartbeat has expired, its own previous run's included, so a crash,
+a deploy or a replaced container doesn't lose emails; at worst one is sent twice.
+
+With `DEBUG` on, emails are stored in the debug mail sink instead of being sent.
+
+Usage:
+    python -m app.services.mail_worker
+"""
+import asyncio
+import logging
+import signal
+import socket
+import time
+import uuid
+from email.message import EmailMessage
+from typing import List, Optional, Tuple
+
+import aiosmtplib
+import orjson
+
+from app.config import settings
+from app.services.redis_client import close_redis, get_notifications_redis
+from app.services.send_email.handler import create_status_change_mail_template
+from app.services.send_email.sink import MailSink, get_mail_sink
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPConnectionPool:
+    """A fixed number of SMTP connections, each kept open and reused for many messages.
+
+    The pool size bounds the number of concurrent sends; broken connections are reopened on the next use.
+    """
+
+    def __init__(self, size: int):
+        self._idle: asyncio.Queue[Optional[aiosmtplib.SMTP]] = asyncio.Queue()
+        for _ in range(size):
+            self._idle.put_nowait(None)
+
+    @staticmethod
+    async def _connect() -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            use_tls=settings.SMTP_USE_TLS,
+            timeout=settings.MAIL_WORKER_SMTP_TIMEOUT,
+        )
+        await client.connect()
+        if settings.SMTP_PASS:
+            await client.login(settings.SMTP_USER, settings.SMTP_PASS)
+        return client
+
+    async def send(self, message: EmailMessage):
+        """Send a message over an idle connection, waiting for one if all are busy.
+
+        Args:
+            message (EmailMessage): The email to send.
+
+        Raises:
+            aiosmtplib.SMTPException: If the server rejects the message or the connection fails.
+        """
+        client = await self._idle.get()
+        try:
+            if client is None or not client.is_connected:
+                client = await self._connect()
+            await client.send_message(message)
+        except BaseException:
+            if client is not None:
+                client.close()
+            client = None
+            raise
+        finally:
+            self._idle.put_nowait(client)
+
+    async def close(self):
+        while not self._idle.empty():
+            client = self._idle.get_nowait()
+            if client is not None and client.is_connected:
+                try:
+                    await client.quit()
+                except aiosmtplib.SMTPException:
+                    client.close()
+
+
+class MailSinkSender:
+    """Stores emails in the debug mail sink, in place of the SMTP connection pool."""
+
+    def __init__(self, sink: MailSink):
+        self.sink = sink
+
+    async def send(self, message: EmailMessage):
+        self.sink.add(message)
+
+    async def close(self):
+        self.sink.flush()
+
+
+def render_batch(jobs: List[dict]) -> List[Tuple[dict, Optional[EmailMessage]]]:
+    """Render the emails of a batch of jobs; runs in a thread so sends of the previous batch keep going.
+
+    Args:
+        jobs (List[dict]): Notification jobs with `email_to` and `task_data`.
+
+    Returns:
+        List[Tuple[dict, Optional[EmailMessage]]]: Each job with its message, None if it failed to render.
+    """
+    rendered = []
+    for job in jobs:
+        try:
+            message = create_status_change_mail_template(email_to=job["email_to"], task_data=job["task_data"])
+        except Exception as e:
+            job["error"] = f"render: {e!r}"
+            message = None
+        rendered.append((job, message))
+    return rendered
+
+
+def processing_queue_name(worker_id: str) -> str:
+    return f"{settings.NOTIFICATIONS_QUEUE}:processing:{worker_id}"
+
+
+def heartbeat_key_name(worker_id: str) -> str:
+    return f"{settings.NOTIFICATIONS_QUEUE}:heartbeat:{worker_id}"
+
+
+class MailWorker:
+    def __init__(self, redis, sender, worker_id: Optional[str] = None):
+        self.redis = redis
+        self.sender = sender
+        self.stopping = asyncio.Event()
+        self.worker_id = worker_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self.processing_queue = processing_queue_name(self.worker_id)
+        self.heartbeat_key = heartbeat_key_name(self.worker_id)
+
+    async def beat(self):
+        """Refresh the worker's heartbeat key, which expires after `MAIL_WORKER_HEARTBEAT_TTL` seconds."""
+        await self.redis.set(self.heartbeat_key, 1, px=int(settings.MAIL_WORKER_HEARTBEAT_TTL * 1000))
+
+    async def requeue(self, processing_queue: str) -> int:
+        """Put the jobs left in a processing list back at the head of the queue, in order.
+
+        Args:
+            processing_queue (str): The processing list to empty.
+
+        Returns:
+            int: Number of requeued jobs.
+        """
+        requeued = 0
+        while await self.redis.lmove(processing_queue, settings.NOTIFICATIONS_QUEUE, "RIGHT", "LEFT"):
+            requeued += 1
+        if requeued:
+            logger.warning("Requeued %d notification jobs left unfinished in %s", requeued, processing_queue)
+        return requeued
+
+    async def reclaim_stale(self) -> int:
+        """Requeue the jobs of the processing lists whose worker's heartbeat has expired.
+
+        Returns:
+            int: Number of requeued jobs.
+        """
+        prefix = processing_queue_name("")
+        requeued = 0
+        async for key in self.redis.scan_iter(match=f"{prefix}*", _type="list"):
+            key = key.decode() if isinstance(key, bytes) else key
+            worker_id = key[len(prefix):]
+            if worker_id != self.worker_id and not await self.redis.exists(heartbeat_key_name(worker_id)):
+                requeued += await self.requeue(key)
+        return requeued
+
+    async def keep_alive(self):
+        """Refresh the heartbeat and reclaim stale processing lists every `MAIL_WORKER_HEARTBEAT_INTERVAL`."""
+        while not self.stopping.is_set():
+            try:
+                await self.beat()
+                await self.reclaim_stale()
+            except Exception:
+                logger.exception("Mail worker heartbeat failed")
+            try:
+                await asyncio.wait_for(self.stopping.wait(), settings.MAIL_WORKER_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def next_batch(self) -> List[Tuple[bytes, dict]]:
+        """Wait up to a second for a job, then take whatever else is queued, up to `MAIL_WORKER_BATCH_SIZE`.
+
+        Jobs are moved to the processing list, where they stay until `done` removes them.
+
+        Returns:
+            List[Tuple[bytes, dict]]: The raw and decoded jobs, empty if the queue stayed empty.
+        """
+        raw = await self.redis.blmove(settings.NOTIFICATIONS_QUEUE, self.processing_queue, 1, "LEFT", "RIGHT")
+        if raw is None:
+            return []
+        raw_jobs = [raw]
+        if settings.MAIL_WORKER_BATCH_SIZE > 1:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for _ in range(settings.MAIL_WORKER_BATCH_SIZE - 1):
+                    pipe.lmove(settings.NOTIFICATIONS_QUEUE, self.processing_queue, "LEFT", "RIGHT")
+                raw_jobs += [item for item in await pipe.execute() if item is not None]
+
+        jobs = []
+        for raw in raw_jobs:
+            try:
+                jobs.append((raw, orjson.loads(raw)))
+            except orjson.JSONDecodeError:
+                logger.error("Dropping malformed notification job to the dead letter queue: %r", raw[:200])
+                await self.done(raw, dead_letter=raw)
+        return jobs
+
+    async def done(self, raw: bytes, dead_letter: Optional[bytes] = None):
+        """Remove a job from the processing list, atomically pushing `dead_letter` to the dead letter queue.
+
+        Args:
+            raw (bytes): The job as it was queued.
+            dead_letter (Optional[bytes]): What to keep in the dead letter queue, if the job failed.
+        """
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if dead_letter is not None:
+                pipe.rpush(settings.NOTIFICATIONS_DEAD_LETTER_QUEUE, dead_letter)
+            pipe.lrem(self.processing_queue, 1, raw)
+            await pipe.execute()
+
+    async def dead_letter(self, raw: bytes, job: dict):
+        logger.warning("Email %s to %s failed: %s", job.get("id"), job.get("email_to"), job.get("error"))
+        await self.done(raw, dead_letter=orjson.dumps(job))
+
+    async def deliver(self, raw: bytes, job: dict, message: Optional[EmailMessage]) -> bool:
+        """Send one message, retrying transient failures with exponential backoff.
+
+        Args:
+            raw (bytes): The job as it was queued, removed from the processing list once handled.
+            job (dict): The notification job, its `attempts` and `error` are updated.
+            message (Optional[EmailMessage]): The rendered email, None if rendering failed.
+
+        Returns:
+            bool: True if the message was accepted by the SMTP server.
+        """
+        if message is None:
+            await self.dead_letter(raw, job)
+            return False
+
+        while True:
+            try:
+                await self.sender.send(message)
+                await self.done(raw)
+                return True
+            except aiosmtplib.SMTPResponseException as e:
+                job["error"] = f"{e.code} {e.message}"
+                if e.code >= 500:
+                    # Permanent rejection, retrying won't help
+                    break
+            except (aiosmtplib.SMTPException, OSError, asyncio.TimeoutError) as e:
+                job["error"] = repr(e)
+
+            if job["attempts"] >= settings.MAIL_WORKER_RETRIES:
+                break
+            await asyncio.sleep(settings.MAIL_WORKER_RETRY_BACKOFF * 2 ** job["attempts"])
+            job["attempts"] += 1
+
+        await self.dead_letter(raw, job)
+        return False
+
+    async def process(self, jobs: List[Tuple[bytes, dict]]) -> int:
+        """Render a batch and send it concurrently, bounded by the SMTP pool size.
+
+        Args:
+            jobs (List[Tuple[bytes, dict]]): Raw and decoded notification jobs.
+
+        Returns:
+            int: Number of emails sent.
+        """
+        for _, job in jobs:
+            job.setdefault("attempts", 0)
+        rendered = await asyncio.to_thread(render_batch, [job for _, job in jobs])
+        results = await asyncio.gather(*(
+            self.deliver(raw, job, message) for (raw, _), (job, message) in zip(jobs, rendered)
+        ))
+        return sum(results)
+
+    async def run(self):
+        logger.info("Mail worker %s consuming %s", self.worker_id, settings.NOTIFICATIONS_QUEUE)
+        # The heartbeat is set before the first job is taken, so no other worker reclaims this one's list
+        await self.beat()
+        await self.requeue(self.processing_queue)
+        keep_alive = asyncio.create_task(self.keep_alive())
+        try:
+            while not self.stopping.is_set():
+                jobs = await self.next_batch()
+                if not jobs:
+                    continue
+                started = time.perf_counter()
+                sent = await self.process(jobs)
+                logger.info("Sent %d/%d emails in %.3fs", sent, len(jobs), time.perf_counter() - started)
+        finally:
+            self.stopping.set()
+            await keep_alive
+        # The processing list is empty after a normal shutdown, nothing is left to reclaim
+        await self.redis.delete(self.heartbeat_key)
+
+
+async def run_worker():
+    if settings.DEBUG:
+        logger.info("DEBUG is on, emails are stored in the mail sink at %s", settings.MAIL_SINK_PATH)
+        sender = MailSinkSender(get_mail_sink())
+    else:
+        logger.info(
+            "Sending with %d SMTP connections to %s:%d",
+            settings.MAIL_WORKER_CONNECTIONS, settings.SMTP_HOST, settings.SMTP_PORT
+        )
+        sender = SMTPConnectionPool(settings.MAIL_WORKER_CONNECTIONS)
+    worker = MailWorker(get_notifications_redis(), sender, settings.MAIL_WORKER_ID)
+
+    # The batch in progress is finished before exiting, so no popped job is lost on a normal shutdown
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stopping.set)
+
+    try:
+        await worker.run()
+    finally:
+        await sender.close()
+        await close_redis()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    asyncio.run(run_worker())
+
+
+if __name__ == '__main__':
+    main()
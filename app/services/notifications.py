@@ -0,0 +1,28 @@
+import uuid
+
+import orjson
+from pydantic import EmailStr
+
+from app.config import settings
+
+
+async def notify_task_status_changed(email_to: EmailStr, task_data: dict):
+    """Queue the task status change email for the responsible user.
+
+    With the "celery" backend the email is sent by a prefork Celery task. With the "redis" backend
+    it is pushed to `NOTIFICATIONS_QUEUE` and sent in batches by `python -m app.services.mail_worker`.
+
+    Args:
+        email_to (EmailStr): Recipient email address.
+        task_data (dict): Task details including task ID and status.
+    """
+    if settings.NOTIFICATIONS_BACKEND == "redis":
+        from app.services.redis_client import get_notifications_redis
+
+        job = {"id": uuid.uuid4().hex, "email_to": email_to, "task_data": task_data, "attempts": 0}
+        await get_notifications_redis().rpush(settings.NOTIFICATIONS_QUEUE, orjson.dumps(job))
+        return
+
+    from app.services.tasks import send_task_update_status_email
+
+    send_task_update_status_email.delay(email_to, task_data)
@@ -0,0 +1,134 @@
+import logging
+import math
+import time
+
+from fastapi import Depends, HTTPException
+
+from app.config import settings
+from app.exceptions import TooManyRequestsException
+from app.monitoring.metrics import RATE_LIMIT_DECISIONS
+from app.services.redis_client import get_redis
+from app.users.dependencies import get_current_user
+from app.users.models import Users
+
+logger = logging.getLogger(__name__)
+
+# Refill the bucket for the time elapsed since the last call, then try to take one token.
+# Runs atomically in Redis, using the Redis clock so API workers don't need synchronised clocks.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill_rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    allowed = 1
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / refill_rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / refill_rate * 1000))
+return {allowed, tostring(retry_after)}
+"""
+
+_token_bucket = None
+
+
+class CircuitBreaker:
+    """Stops calling a failing dependency for `reset_after` seconds after `failures` consecutive errors."""
+
+    def __init__(self, failures: int, reset_after: float):
+        self.failures = failures
+        self.reset_after = reset_after
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return time.monotonic() < self._open_until
+
+    def record_success(self):
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+
+    def record_failure(self):
+        # Once open, a single failed trial after the reset period opens it again
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self.failures:
+            self._open_until = time.monotonic() + self.reset_after
+
+
+redis_breaker = CircuitBreaker(settings.RATE_LIMIT_BREAKER_FAILURES, settings.RATE_LIMIT_BREAKER_RESET)
+
+
+async def take_token(key: str, capacity: int, refill_rate: float) -> float:
+    """
+    Take one token from the bucket stored under `key`.
+
+    Args:
+        key (str): Redis key of the bucket.
+        capacity (int): Maximum number of tokens, i.e. the allowed burst.
+        refill_rate (float): Tokens added per second.
+
+    Returns:
+        float: 0 if a token was taken, otherwise seconds until the next token is available.
+    """
+    global _token_bucket
+    redis = get_redis()
+    # The client is replaced after `close_redis`, the script must not keep using the closed one
+    if _token_bucket is None or _token_bucket.registered_client is not redis:
+        _token_bucket = redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    allowed, retry_after = await _token_bucket(keys=[key], args=[capacity, refill_rate])
+    return 0.0 if allowed else float(retry_after)
+
+
+class RateLimiter:
+    """
+    Dependency limiting how often each user may call a route, with a Redis token bucket.
+
+    Used next to `get_current_user`, whose result FastAPI reuses within the request.
+    Fails open when Redis is unavailable: admission control must not take the API down.
+    After repeated Redis errors, the limit is skipped for a while instead of waiting for
+    the socket timeout on every request.
+    """
+
+    def __init__(self, route: str, capacity: int, refill_rate: float):
+        self.route = route
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+
+    async def __call__(self, user: Users = Depends(get_current_user)):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        if redis_breaker.is_open:
+            RATE_LIMIT_DECISIONS.labels(self.route, "skipped").inc()
+            return
+
+        try:
+            retry_after = await take_token(f"rate_limit:{self.route}:{user.id}", self.capacity, self.refill_rate)
+        except Exception as e:
+            logger.warning("Rate limiter unavailable, letting the request through: %s", e)
+            RATE_LIMIT_DECISIONS.labels(self.route, "error").inc()
+            redis_breaker.record_failure()
+            return
+        redis_breaker.record_success()
+
+        if retry_after:
+            RATE_LIMIT_DECISIONS.labels(self.route, "rejected").inc()
+            raise HTTPException(
+                status_code=TooManyRequestsException.status_code,
+                detail=TooManyRequestsException.detail,
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+        RATE_LIMIT_DECISIONS.labels(self.route, "allowed").inc()
@@ -0,0 +1,54 @@
+from app.config import settings
+
+_redis = None
+_notifications_redis = None
+
+
+def get_redis():
+    """Return the process-wide asyncio Redis client, importing and creating it on first use.
+
+    Returns:
+        redis.asyncio.Redis: The shared client.
+    """
+    global _redis
+    if _redis is None:
+        from redis.asyncio import Redis
+
+        _redis = Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_RATE_LIMIT_DB,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+        )
+    return _redis
+
+
+def get_notifications_redis():
+    """Return the process-wide asyncio Redis client for the notifications queue, created on first use.
+
+    Returns:
+        redis.asyncio.Redis: The shared client.
+    """
+    global _notifications_redis
+    if _notifications_redis is None:
+        from redis.asyncio import Redis
+
+        _notifications_redis = Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.NOTIFICATIONS_REDIS_DB,
+            socket_timeout=2,
+            socket_connect_timeout=2,
+        )
+    return _notifications_redis
+
+
+async def close_redis():
+    global _redis, _notifications_redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+    if _notifications_redis is not None:
+        await _notifications_redis.aclose()
+        _notifications_redis = None
@@ -1,10 +1,24 @@
 from email.message import EmailMessage
+from functools import lru_cache
 from pathlib import Path
 from jinja2 import Environment, FileSystemLoader
 from pydantic import EmailStr
 from app.config import settings
 
 
+@lru_cache(maxsize=1)
+def get_template_environment() -> Environment:
+    """Returns the Jinja2 environment loading templates from the 'templates' directory.
+
+    Created once per process, so compiled templates are cached across emails.
+
+    Returns:
+        Environment: The shared Jinja2 environment.
+    """
+    template_dir = Path(__file__).parent / 'templates'
+    return Environment(loader=FileSystemLoader(template_dir))
+
+
 def create_status_change_mail_template(email_to: EmailStr, task_data: dict) -> EmailMessage:
     """Creates an email with a status change notification using a Jinja2 template.
 
@@ -15,12 +29,8 @@ def create_status_change_mail_template(email_to: EmailStr, task_data: dict) -> E
     Returns:
         EmailMessage: The constructed email message with HTML content.
     """
-    # Set up the Jinja2 environment to load templates from the 'templates' directory
-    template_dir = Path(__file__).parent / 'templates'
-    env = Environment(loader=FileSystemLoader(template_dir))
-
     # Load and render the HTML email template
-    template = env.get_template('email_template.html')
+    template = get_template_environment().get_template('email_template.html')
     rendered_html = template.render(**task_data)
 
     # Create the email message
@@ -33,24 +43,3 @@ def create_status_change_mail_template(email_to: EmailStr, task_data: dict) -> E
     email.set_content(rendered_html, subtype="html")
 
     return email
-
-
-def mock_create_status_change_mail_template(email_message: EmailMessage):
-    """Saves the email as an HTML file in the 'mock_mail' directory for debugging purposes.
-
-    Args:
-        email_message (EmailMessage): The email message to save as an HTML file.
-    """
-    # Create the 'mock_mail' directory if it doesn't exist
-    mock_mail_dir = Path(__file__).parent / 'mock_mail'
-    mock_mail_dir.mkdir(exist_ok=True)
-
-    # Generate a unique file name based on the email subject
-    subject = email_message['Subject'].replace(" ", "_").replace("#", "").replace(":", "")
-    file_path = mock_mail_dir / f"{subject}.html"
-
-    # Write the HTML content to the file
-    with open(file_path, 'w', encoding='utf-8') as file:
-        file.write(email_message.get_content())
-
-    print(f"Mock email saved to {file_path}")
@@ -0,0 +1,170 @@
+import atexit
+import sqlite3
+import threading
+import time
+from email.message import EmailMessage
+from email.utils import make_msgid
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+from app.config import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    message_id TEXT NOT NULL UNIQUE,
+    created_at REAL NOT NULL,
+    email_from TEXT,
+    email_to TEXT,
+    subject TEXT,
+    body TEXT,
+    raw BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_email_to ON messages (email_to);
+"""
+
+
+class MailSink:
+    """Local store for emails sent in debug mode, an append-only SQLite database.
+
+    Messages are buffered in memory and written in one transaction once `batch_size` are
+    pending or `flush_interval` seconds after the first pending one, so sending an email costs
+    no filesystem call. Every message keeps a unique Message-ID, nothing is overwritten.
+    The database is in WAL mode, so several worker processes can share it.
+    """
+
+    def __init__(self, path: Path, batch_size: int = 100, flush_interval: float = 0.5):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: List[tuple] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        atexit.register(self.close)
+
+    def add(self, email_message: EmailMessage) -> str:
+        """Buffer an email, setting its Message-ID if it has none.
+
+        Args:
+            email_message (EmailMessage): The email to store.
+
+        Returns:
+            str: The Message-ID of the stored email.
+        """
+        if email_message["Message-ID"] is None:
+            email_message["Message-ID"] = make_msgid(domain="task-tracker.local")
+        message_id = email_message["Message-ID"]
+        row = (
+            message_id,
+            time.time(),
+            email_message["From"],
+            email_message["To"],
+            email_message["Subject"],
+            email_message.get_content(),
+            email_message.as_bytes(),
+        )
+
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return message_id
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO messages (message_id, created_at, email_from, email_to, subject, body, raw) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._pending
+            )
+        self._pending = []
+
+    def flush(self):
+        """Write the buffered emails now."""
+        with self._lock:
+            self._flush_locked()
+
+    def messages(
+            self,
+            email_to: Optional[str] = None,
+            subject: Optional[str] = None,
+            limit: Optional[int] = None
+    ) -> List[dict]:
+        """Return stored emails, oldest first, flushing the buffer before.
+
+        Args:
+            email_to (Optional[str]): Only emails to this address.
+            subject (Optional[str]): Only emails whose subject contains this text.
+            limit (Optional[int]): Maximum number of emails.
+
+        Returns:
+            List[dict]: The emails with `message_id`, `created_at`, `email_from`, `email_to`, `subject` and `body`.
+        """
+        query = "SELECT message_id, created_at, email_from, email_to, subject, body FROM messages WHERE 1 = 1"
+        params = []
+        if email_to is not None:
+            query += " AND email_to = ?"
+            params.append(email_to)
+        if subject is not None:
+            query += " AND subject LIKE ?"
+            params.append(f"%{subject}%")
+        query += " ORDER BY id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            self._flush_locked()
+            cursor = self._connection.execute(query, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def count(self) -> int:
+        """Return the number of stored emails, including buffered ones."""
+        with self._lock:
+            self._flush_locked()
+            return self._connection.execute("SELECT count(*) FROM messages").fetchone()[0]
+
+    def clear(self):
+        """Delete all stored and buffered emails."""
+        with self._lock:
+            self._pending = []
+            self._flush_locked()
+            with self._connection:
+                self._connection.execute("DELETE FROM messages")
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._connection.close()
+        atexit.unregister(self.close)
+
+
+@lru_cache(maxsize=1)
+def get_mail_sink() -> MailSink:
+    """Return the process-wide mail sink, stored in `MAIL_SINK_PATH`.
+
+    Returns:
+        MailSink: The shared sink.
+    """
+    return MailSink(
+        Path(settings.MAIL_SINK_PATH),
+        batch_size=settings.MAIL_SINK_BATCH_SIZE,
+        flush_interval=settings.MAIL_SINK_FLUSH_INTERVAL
+    )
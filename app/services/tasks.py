@@ -2,10 +2,8 @@ import smtplib
 from pydantic import EmailStr
 from app.config import settings
 from app.services.celery_app import celery
-from app.services.send_email.handler import (
-    create_status_change_mail_template,
-    mock_create_status_change_mail_template
-)
+from app.services.send_email.handler import create_status_change_mail_template
+from app.services.send_email.sink import get_mail_sink
 
 
 @celery.task
@@ -20,8 +18,8 @@ def send_task_update_status_email(email_to: EmailStr, task_data: dict):
     msg_message = create_status_change_mail_template(email_to=email_to, task_data=task_data)
 
     if settings.DEBUG:
-        # Save the email as an HTML file in 'mock_mail' when in debug mode
-        mock_create_status_change_mail_template(msg_message)
+        # Store the email in the local mail sink when in debug mode
+        get_mail_sink().add(msg_message)
     else:
         # Send the email via SMTP in production mode
         try:
@@ -1,12 +1,26 @@
-from sqlalchemy import insert, update, delete, select
+import asyncio
+from datetime import datetime
+from typing import FrozenSet, List, Optional
+
+from sqlalchemy import insert, update, delete, select, func, or_, literal, union, String, bindparam
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
 
-from app.dao.base import BaseDAO
+from app.dao.base import BaseDAO, statement_cache
 from app.database import async_session_maker
 from app.exceptions import TaskWasNotUpdatedException, TaskAlreadyExistsException, TaskCreationFailedException
+from app.tasks.fields import task_load_options
 from app.tasks.helpers import prepare_performers_data
-from app.tasks.models import Tasks, task_performers
+from app.tasks.models import (
+    Tasks,
+    TasksArchive,
+    TaskStats,
+    UserTaskSummary,
+    TaskStatus,
+    TaskPriority,
+    task_performers,
+    task_performers_archive
+)
 
 
 class TasksDAO(BaseDAO):
@@ -40,7 +54,7 @@ class TasksDAO(BaseDAO):
                 # Step 2: If performers are provided, associate them with the new task
                 if performers:
                     performers_data = await prepare_performers_data(new_task_id, performers)
-                    query = insert(task_performers).values(*performers_data)
+                    query = insert(task_performers).values(performers_data)
                     await session.execute(query)
 
                 # Step 3: Commit the transaction and return the new task with its performers
@@ -116,22 +130,400 @@ class TasksDAO(BaseDAO):
                 raise TaskWasNotUpdatedException
 
     @classmethod
-    async def find_task_by_id_join_performers(cls, task_id: int):
+    async def find_task_by_id_join_performers(
+            cls,
+            task_id: int,
+            include_archived: bool = False,
+            fields: Optional[FrozenSet[str]] = None
+    ):
         """
         Finds a task by its ID, including its performers.
 
         Args:
             task_id (int): ID of the task to be fetched.
+            include_archived (bool): Look the task up in the archive if it is not a live task.
+            fields (Optional[FrozenSet[str]]): Load only these response fields and their relationships.
 
         Returns:
-            Task object with its related performers if found, else None.
+            Task object (or archived task object) with its related performers if found, else None.
         """
         async with async_session_maker() as session:
             try:
                 # Step 1: Select the task and its associated performers using joinedload
-                query = select(cls.model).options(joinedload(cls.model.performers)).filter_by(id=task_id)
-                result = await session.execute(query)
-                return result.unique().scalar_one_or_none()
+                def build():
+                    if fields is None:
+                        options = (joinedload(cls.model.performers),)
+                    else:
+                        options = task_load_options(cls.model, fields)
+                    return select(cls.model).options(*options).where(cls.model.id == bindparam("task_id"))
+
+                query = statement_cache.get((cls, "find_task_by_id_join_performers", fields), build)
+                result = await session.execute(query, {"task_id": task_id})
+                task = result.unique().scalar_one_or_none()
+
+                # Step 2: Fall back to the archive, archived tasks keep their IDs
+                if task is None and include_archived:
+                    query = statement_cache.get(
+                        (cls, "find_archived_task_by_id", fields),
+                        lambda: (
+                            select(TasksArchive)
+                            .options(*task_load_options(TasksArchive, fields))
+                            .where(TasksArchive.id == bindparam("task_id"))
+                        )
+                    )
+                    result = await session.execute(query, {"task_id": task_id})
+                    task = result.unique().scalar_one_or_none()
+
+                return task
 
             except Exception:
                 raise TaskWasNotUpdatedException
+
+    @classmethod
+    async def find_all_tasks(cls, fields: Optional[FrozenSet[str]] = None) -> List[Tasks]:
+        """
+        Finds all tasks with the columns and relationships needed for `fields`.
+
+        Args:
+            fields (Optional[FrozenSet[str]]): Requested response fields, None for all of them.
+
+        Returns:
+            List of tasks, with performers and responsible user loaded when requested.
+        """
+        return await cls.find_all(options=task_load_options(cls.model, fields))
+
+    @classmethod
+    async def find_tasks_by_ids(cls, task_ids: List[int], fields: Optional[FrozenSet[str]] = None) -> List[Tasks]:
+        """
+        Finds tasks by a list of IDs in one query, keeping the order of `task_ids`.
+
+        Args:
+            task_ids (List[int]): IDs of the tasks, duplicates are ignored.
+            fields (Optional[FrozenSet[str]]): Requested response fields, None for all of them.
+
+        Returns:
+            List of the tasks found, with performers and responsible user loaded when requested.
+        """
+        unique_ids = list(dict.fromkeys(task_ids))
+        tasks = await cls.find_all(options=task_load_options(cls.model, fields), id=unique_ids)
+        tasks_by_id = {task.id: task for task in tasks}
+        return [tasks_by_id[task_id] for task_id in unique_ids if task_id in tasks_by_id]
+
+    @classmethod
+    async def search_tasks(
+            cls,
+            search_query: str,
+            limit: int,
+            offset: int,
+            fields: Optional[FrozenSet[str]] = None
+    ) -> List[Tasks]:
+        """
+        Full-text search over task title and description, ranked by relevance.
+        Matches the generated `search_vector` column and falls back to trigram
+        similarity on the title to cover prefix and typo matches.
+
+        Args:
+            search_query (str): Text to search for.
+            limit (int): Maximum number of tasks to return.
+            offset (int): Number of tasks to skip.
+            fields (Optional[FrozenSet[str]]): Requested response fields, None for all of them.
+
+        Returns:
+            List of matching tasks, with performers and responsible user loaded when requested.
+        """
+        ts_query = func.websearch_to_tsquery('english', search_query)
+        rank = func.greatest(
+            func.ts_rank_cd(cls.model.search_vector, ts_query),
+            func.word_similarity(search_query, cls.model.title)
+        )
+
+        async with async_session_maker() as session:
+            # Both conditions are served by GIN indexes, so Postgres combines them with a BitmapOr
+            query = (
+                select(cls.model)
+                .options(*task_load_options(cls.model, fields))
+                .where(or_(
+                    cls.model.search_vector.bool_op('@@')(ts_query),
+                    cls.model.title.bool_op('%')(search_query),
+                    literal(search_query, String).bool_op('<%')(cls.model.title),
+                ))
+                .order_by(rank.desc(), cls.model.id)
+                .limit(limit)
+                .offset(offset)
+            )
+            result = await session.execute(query)
+            return result.scalars().all()
+
+    @classmethod
+    async def find_user_tasks(
+            cls,
+            user_id: int,
+            limit: int,
+            before_id: Optional[int] = None,
+            status: Optional[TaskStatus] = None,
+            priority: Optional[TaskPriority] = None,
+            fields: Optional[FrozenSet[str]] = None
+    ) -> List[Tasks]:
+        """
+        Finds tasks where the user is responsible or a performer, newest first.
+        Uses keyset pagination on the task ID.
+
+        Args:
+            user_id (int): ID of the user.
+            limit (int): Maximum number of tasks to return.
+            before_id (Optional[int]): Return only tasks with an ID lower than this cursor.
+            status (Optional[TaskStatus]): Filter by task status.
+            priority (Optional[TaskPriority]): Filter by task priority.
+            fields (Optional[FrozenSet[str]]): Requested response fields, None for all of them.
+
+        Returns:
+            List of tasks, with performers and responsible user loaded when requested.
+        """
+        # Step 1: Collect task IDs from both sides, each served by its own index
+        responsible_ids = select(cls.model.id).where(cls.model.responsible_user_id == user_id)
+        performer_ids = select(task_performers.c.task_id).where(task_performers.c.user_id == user_id)
+        if status:
+            responsible_ids = responsible_ids.where(cls.model.status == status)
+        if before_id:
+            responsible_ids = responsible_ids.where(cls.model.id < before_id)
+            performer_ids = performer_ids.where(task_performers.c.task_id < before_id)
+
+        # Step 2: Load the page of tasks, applying the remaining filters
+        query = (
+            select(cls.model)
+            .options(*task_load_options(cls.model, fields))
+            .where(cls.model.id.in_(union(responsible_ids, performer_ids)))
+            .order_by(cls.model.id.desc())
+            .limit(limit)
+        )
+        if status:
+            query = query.where(cls.model.status == status)
+        if priority:
+            query = query.where(cls.model.priority == priority)
+
+        async with async_session_maker() as session:
+            result = await session.execute(query)
+            return result.scalars().all()
+
+    @classmethod
+    async def archive_completed_batch(cls, completed_before: datetime, batch_size: int) -> int:
+        """
+        Moves one batch of completed tasks, with their performers, into the archive tables.
+
+        Rows locked by other transactions are skipped, so the move never waits on user traffic.
+
+        Args:
+            completed_before (datetime): Archive completed tasks last updated before this moment.
+            batch_size (int): Maximum number of tasks to move.
+
+        Returns:
+            int: Number of tasks moved.
+        """
+        async with async_session_maker() as session:
+            # Step 1: Lock a batch of archival candidates
+            query = (
+                select(cls.model.id)
+                .where(cls.model.status == TaskStatus.COMPLETED, cls.model.updated_at < completed_before)
+                .order_by(cls.model.updated_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            task_ids = (await session.execute(query)).scalars().all()
+            if not task_ids:
+                return 0
+
+            # Step 2: Copy the tasks and their performers into the archive
+            columns = ['id', 'title', 'description', 'responsible_user_id', 'status', 'priority', 'created_at', 'updated_at']
+            await session.execute(
+                insert(TasksArchive).from_select(
+                    columns,
+                    select(*(getattr(cls.model, column) for column in columns)).where(cls.model.id.in_(task_ids))
+                )
+            )
+            await session.execute(
+                insert(task_performers_archive).from_select(
+                    ['task_id', 'user_id'],
+                    select(task_performers.c.task_id, task_performers.c.user_id)
+                    .where(task_performers.c.task_id.in_(task_ids))
+                )
+            )
+
+            # Step 3: Delete the live rows, performers follow through ON DELETE CASCADE
+            await session.execute(delete(cls.model).where(cls.model.id.in_(task_ids)))
+            await session.commit()
+            return len(task_ids)
+
+    @classmethod
+    def _selection_conditions(
+            cls,
+            ids: Optional[List[int]] = None,
+            status: Optional[TaskStatus] = None,
+            priority: Optional[TaskPriority] = None,
+            responsible_user_id: Optional[int] = None,
+            updated_before: Optional[datetime] = None
+    ) -> list:
+        """
+        Builds the conditions selecting tasks by IDs and filters, combined with AND.
+
+        Args:
+            ids (Optional[List[int]]): Only tasks with these IDs.
+            status (Optional[TaskStatus]): Only tasks with this status.
+            priority (Optional[TaskPriority]): Only tasks with this priority.
+            responsible_user_id (Optional[int]): Only tasks of this responsible user.
+            updated_before (Optional[datetime]): Only tasks last updated before this moment.
+
+        Returns:
+            list: Conditions for `where()`.
+        """
+        conditions = []
+        if ids is not None:
+            conditions.append(cls._list_filter(cls.model.id, ids))
+        if status is not None:
+            conditions.append(cls.model.status == status)
+        if priority is not None:
+            conditions.append(cls.model.priority == priority)
+        if responsible_user_id is not None:
+            conditions.append(cls.model.responsible_user_id == responsible_user_id)
+        if updated_before is not None:
+            conditions.append(cls.model.updated_at < updated_before)
+        return conditions
+
+    @classmethod
+    async def count_tasks(cls, **criteria) -> int:
+        """
+        Counts the tasks matching the given IDs and filters.
+
+        Args:
+            criteria: IDs and filters, as accepted by `_selection_conditions`.
+
+        Returns:
+            int: Number of matching tasks.
+        """
+        async with async_session_maker() as session:
+            query = select(func.count()).select_from(cls.model).where(*cls._selection_conditions(**criteria))
+            return (await session.execute(query)).scalar_one()
+
+    @classmethod
+    async def delete_tasks_batch(cls, batch_size: int, **criteria) -> int:
+        """
+        Deletes one batch of tasks matching the given IDs and filters, in its own short transaction.
+
+        Rows locked by other transactions are skipped, so the deletion never waits on user traffic.
+
+        Args:
+            batch_size (int): Maximum number of tasks to delete.
+            criteria: IDs and filters, as accepted by `_selection_conditions`.
+
+        Returns:
+            int: Number of tasks deleted.
+        """
+        conditions = cls._selection_conditions(**criteria)
+
+        async with async_session_maker() as session:
+            # Step 1: Lock a batch of matching tasks
+            query = (
+                select(cls.model.id)
+                .where(*conditions)
+                .order_by(cls.model.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            task_ids = list((await session.execute(query)).scalars().all())
+            if not task_ids:
+                return 0
+
+            # Step 2: Delete them, performers follow through ON DELETE CASCADE on the task_id index
+            await session.execute(delete(cls.model).where(cls._list_filter(cls.model.id, task_ids)))
+            await session.commit()
+            return len(task_ids)
+
+    @classmethod
+    async def delete_tasks_in_batches(
+            cls,
+            batch_size: int,
+            max_rows: Optional[int] = None,
+            locked_retries: int = 0,
+            retry_pause: float = 0,
+            **criteria
+    ) -> tuple[int, int]:
+        """
+        Deletes tasks matching `criteria`, batch by batch, each batch in its own transaction.
+
+        Batches skip rows locked by other transactions, so once a batch comes back empty the remaining
+        matches are counted and, up to `locked_retries` times, another pass is made after `retry_pause`.
+
+        Args:
+            batch_size (int): Maximum number of tasks per batch.
+            max_rows (Optional[int]): Maximum number of tasks to delete, unlimited if None.
+            locked_retries (int): Passes over matches left behind by locked rows.
+            retry_pause (float): Seconds before each such pass.
+            criteria: IDs and filters, as accepted by `_selection_conditions`.
+
+        Returns:
+            tuple[int, int]: Number of tasks deleted and number of matching tasks left.
+        """
+        deleted = 0
+        while True:
+            # Step 1: Delete batches until one comes back empty or the cap is reached
+            limit = batch_size if max_rows is None else min(batch_size, max_rows - deleted)
+            removed = await cls.delete_tasks_batch(limit, **criteria) if limit > 0 else 0
+            deleted += removed
+            if removed:
+                continue
+
+            # Step 2: Whatever still matches was locked by other requests, or is over the cap
+            remaining = await cls.count_tasks(**criteria)
+            if not remaining or limit <= 0 or locked_retries <= 0:
+                return deleted, remaining
+            locked_retries -= 1
+            await asyncio.sleep(retry_pause)
+
+    @classmethod
+    async def update_status_batch(
+            cls,
+            new_status: TaskStatus,
+            batch_size: int,
+            after_id: int = 0,
+            **criteria
+    ) -> List[int]:
+        """
+        Sets the status of the next batch of matching tasks, in ID order, in its own short transaction.
+
+        Args:
+            new_status (TaskStatus): The status to set.
+            batch_size (int): Maximum number of tasks to update.
+            after_id (int): Only tasks with a greater ID, the last ID of the previous batch.
+            criteria: IDs and filters, as accepted by `_selection_conditions`.
+
+        Returns:
+            List[int]: IDs of the tasks in the batch, empty once no matching task is left.
+        """
+        async with async_session_maker() as session:
+            # Step 1: Lock the next batch of matching tasks
+            query = (
+                select(cls.model.id)
+                .where(cls.model.id > after_id, *cls._selection_conditions(**criteria))
+                .order_by(cls.model.id)
+                .limit(batch_size)
+                .with_for_update()
+            )
+            task_ids = list((await session.execute(query)).scalars().all())
+            if not task_ids:
+                return []
+
+            # Step 2: Update the ones whose status differs, triggers keep the counters in step
+            await session.execute(
+                update(cls.model)
+                .where(cls._list_filter(cls.model.id, task_ids), cls.model.status != new_status)
+                .values(status=new_status)
+            )
+            await session.commit()
+            return task_ids
+
+
+class TaskStatsDAO(BaseDAO):
+    model = TaskStats
+
+
+class UserTaskSummaryDAO(BaseDAO):
+    model = UserTaskSummary
@@ -0,0 +1,91 @@
+from functools import lru_cache
+from typing import FrozenSet, List, Optional
+
+from fastapi import HTTPException, Query
+from pydantic import ConfigDict, TypeAdapter, create_model
+from sqlalchemy.orm import load_only, selectinload
+
+from app.exceptions import InvalidFieldsException
+from app.tasks.schemas import STasksResponse
+
+TASK_FIELDS: FrozenSet[str] = frozenset(STasksResponse.model_fields)
+RELATION_FIELDS: FrozenSet[str] = frozenset({"performers", "responsible_user"})
+
+
+def get_task_fields(
+    fields: Optional[str] = Query(
+        None,
+        description=f"Comma separated subset of task fields to return: {', '.join(sorted(TASK_FIELDS))}",
+        examples=["id,title,status,priority"]
+    )
+) -> Optional[FrozenSet[str]]:
+    """
+    Parse the `fields` query parameter of the task read endpoints.
+
+    Args:
+        fields (Optional[str]): Comma separated field names, `id` is always included.
+
+    Returns:
+        Optional[FrozenSet[str]]: The requested fields, or None for the full task.
+
+    Raises:
+        InvalidFieldsException: If an unknown field is requested.
+    """
+    if not fields:
+        return None
+
+    requested = frozenset(field.strip() for field in fields.split(",") if field.strip()) | {"id"}
+    unknown = requested - TASK_FIELDS
+    if unknown:
+        raise HTTPException(
+            status_code=InvalidFieldsException.status_code,
+            detail=f"{InvalidFieldsException.detail}: {', '.join(sorted(unknown))}"
+        )
+    return requested
+
+
+@lru_cache(maxsize=256)
+def task_load_options(model, fields: Optional[FrozenSet[str]] = None) -> tuple:
+    """
+    Loader options that fetch only what `fields` needs, skipping the relationship loads otherwise.
+
+    Cached, so the same field set always gives the same options and the DAO statement cache key stays stable.
+
+    Args:
+        model: The task model, `Tasks` or `TasksArchive`.
+        fields (Optional[FrozenSet[str]]): Requested fields, None for all of them.
+
+    Returns:
+        tuple: Options for `select(model).options(...)`.
+    """
+    fields = fields or TASK_FIELDS
+    columns = [getattr(model, field) for field in sorted(fields - RELATION_FIELDS)]
+    if "responsible_user" in fields:
+        columns.append(model.responsible_user_id)
+
+    relations = (selectinload(getattr(model, field)) for field in sorted(fields & RELATION_FIELDS))
+    return (load_only(*columns), *relations)
+
+
+@lru_cache(maxsize=256)
+def sparse_tasks_adapter(fields: FrozenSet[str]) -> TypeAdapter:
+    """
+    List adapter for a response model derived from `STasksResponse` with only `fields`.
+
+    Models are built once per distinct field set and cached.
+
+    Args:
+        fields (FrozenSet[str]): Requested fields.
+
+    Returns:
+        TypeAdapter: Adapter validating and dumping a list of the derived model.
+    """
+    model = create_model(
+        f"STasksResponse_{'_'.join(sorted(fields))}",
+        __config__=ConfigDict(from_attributes=True),
+        **{
+            name: (field.annotation, ...)
+            for name, field in STasksResponse.model_fields.items() if name in fields
+        }
+    )
+    return TypeAdapter(List[model])
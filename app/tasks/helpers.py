@@ -1,11 +1,45 @@
-from typing import List, Optional
+from typing import FrozenSet, List, Optional
 
-from pydantic import parse_obj_as
+from pydantic import TypeAdapter
 
-from app.tasks.models import Tasks
-from app.tasks.schemas import STasksResponse
+from app.tasks.fields import sparse_tasks_adapter
+from app.tasks.models import Tasks, TaskStats, TaskStatus, UserTaskSummary
+from app.tasks.schemas import STasksResponse, STasksStats, STasksSummary
 from app.users.dao import UsersDAO
 
+# Built once per process: validators and serializers are compiled on creation
+task_response_adapter = TypeAdapter(STasksResponse)
+tasks_response_adapter = TypeAdapter(List[STasksResponse])
+
+
+def serialize_task(task: Tasks, fields: Optional[FrozenSet[str]] = None) -> dict:
+    """Convert a task with loaded relations into response data ready for `ORJSONResponse`.
+
+    Args:
+        task (Tasks): The task object with responsible user and performers set.
+        fields (Optional[FrozenSet[str]]): Only include these fields, None for the full response.
+
+    Returns:
+        dict: The task in the `STasksResponse` shape, or its subset with `fields`.
+    """
+    if fields is not None:
+        return serialize_tasks([task], fields)[0]
+    return task_response_adapter.dump_python(task_response_adapter.validate_python(task, from_attributes=True))
+
+
+def serialize_tasks(tasks: List[Tasks], fields: Optional[FrozenSet[str]] = None) -> List[dict]:
+    """Convert a list of tasks with loaded relations into response data ready for `ORJSONResponse`.
+
+    Args:
+        tasks (List[Tasks]): The task objects with responsible user and performers set.
+        fields (Optional[FrozenSet[str]]): Only include these fields, None for the full response.
+
+    Returns:
+        List[dict]: The tasks in the `STasksResponse` shape, or its subset with `fields`.
+    """
+    adapter = tasks_response_adapter if fields is None else sparse_tasks_adapter(fields)
+    return adapter.dump_python(adapter.validate_python(tasks, from_attributes=True))
+
 
 async def add_responsible_and_performers_users_models_in_task_response(
         task: Tasks,
@@ -34,7 +68,7 @@ async def add_responsible_and_performers_users_models_in_task_response(
     task.performers = performers_list
 
     # Convert the task object to the response schema
-    result = parse_obj_as(STasksResponse, task)
+    result = task_response_adapter.validate_python(task, from_attributes=True)
 
     return result
 
@@ -62,3 +96,48 @@ async def prepare_performers_data(
     ]
 
     return performers_data
+
+
+def aggregate_task_stats(counters: List[TaskStats]) -> STasksStats:
+    """Fold the per-group task counters into totals by status, priority and responsible user.
+
+    Args:
+        counters (List[TaskStats]): Counter rows, one per (status, priority, responsible user) group.
+
+    Returns:
+        STasksStats: The aggregated task statistics.
+    """
+    stats = STasksStats()
+    for counter in counters:
+        if not counter.tasks_count:
+            continue
+        stats.total += counter.tasks_count
+        stats.by_status[counter.status] = stats.by_status.get(counter.status, 0) + counter.tasks_count
+        stats.by_priority[counter.priority] = stats.by_priority.get(counter.priority, 0) + counter.tasks_count
+        stats.by_responsible_user[counter.responsible_user_id] = (
+            stats.by_responsible_user.get(counter.responsible_user_id, 0) + counter.tasks_count
+        )
+    return stats
+
+
+def summarize_user_tasks(summary: Optional[UserTaskSummary]) -> STasksSummary:
+    """Shape the summary row of a user into counts by status, as responsible user and as performer.
+
+    Args:
+        summary (Optional[UserTaskSummary]): The summary row, None for a user without tasks.
+
+    Returns:
+        STasksSummary: The task counts of the user.
+    """
+    return STasksSummary(
+        responsible={
+            TaskStatus.TODO: summary.responsible_todo if summary else 0,
+            TaskStatus.IN_PROGRESS: summary.responsible_in_progress if summary else 0,
+            TaskStatus.COMPLETED: summary.responsible_completed if summary else 0,
+        },
+        performer={
+            TaskStatus.TODO: summary.performer_todo if summary else 0,
+            TaskStatus.IN_PROGRESS: summary.performer_in_progress if summary else 0,
+            TaskStatus.COMPLETED: summary.performer_completed if summary else 0,
+        },
+    )
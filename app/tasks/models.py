@@ -1,8 +1,9 @@
 import enum
 import datetime
 
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Index, DateTime, Table, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Index, DateTime, Table, Computed, func, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 
 from app.database import Base
 
@@ -23,7 +24,10 @@ task_performers = Table(
     'task_performers',
     Base.metadata,
     Column('task_id', Integer, ForeignKey('tasks.id', ondelete="CASCADE")),
-    Column('user_id', Integer, ForeignKey('users.id', ondelete="CASCADE"))
+    Column('user_id', Integer, ForeignKey('users.id', ondelete="CASCADE")),
+    Index('idx_task_performers_user_id_task_id', 'user_id', 'task_id'),
+    # Supports the ON DELETE CASCADE from tasks and lookups of a task's performers
+    Index('idx_task_performers_task_id', 'task_id')
 )
 
 
@@ -33,7 +37,8 @@ class Tasks(Base):
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False, unique=True)
     description = Column(String)
-    responsible_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    responsible_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    responsible_user = relationship("Users", foreign_keys=[responsible_user_id])
     performers = relationship("Users", secondary=task_performers, back_populates="tasks")
     status = Column(Enum(TaskStatus), nullable=False, default=TaskStatus.TODO)
     priority = Column(Enum(TaskPriority), nullable=False, default=TaskPriority.MEDIUM)
@@ -41,6 +46,70 @@ class Tasks(Base):
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
 
+    # Generated full-text search document, deferred so regular selects don't fetch it
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed("to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))", persisted=True)
+    ))
+
     __table_args__ = (
         Index('idx_tasks_status_priority', 'status', 'priority'),
+        Index('idx_tasks_responsible_user_id_status', 'responsible_user_id', 'status'),
+        Index('idx_tasks_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('idx_tasks_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
+        Index('idx_tasks_updated_at', 'updated_at'),
+        # Finds archival candidates without scanning the other statuses
+        Index(
+            'idx_tasks_completed_updated_at', 'updated_at',
+            postgresql_where=text("status = 'COMPLETED'")
+        ),
     )
+
+
+class TaskStats(Base):
+    """Task counters per (status, priority, responsible user), maintained by triggers on `tasks`."""
+    __tablename__ = "task_stats"
+
+    status = Column(Enum(TaskStatus), primary_key=True)
+    priority = Column(Enum(TaskPriority), primary_key=True)
+    responsible_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    tasks_count = Column(Integer, nullable=False, default=0)
+
+
+class UserTaskSummary(Base):
+    """Per-user task counts by role and status, maintained by triggers on `tasks` and `task_performers`."""
+    __tablename__ = "user_task_summary"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    responsible_todo = Column(Integer, nullable=False, default=0)
+    responsible_in_progress = Column(Integer, nullable=False, default=0)
+    responsible_completed = Column(Integer, nullable=False, default=0)
+    performer_todo = Column(Integer, nullable=False, default=0)
+    performer_in_progress = Column(Integer, nullable=False, default=0)
+    performer_completed = Column(Integer, nullable=False, default=0)
+
+
+task_performers_archive = Table(
+    'task_performers_archive',
+    Base.metadata,
+    Column('task_id', Integer, ForeignKey('tasks_archive.id', ondelete="CASCADE"), nullable=False, index=True),
+    Column('user_id', Integer, ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
+)
+
+
+class TasksArchive(Base):
+    """Completed tasks moved out of `tasks` by the archival job, same columns plus `archived_at`."""
+    __tablename__ = "tasks_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String, nullable=False)  # Not unique: live tasks may reuse an archived title
+    description = Column(String)
+    responsible_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    responsible_user = relationship("Users", foreign_keys=[responsible_user_id])
+    performers = relationship("Users", secondary=task_performers_archive, viewonly=True)
+    status = Column(Enum(TaskStatus), nullable=False)
+    priority = Column(Enum(TaskPriority), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+    archived_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -1,19 +1,38 @@
-from typing import Annotated, List
-
-from fastapi import APIRouter, Depends, Form
-from pydantic import parse_obj_as
-
-from app.services.tasks import send_task_update_status_email
-from app.tasks.dao import TasksDAO
-from app.tasks.helpers import add_responsible_and_performers_users_models_in_task_response
+from typing import Annotated, FrozenSet, List, Optional, Union
+
+from fastapi import APIRouter, Depends, Query, status
+
+from app.compression import CompressedRoute
+from app.config import settings
+from app.exceptions import TaskNotFoundException, TooManyTasksToDeleteException
+from app.jobs.handlers import TasksBulkDeleteHandler
+from app.jobs.runner import enqueue_job
+from app.jobs.schemas import SJobCreated
+from app.request_body import form_or_json, request_body_openapi
+from app.responses import ORJSONResponse
+from app.services.notifications import notify_task_status_changed
+from app.services.rate_limit import RateLimiter
+from app.tasks.dao import TasksDAO, TaskStatsDAO
+from app.tasks.fields import TASK_FIELDS, get_task_fields
+from app.tasks.helpers import (
+    add_responsible_and_performers_users_models_in_task_response,
+    aggregate_task_stats,
+    serialize_task,
+    serialize_tasks,
+    task_response_adapter
+)
 from app.tasks.models import Tasks
 from app.tasks.schemas import (
+    STasksBatchGet,
+    STasksBatchResponse,
+    STasksBulkDelete,
+    STasksBulkDeleteResult,
     STasksCreate,
     STasksResponse,
+    STasksStats,
     STasksUpdate,
     STasksStatusUpdate
 )
-from app.users.dao import UsersDAO
 from app.users.dependencies import (
     get_current_user,
     get_current_pm_user,
@@ -25,35 +44,96 @@ from app.users.models import Users
 router = APIRouter(
     prefix="/tasks",
     #tags=["Tasks"]
+    route_class=CompressedRoute
 )
 
 
-@router.get("", response_model=List[STasksResponse], tags=["Tasks Read"])
+@router.get(
+    "",
+    response_model=List[STasksResponse],
+    tags=["Tasks Read"],
+    dependencies=[Depends(RateLimiter(
+        "tasks:list",
+        capacity=settings.RATE_LIMIT_TASKS_LIST_CAPACITY,
+        refill_rate=settings.RATE_LIMIT_TASKS_LIST_REFILL_RATE
+    ))]
+)
 async def get_tasks(
+    fields: Optional[FrozenSet[str]] = Depends(get_task_fields),
     user: Users = Depends(get_current_user)
 ):
     """
     Retrieve all tasks.
 
     Args:
+        fields (Optional[FrozenSet[str]]): Return only these task fields.
         user (Users): The current user.
 
     Returns:
         List[STasksResponse]: A list of tasks.
     """
-    tasks: List[Tasks] = await TasksDAO.find_all()
-    tasks_list = []
-    for task in tasks:
-        task = await TasksDAO.find_task_by_id_join_performers(task.id)
-        task.responsible_user = await UsersDAO.find_by_id(task.responsible_user_id)
-        result = parse_obj_as(STasksResponse, task)
-        tasks_list.append(result)
-    return tasks_list
+    tasks: List[Tasks] = await TasksDAO.find_all_tasks(fields=fields)
+    return ORJSONResponse(serialize_tasks(tasks, fields))
+
+
+@router.get(
+    "/search",
+    response_model=List[STasksResponse],
+    tags=["Tasks Read"],
+    dependencies=[Depends(RateLimiter(
+        "tasks:search",
+        capacity=settings.RATE_LIMIT_TASKS_SEARCH_CAPACITY,
+        refill_rate=settings.RATE_LIMIT_TASKS_SEARCH_REFILL_RATE
+    ))]
+)
+async def search_tasks(
+    q: Annotated[str, Query(min_length=2, max_length=100)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    offset: Annotated[int, Query(ge=0)] = 0,
+    fields: Optional[FrozenSet[str]] = Depends(get_task_fields),
+    user: Users = Depends(get_current_user)
+):
+    """
+    Search tasks by title and description, most relevant first.
+
+    Args:
+        q (str): The search text.
+        limit (int): Maximum number of tasks to return.
+        offset (int): Number of tasks to skip.
+        fields (Optional[FrozenSet[str]]): Return only these task fields.
+        user (Users): The current user.
+
+    Returns:
+        List[STasksResponse]: A page of matching tasks.
+    """
+    tasks: List[Tasks] = await TasksDAO.search_tasks(q, limit=limit, offset=offset, fields=fields)
+    return ORJSONResponse(serialize_tasks(tasks, fields))
+
+
+@router.get("/stats", response_model=STasksStats, tags=["Tasks Read"])
+async def get_tasks_stats(
+    user: Users = Depends(get_current_pm_user)
+):
+    """
+    Retrieve task counts by status, priority and responsible user.
+
+    Archived tasks are counted along with the live ones.
+
+    Args:
+        user (Users): The current PM user.
+
+    Returns:
+        STasksStats: The aggregated task statistics.
+    """
+    counters = await TaskStatsDAO.find_all()
+    return aggregate_task_stats(counters)
 
 
 @router.get("/{task_id}", response_model=STasksResponse, tags=["Tasks Read"])
 async def get_task(
     task_id: int,
+    include_archived: bool = False,
+    fields: Optional[FrozenSet[str]] = Depends(get_task_fields),
     user: Users = Depends(get_current_user)
 ):
     """
@@ -61,20 +141,59 @@ async def get_task(
 
     Args:
         task_id (int): The ID of the task.
+        include_archived (bool): Also look the task up among archived completed tasks.
+        fields (Optional[FrozenSet[str]]): Return only these task fields.
         user (Users): The current user.
 
     Returns:
         STasksResponse: The details of the task.
+
+    Raises:
+        TaskNotFoundException: If the task does not exist.
     """
-    task: Tasks = await TasksDAO.find_task_by_id_join_performers(task_id)
-    task.responsible_user = await UsersDAO.find_by_id(task.responsible_user_id)
-    result = parse_obj_as(STasksResponse, task)
-    return result
+    task: Tasks = await TasksDAO.find_task_by_id_join_performers(
+        task_id,
+        include_archived=include_archived,
+        fields=fields or TASK_FIELDS
+    )
+    if task is None:
+        raise TaskNotFoundException
+    return ORJSONResponse(serialize_task(task, fields))
+
 
+@router.post("/batch-get", response_model=STasksBatchResponse, tags=["Tasks Read"])
+async def batch_get_tasks(
+    batch: STasksBatchGet,
+    fields: Optional[FrozenSet[str]] = Depends(get_task_fields),
+    user: Users = Depends(get_current_user)
+):
+    """
+    Retrieve several tasks by their IDs in one request.
+
+    Args:
+        batch (STasksBatchGet): The IDs of the tasks, up to 500.
+        fields (Optional[FrozenSet[str]]): Return only these task fields.
+        user (Users): The current user.
 
-@router.post("", response_model=STasksResponse, tags=["Tasks Create"])
+    Returns:
+        STasksBatchResponse: The found tasks in the requested order and the IDs that were not found.
+    """
+    tasks: List[Tasks] = await TasksDAO.find_tasks_by_ids(batch.ids, fields=fields)
+    found_ids = {task.id for task in tasks}
+    return ORJSONResponse({
+        "items": serialize_tasks(tasks, fields),
+        "missing_ids": [task_id for task_id in dict.fromkeys(batch.ids) if task_id not in found_ids]
+    })
+
+
+@router.post(
+    "",
+    response_model=STasksResponse,
+    tags=["Tasks Create"],
+    openapi_extra=request_body_openapi(STasksCreate)
+)
 async def create_task(
-    task_data: Annotated[STasksCreate, Form()],
+    task_data: Annotated[STasksCreate, Depends(form_or_json(STasksCreate))],
     user: Users = Depends(get_current_pm_user)
 ):
     """
@@ -93,13 +212,18 @@ async def create_task(
         task=new_task,
         performers_list=task_data.performers
     )
-    return result
+    return ORJSONResponse(task_response_adapter.dump_python(result))
 
 
-@router.put("/{task_id}", response_model=STasksResponse, tags=["Tasks Update"])
+@router.put(
+    "/{task_id}",
+    response_model=STasksResponse,
+    tags=["Tasks Update"],
+    openapi_extra=request_body_openapi(STasksUpdate)
+)
 async def update_task(
     task_id: int,
-    task_update_schema: Annotated[STasksUpdate, Form()],
+    task_update_schema: Annotated[STasksUpdate, Depends(form_or_json(STasksUpdate))],
     user: Users = Depends(get_pm_and_responsible_user)
 ):
     """
@@ -121,15 +245,20 @@ async def update_task(
     )
 
     if task.status != updated_task.status:
-        send_task_update_status_email.delay(result.responsible_user.email, result.dict())
+        await notify_task_status_changed(result.responsible_user.email, result.dict())
 
-    return result
+    return ORJSONResponse(task_response_adapter.dump_python(result))
 
 
-@router.put("/{task_id}/status", response_model=STasksResponse, tags=["Tasks Update"])
+@router.put(
+    "/{task_id}/status",
+    response_model=STasksResponse,
+    tags=["Tasks Update"],
+    openapi_extra=request_body_openapi(STasksStatusUpdate)
+)
 async def update_status_task(
     task_id: int,
-    task_status_schema: Annotated[STasksStatusUpdate, Form()],
+    task_status_schema: Annotated[STasksStatusUpdate, Depends(form_or_json(STasksStatusUpdate))],
     user: Users = Depends(get_pm_and_responsible_and_performers_user)
 ):
     """
@@ -151,9 +280,56 @@ async def update_status_task(
     )
 
     if task.status != updated_task.status:
-        send_task_update_status_email.delay(result.responsible_user.email, result.dict())
+        await notify_task_status_changed(result.responsible_user.email, result.dict())
+
+    return ORJSONResponse(task_response_adapter.dump_python(result))
 
-    return result
+
+@router.delete("", response_model=Union[STasksBulkDeleteResult, SJobCreated], tags=["Tasks Delete"])
+async def delete_tasks(
+    delete_schema: STasksBulkDelete,
+    user: Users = Depends(get_current_pm_user)
+):
+    """
+    Delete tasks by IDs or by filter, in short batches.
+
+    Without `background` at most `TASKS_DELETE_MAX_ROWS` tasks may match, and `remaining` counts the matches
+    left behind because other requests kept them locked. With `background` the deletion is queued as
+    a `tasks.bulk_delete` job and returned with `202`, its progress is available from `GET /jobs/{job_id}`.
+
+    Args:
+        delete_schema (STasksBulkDelete): The task IDs and filters, combined with AND.
+        user (Users): The current PM user.
+
+    Returns:
+        Union[STasksBulkDeleteResult, SJobCreated]: The numbers of deleted and remaining tasks, or the queued job.
+
+    Raises:
+        TooManyTasksToDeleteException: Too many tasks match for an inline deletion.
+    """
+    if delete_schema.background:
+        job = await enqueue_job(
+            TasksBulkDeleteHandler.kind,
+            delete_schema.model_dump(mode="json", exclude={"background"}),
+            user.id
+        )
+        return ORJSONResponse(
+            SJobCreated.model_validate(job).model_dump(mode="json"),
+            status_code=status.HTTP_202_ACCEPTED
+        )
+
+    criteria = delete_schema.criteria()
+    if await TasksDAO.count_tasks(**criteria) > settings.TASKS_DELETE_MAX_ROWS:
+        raise TooManyTasksToDeleteException
+
+    deleted, remaining = await TasksDAO.delete_tasks_in_batches(
+        settings.TASKS_DELETE_BATCH_SIZE,
+        max_rows=settings.TASKS_DELETE_MAX_ROWS,
+        locked_retries=settings.TASKS_DELETE_LOCKED_RETRIES,
+        retry_pause=settings.TASKS_DELETE_RETRY_PAUSE,
+        **criteria
+    )
+    return ORJSONResponse({"deleted": deleted, "remaining": remaining})
 
 
 @router.delete("/{task_id}", tags=["Tasks Delete"])
@@ -1,8 +1,8 @@
 from datetime import datetime
-from typing import Optional, List, Union
+from typing import Optional, List, Union, Dict
 
 from fastapi import Form
-from pydantic import BaseModel, Field, validator, field_validator
+from pydantic import BaseModel, Field, validator, field_validator, model_validator
 
 from app.tasks.models import TaskStatus, TaskPriority
 from app.users.schemas import SUsersResponse
@@ -21,13 +21,21 @@ class STasksCreate(BaseModel):
 
     @field_validator('performers', mode='before')
     def validate_performers(cls, v):
+        if v is None:
+            return v
+
         if isinstance(v, list):
-            performers_list = [
-                int(p.strip()) for item in v for p in item.split(',')
-                if p.strip().isdigit()
-            ]
-            if any(p == 0 for p in performers_list):
-                raise ValueError("Performer list contains invalid value: 0.")
+            performers_list = []
+            for item in v:
+                # JSON bodies send native ints, forms send comma separated strings
+                if isinstance(item, int) and not isinstance(item, bool):
+                    performers_list.append(item)
+                elif isinstance(item, str):
+                    performers_list.extend(int(p.strip()) for p in item.split(',') if p.strip().isdigit())
+                else:
+                    raise ValueError('Invalid type for performers field.')
+            if any(p <= 0 for p in performers_list):
+                raise ValueError("Performer IDs must be positive integers.")
             return performers_list
 
         # Raise an error if the value is of an unexpected type
@@ -49,6 +57,64 @@ class STasksResponse(BaseModel):
         from_attributes = True
 
 
+class STasksPage(BaseModel):
+    items: List[STasksResponse]
+    next_cursor: Optional[int] = None
+
+
+class STasksBatchGet(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=500)
+
+
+class STasksBatchResponse(BaseModel):
+    items: List[STasksResponse]
+    missing_ids: List[int]
+
+
+class STasksStats(BaseModel):
+    total: int = 0
+    by_status: Dict[TaskStatus, int] = {}
+    by_priority: Dict[TaskPriority, int] = {}
+    by_responsible_user: Dict[int, int] = {}
+
+
+class STasksSummary(BaseModel):
+    responsible: Dict[TaskStatus, int]
+    performer: Dict[TaskStatus, int]
+
+
+class STasksSelection(BaseModel):
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=10000)
+    status: Optional[TaskStatus] = None
+    priority: Optional[TaskPriority] = None
+    responsible_user_id: Optional[int] = Field(None, gt=0)
+    updated_before: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def validate_criteria(self):
+        """
+        Refuse selections without criteria, they would match every task.
+        """
+        if not self.criteria():
+            raise ValueError("Give task ids or at least one filter")
+        return self
+
+    def criteria(self) -> dict:
+        """
+        The IDs and filters, as keyword arguments of `TasksDAO.delete_tasks_batch`.
+        """
+        return self.model_dump(include=set(STasksSelection.model_fields), exclude_none=True)
+
+
+class STasksBulkDelete(STasksSelection):
+    background: bool = False
+
+
+class STasksBulkDeleteResult(BaseModel):
+    deleted: int
+    remaining: int
+
+
 class STasksUpdate(STasksCreate):
     title: str = None
     description: str = None
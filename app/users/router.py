@@ -1,12 +1,21 @@
-from typing import Annotated
+from typing import Annotated, FrozenSet, List, Optional
 
-from fastapi import APIRouter, Form, Depends, Response
+from fastapi import APIRouter, Depends, Response, Query
 
+from app.compression import CompressedRoute
 from app.config import settings
 from app.exceptions import (
     EmailOrPasswordIncorrectException,
     UserAlreadyExistsException
 )
+from app.request_body import form_or_json, request_body_openapi
+from app.responses import ORJSONResponse
+from app.services.rate_limit import RateLimiter
+from app.tasks.dao import TasksDAO, UserTaskSummaryDAO
+from app.tasks.fields import get_task_fields
+from app.tasks.helpers import serialize_tasks, summarize_user_tasks
+from app.tasks.models import Tasks, TaskStatus, TaskPriority
+from app.tasks.schemas import STasksPage, STasksSummary
 from app.users.auth import get_password_hash, authenticate_user, create_access_token
 from app.users.dao import UsersDAO
 from app.users.dependencies import get_current_user
@@ -18,9 +27,15 @@ router = APIRouter(
     tags=["Auth"]
 )
 
+me_router = APIRouter(
+    prefix="/users/me",
+    tags=["Users"],
+    route_class=CompressedRoute
+)
+
 
-@router.post("/register", response_model=SUsersResponse)
-async def register_user(user_data: Annotated[SUsersRegister, Form()]):
+@router.post("/register", response_model=SUsersResponse, openapi_extra=request_body_openapi(SUsersRegister))
+async def register_user(user_data: Annotated[SUsersRegister, Depends(form_or_json(SUsersRegister))]):
     """
     Register a new user.
 
@@ -48,8 +63,8 @@ async def register_user(user_data: Annotated[SUsersRegister, Form()]):
     return new_user
 
 
-@router.post("/login")
-async def login_user(response: Response, user_data: Annotated[SUsersLogin, Form()]):
+@router.post("/login", openapi_extra=request_body_openapi(SUsersLogin))
+async def login_user(response: Response, user_data: Annotated[SUsersLogin, Depends(form_or_json(SUsersLogin))]):
     """
     Authenticate a user and issue a JWT token.
 
@@ -95,3 +110,68 @@ async def read_users_me(current_user: Users = Depends(get_current_user)):
         Users: The details of the currently authenticated user.
     """
     return current_user
+
+
+@me_router.get(
+    "/tasks",
+    response_model=STasksPage,
+    dependencies=[Depends(RateLimiter(
+        "users:me:tasks",
+        capacity=settings.RATE_LIMIT_MY_TASKS_CAPACITY,
+        refill_rate=settings.RATE_LIMIT_MY_TASKS_REFILL_RATE
+    ))]
+)
+async def get_my_tasks(
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    cursor: Annotated[Optional[int], Query(gt=0)] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 50,
+    fields: Optional[FrozenSet[str]] = Depends(get_task_fields),
+    current_user: Users = Depends(get_current_user)
+):
+    """
+    Get the tasks where the current user is responsible or a performer.
+
+    Args:
+        status (Optional[TaskStatus]): Filter by task status.
+        priority (Optional[TaskPriority]): Filter by task priority.
+        cursor (Optional[int]): The `next_cursor` value from the previous page.
+        limit (int): Maximum number of tasks per page.
+        fields (Optional[FrozenSet[str]]): Return only these task fields.
+        current_user (Users): The currently authenticated user.
+
+    Returns:
+        STasksPage: A page of tasks and the cursor for the next page.
+    """
+    tasks: List[Tasks] = await TasksDAO.find_user_tasks(
+        current_user.id,
+        limit=limit + 1,  # Fetch one extra row to know whether there is a next page
+        before_id=cursor,
+        status=status,
+        priority=priority,
+        fields=fields
+    )
+    next_cursor = tasks[limit - 1].id if len(tasks) > limit else None
+    return ORJSONResponse({
+        "items": serialize_tasks(tasks[:limit], fields),
+        "next_cursor": next_cursor
+    })
+
+
+@me_router.get("/summary", response_model=STasksSummary)
+async def get_my_tasks_summary(
+    current_user: Users = Depends(get_current_user)
+):
+    """
+    Get the task counts of the current user by status, as responsible user and as performer.
+
+    Archived tasks are counted along with the live ones.
+
+    Args:
+        current_user (Users): The currently authenticated user.
+
+    Returns:
+        STasksSummary: The task counts of the current user.
+    """
+    summary = await UserTaskSummaryDAO.find_one_or_none(user_id=current_user.id)
+    return summarize_user_tasks(summary)
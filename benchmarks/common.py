@@ -0,0 +1,29 @@
+import subprocess
+from typing import List, Optional
+
+from app.config import settings
+
+# Every seeded user shares this password so the load test can log in as any of them
+BENCH_PASSWORD = "benchmark-password"
+BENCH_EMAIL_PREFIX = "bench_user_"
+
+
+def plain_dsn() -> str:
+    """Database DSN for asyncpg, without the SQLAlchemy driver suffix."""
+    return str(settings.db_url).replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+def current_commit() -> Optional[str]:
+    """Git commit of the working tree, so results can be compared across commits."""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(sorted_values: List[float], share: float) -> float:
+    """Nearest-rank percentile of already sorted values, `share` between 0 and 1."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(share * len(sorted_values)) - 1))
+    return sorted_values[index]
@@ -0,0 +1,43 @@
+"""
+Compare two benchmark result files produced by `benchmarks.load`.
+
+Usage:
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "queries_mean")
+
+
+def change(before, after) -> str:
+    if before in (None, 0) or after is None:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before, encoding="utf-8") as file:
+        before = json.load(file)
+    with open(args.after, encoding="utf-8") as file:
+        after = json.load(file)
+
+    print(f"{before.get('commit')} -> {after.get('commit')}")
+    print(f"{'scenario':<16}{'metric':<16}{'before':>12}{'after':>12}{'change':>10}")
+    for scenario in sorted(set(before["scenarios"]) | set(after["scenarios"])):
+        old = before["scenarios"].get(scenario, {})
+        new = after["scenarios"].get(scenario, {})
+        for metric in METRICS:
+            print(
+                f"{scenario:<16}{metric:<16}{str(old.get(metric)):>12}{str(new.get(metric)):>12}"
+                f"{change(old.get(metric), new.get(metric)):>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
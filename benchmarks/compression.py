@@ -0,0 +1,87 @@
+"""
+Response compression benchmark for task list responses.
+
+Serializes a task list the way `GET /tasks` does, then compresses it with every available
+encoding at a few levels and reports the compressed size, the CPU time per response and the
+estimated transfer time over a link of the given bandwidth, compressed vs. uncompressed.
+
+Usage:
+    python -m benchmarks.compression --tasks 10000 --repeat 5 --mbps 50
+"""
+import argparse
+import json
+import time
+from typing import Dict, List
+
+from app.compression import SUPPORTED_ENCODINGS, compress
+from app.config import settings
+from app.responses import ORJSONResponse
+from app.tasks.helpers import serialize_tasks
+from benchmarks.serialization import build_tasks
+
+# Levels tried per encoding, the configured one is added
+LEVELS: Dict[str, List[int]] = {
+    "gzip": [1, 6, 9],
+    "br": [1, 4, 6, 11],
+    "zstd": [1, 3, 9, 19],
+}
+LEVEL_SETTINGS = {
+    "gzip": "COMPRESSION_GZIP_LEVEL",
+    "br": "COMPRESSION_BROTLI_QUALITY",
+    "zstd": "COMPRESSION_ZSTD_LEVEL",
+}
+
+
+def transfer_ms(size: int, mbps: float) -> float:
+    return size * 8 / (mbps * 1_000_000) * 1000
+
+
+def measure(body: bytes, encoding: str, level: int, repeat: int, mbps: float) -> dict:
+    setattr(settings, LEVEL_SETTINGS[encoding], level)
+    cpu_times = []
+    compressed = b""
+    for _ in range(repeat):
+        start = time.process_time()
+        compressed = compress(body, encoding)
+        cpu_times.append(time.process_time() - start)
+    cpu_ms = min(cpu_times) * 1000
+    return {
+        "encoding": encoding,
+        "level": level,
+        "bytes": len(compressed),
+        "ratio": round(len(body) / len(compressed), 2),
+        "cpu_ms": round(cpu_ms, 2),
+        "transfer_ms": round(transfer_ms(len(compressed), mbps), 2),
+        # What the client waits for the body, compression plus transfer, ignoring decompression
+        "total_ms": round(cpu_ms + transfer_ms(len(compressed), mbps), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mbps", type=float, default=50, help="Client bandwidth in megabits per second")
+    args = parser.parse_args()
+
+    body = ORJSONResponse(serialize_tasks(build_tasks(args.tasks))).body
+    configured = {encoding: getattr(settings, name) for encoding, name in LEVEL_SETTINGS.items()}
+
+    results = []
+    for encoding in SUPPORTED_ENCODINGS:
+        for level in sorted({*LEVELS[encoding], configured[encoding]}):
+            results.append(measure(body, encoding, level, args.repeat, args.mbps))
+    for encoding, level in configured.items():
+        setattr(settings, LEVEL_SETTINGS[encoding], level)
+
+    print(json.dumps({
+        "tasks": args.tasks,
+        "mbps": args.mbps,
+        "uncompressed": {"bytes": len(body), "transfer_ms": round(transfer_ms(len(body), args.mbps), 2)},
+        "configured_levels": configured,
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
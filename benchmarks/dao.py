@@ -0,0 +1,106 @@
+"""
+DAO throughput benchmark: calls per second of the hot DAO queries against the configured database.
+
+Runs each DAO call from `--concurrency` coroutines for `--duration` seconds and reports calls per
+second, latency percentiles and the statement cache counters, including the SQLAlchemy compiled cache
+hit ratio. Needs a database seeded by `benchmarks.seed`.
+
+Usage:
+    python -m benchmarks.dao --concurrency 8 --duration 10 --out dao.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from app.dao.base import statement_cache
+from app.database import compiled_cache_stats, dispose_engines, get_compiled_cache_status, init_engines
+from app.tasks.dao import TasksDAO
+from app.users.dao import UsersDAO
+from benchmarks.common import current_commit, percentile
+from benchmarks.load import load_fixtures
+
+
+def build_calls(fixtures: dict) -> Dict[str, Callable[[], Awaitable]]:
+    task_ids, user_ids, emails = fixtures["task_ids"], fixtures["user_ids"], fixtures["emails"]
+    return {
+        "users_find_by_id": lambda: UsersDAO.find_by_id(random.choice(user_ids)),
+        "users_find_one_or_none": lambda: UsersDAO.find_one_or_none(email=random.choice(emails)),
+        # Different list lengths every call, the `= ANY` array parameter keeps one statement
+        "users_find_all_ids": lambda: UsersDAO.find_all(id=random.sample(user_ids, random.randint(1, 20))),
+        "tasks_find_by_id": lambda: TasksDAO.find_by_id(random.choice(task_ids)),
+        "tasks_find_join_performers": lambda: TasksDAO.find_task_by_id_join_performers(random.choice(task_ids)),
+    }
+
+
+async def measure(call: Callable[[], Awaitable], concurrency: int, duration: float) -> dict:
+    latencies: List[float] = []
+    hits, misses = compiled_cache_stats.hits, compiled_cache_stats.misses
+
+    async def worker(deadline: float):
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.monotonic()
+    await asyncio.gather(*(worker(start + duration) for _ in range(concurrency)))
+    elapsed = time.monotonic() - start
+
+    latencies.sort()
+    hits, misses = compiled_cache_stats.hits - hits, compiled_cache_stats.misses - misses
+    return {
+        "calls": len(latencies),
+        "calls_per_second": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "compiled_cache_hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+    }
+
+
+async def run(concurrency: int, duration: float, warmup: float, only: List[str]) -> dict:
+    fixtures = await load_fixtures()
+    init_engines()
+    calls = build_calls(fixtures)
+    if only:
+        calls = {name: call for name, call in calls.items() if name in only}
+
+    results = {}
+    try:
+        for name, call in calls.items():
+            if warmup:
+                await measure(call, concurrency, warmup)
+            results[name] = await measure(call, concurrency, duration)
+        status = {**get_compiled_cache_status(), **statement_cache.status()}
+    finally:
+        await dispose_engines()
+
+    return {
+        "commit": current_commit(),
+        "config": {"concurrency": concurrency, "duration": duration},
+        "calls": results,
+        "statement_cache": status,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--only", nargs="*", default=[], help="Run only these calls")
+    parser.add_argument("--out", help="Write the JSON results to this file as well")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.concurrency, args.duration, args.warmup, args.only))
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as file:
+            file.write(output)
+
+
+if __name__ == "__main__":
+    main()
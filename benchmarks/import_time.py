@@ -0,0 +1,65 @@
+"""
+Import-time budget for the API.
+
+Imports `app.main` in a fresh interpreter with `python -X importtime`, reports the
+slowest modules and fails when the total exceeds the budget or when modules that
+must stay lazy (Celery, SMTP, Jinja2, Redis, the database driver) get imported.
+
+Usage:
+    python -m benchmarks.import_time --budget-ms 1500
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+# Loaded on first use only: notifications, the broker and the database engine
+LAZY_MODULES = ("celery", "smtplib", "jinja2", "redis", "asyncpg")
+
+
+def measure(module: str) -> list:
+    """Return (cumulative_us, self_us, name) for every module imported by `module`."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    imports = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        imports.append((int(cumulative_us), int(self_us), name.strip()))
+    return imports
+
+
+def lazy_violations(imports: list) -> list:
+    """Return the names of imported modules that belong to `LAZY_MODULES`."""
+    return sorted({name for _, _, name in imports if name.split(".")[0] in LAZY_MODULES})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    imports = measure(args.module)
+    total_ms = next(cumulative for cumulative, _, name in imports if name == args.module) / 1000
+    slowest = sorted(imports, key=lambda item: item[1], reverse=True)[:args.top]
+    violations = lazy_violations(imports)
+
+    print(json.dumps({
+        "module": args.module,
+        "total_ms": round(total_ms, 1),
+        "budget_ms": args.budget_ms,
+        "slowest_self_ms": {name: round(self_us / 1000, 1) for _, self_us, name in slowest},
+        "lazy_violations": violations,
+    }, indent=2))
+
+    if total_ms > args.budget_ms or violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Drive the API at a fixed concurrency and report throughput, latency percentiles and query counts.
+
+Needs a running API (with Postgres and Redis) seeded by `benchmarks.seed`. Each worker
+logs in as a seeded PM user and loops over a weighted mix of scenarios for the given
+duration. Query counts come from the API's `Server-Timing` header.
+
+Usage:
+    python -m benchmarks.load --base-url http://127.0.0.1:8000 --concurrency 32 --duration 30 --out results.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List
+
+import asyncpg
+import httpx
+
+from benchmarks.common import BENCH_EMAIL_PREFIX, BENCH_PASSWORD, current_commit, percentile, plain_dsn
+
+QUERIES_RE = re.compile(r"queries=(\d+)")
+
+# Scenario name -> weight in the request mix
+DEFAULT_MIX = {
+    "list_tasks": 1,
+    "get_task": 10,
+    "update_status": 3,
+    "login": 1,
+    "create_task": 1,
+}
+STATUSES = ["TODO", "In progress", "Done"]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.queries: Dict[str, List[int]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, scenario: str, response: httpx.Response, elapsed: float):
+        self.latencies[scenario].append(elapsed)
+        if response.status_code >= 400:
+            self.errors[scenario] += 1
+        match = QUERIES_RE.search(response.headers.get("server-timing", ""))
+        if match:
+            self.queries[scenario].append(int(match.group(1)))
+
+    def summary(self, duration: float) -> dict:
+        scenarios = {}
+        for scenario, latencies in self.latencies.items():
+            latencies.sort()
+            queries = self.queries[scenario]
+            scenarios[scenario] = {
+                "requests": len(latencies),
+                "errors": self.errors[scenario],
+                "throughput_rps": round(len(latencies) / duration, 2),
+                "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+                "queries_mean": round(sum(queries) / len(queries), 2) if queries else None,
+            }
+        total = sum(len(latencies) for latencies in self.latencies.values())
+        return {
+            "total_requests": total,
+            "total_errors": sum(self.errors.values()),
+            "throughput_rps": round(total / duration, 2),
+            "scenarios": scenarios,
+        }
+
+
+async def load_fixtures() -> dict:
+    """Seeded task ids and user emails to build requests from."""
+    connection = await asyncpg.connect(plain_dsn())
+    try:
+        task_ids = [row["id"] for row in await connection.fetch("SELECT id FROM tasks ORDER BY random() LIMIT 5000")]
+        users = await connection.fetch(
+            "SELECT id, email, role::text AS role FROM users WHERE email LIKE $1 ORDER BY id",
+            f"{BENCH_EMAIL_PREFIX}%"
+        )
+    finally:
+        await connection.close()
+
+    pm_emails = [user["email"] for user in users if user["role"] == "PM"]
+    if not task_ids or not pm_emails:
+        raise SystemExit("No benchmark data found, run `python -m benchmarks.seed` first")
+    return {
+        "task_ids": task_ids,
+        "user_ids": [user["id"] for user in users],
+        "emails": [user["email"] for user in users],
+        "pm_emails": pm_emails,
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: str, fixtures: dict) -> httpx.Response:
+    if scenario == "list_tasks":
+        return await client.get("/tasks")
+    if scenario == "get_task":
+        return await client.get(f"/tasks/{random.choice(fixtures['task_ids'])}")
+    if scenario == "update_status":
+        return await client.put(
+            f"/tasks/{random.choice(fixtures['task_ids'])}/status",
+            json={"status": random.choice(STATUSES)}
+        )
+    if scenario == "login":
+        # A separate client so the worker keeps its own session cookie
+        async with httpx.AsyncClient(base_url=client.base_url) as login_client:
+            return await login_client.post(
+                "/auth/login", json={"email": random.choice(fixtures["emails"]), "password": BENCH_PASSWORD}
+            )
+    if scenario == "create_task":
+        return await client.post("/tasks", json={
+            "title": f"Load task {uuid.uuid4().hex}",
+            "description": "Created by the benchmark load test",
+            "status": "TODO",
+            "priority": "Medium",
+            "responsible_user_id": random.choice(fixtures["user_ids"]),
+            "performers": random.sample(fixtures["user_ids"], min(2, len(fixtures["user_ids"]))),
+        })
+    raise ValueError(f"Unknown scenario {scenario}")
+
+
+async def worker(base_url: str, fixtures: dict, mix: Dict[str, int], deadline: float, recorder: Recorder):
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        response = await client.post(
+            "/auth/login", json={"email": random.choice(fixtures["pm_emails"]), "password": BENCH_PASSWORD}
+        )
+        response.raise_for_status()
+
+        scenarios, weights = list(mix), list(mix.values())
+        while time.monotonic() < deadline:
+            scenario = random.choices(scenarios, weights=weights)[0]
+            start = time.perf_counter()
+            response = await run_scenario(client, scenario, fixtures)
+            recorder.record(scenario, response, time.perf_counter() - start)
+
+
+async def run(base_url: str, concurrency: int, duration: float, warmup: float, mix: Dict[str, int]) -> dict:
+    fixtures = await load_fixtures()
+
+    if warmup:
+        await asyncio.gather(*(
+            worker(base_url, fixtures, mix, time.monotonic() + warmup, Recorder()) for _ in range(concurrency)
+        ))
+
+    recorder = Recorder()
+    start = time.monotonic()
+    await asyncio.gather(*(
+        worker(base_url, fixtures, mix, start + duration, recorder) for _ in range(concurrency)
+    ))
+    elapsed = time.monotonic() - start
+
+    return {
+        "commit": current_commit(),
+        "config": {"base_url": base_url, "concurrency": concurrency, "duration": duration, "mix": mix},
+        **recorder.summary(elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--mix", type=json.loads, default=DEFAULT_MIX, help='JSON weights, e.g. \'{"get_task": 1}\'')
+    parser.add_argument("--out", help="Write the JSON results to this file as well")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.base_url, args.concurrency, args.duration, args.warmup, args.mix))
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as file:
+            file.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Seed the database with benchmark users and tasks using COPY.
+
+Users are `bench_user_<n>@example.com` with a shared password, about 5% of them PMs.
+Each task gets a responsible user and a performer fan-out drawn from a skewed
+distribution (most tasks have 1-3 performers, a few have many).
+
+Usage:
+    python -m benchmarks.seed --users 1000 --tasks 100000 --truncate
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import asyncpg
+
+from app.users.auth import get_password_hash
+from benchmarks.common import BENCH_EMAIL_PREFIX, BENCH_PASSWORD, plain_dsn
+
+ROLES = ["PM", "DEV", "QA"]
+STATUSES = ["TODO", "IN_PROGRESS", "COMPLETED"]
+PRIORITIES = ["LOW", "MEDIUM", "HIGH"]
+WORDS = (
+    "api deploy billing search login report export import invoice dashboard cache queue "
+    "migration index backup alert metrics onboarding checkout payment refund profile"
+).split()
+
+
+def performer_count(max_performers: int) -> int:
+    """Skewed fan-out: geometric around 2, capped."""
+    count = 0
+    while count < max_performers and random.random() < 0.65:
+        count += 1
+    return count
+
+
+async def seed(users: int, tasks: int, max_performers: int, truncate: bool, seed_value: int):
+    random.seed(seed_value)
+    connection = await asyncpg.connect(plain_dsn())
+    try:
+        if truncate:
+            await connection.execute("TRUNCATE users, tasks, task_performers RESTART IDENTITY CASCADE")
+
+        first_user_id = await connection.fetchval("SELECT coalesce(max(id), 0) + 1 FROM users")
+        first_task_id = await connection.fetchval("SELECT coalesce(max(id), 0) + 1 FROM tasks")
+
+        # Hashing once keeps seeding fast, bcrypt per user would dominate the run
+        password_hash = get_password_hash(BENCH_PASSWORD)
+        user_ids = list(range(first_user_id, first_user_id + users))
+        user_rows = [
+            (
+                user_id, f"Bench{user_id}", "User", f"{BENCH_EMAIL_PREFIX}{user_id}@example.com", password_hash,
+                "PM" if i % 20 == 0 else random.choice(ROLES[1:])
+            )
+            for i, user_id in enumerate(user_ids)
+        ]
+
+        task_rows = []
+        performer_rows = []
+        for task_id in range(first_task_id, first_task_id + tasks):
+            words = " ".join(random.sample(WORDS, 3))
+            task_rows.append((
+                task_id,
+                f"Bench task {task_id} {words}",
+                f"Benchmark task {task_id} about {words}",
+                random.choice(user_ids),
+                random.choices(STATUSES, weights=[5, 3, 2])[0],
+                random.choices(PRIORITIES, weights=[2, 5, 3])[0],
+            ))
+            for user_id in random.sample(user_ids, min(performer_count(max_performers), len(user_ids))):
+                performer_rows.append((task_id, user_id))
+
+        start = time.perf_counter()
+        async with connection.transaction():
+            await connection.copy_records_to_table(
+                "users", records=user_rows, columns=["id", "name", "surname", "email", "password", "role"]
+            )
+            await connection.copy_records_to_table(
+                "tasks", records=task_rows,
+                columns=["id", "title", "description", "responsible_user_id", "status", "priority"]
+            )
+            await connection.copy_records_to_table(
+                "task_performers", records=performer_rows, columns=["task_id", "user_id"]
+            )
+            # Rows were copied with explicit ids, move the sequences past them
+            await connection.execute("SELECT setval('users_id_seq', (SELECT max(id) FROM users))")
+            await connection.execute("SELECT setval('tasks_id_seq', (SELECT max(id) FROM tasks))")
+        await connection.execute("ANALYZE users, tasks, task_performers")
+
+        print(
+            f"Seeded {len(user_rows)} users, {len(task_rows)} tasks and {len(performer_rows)} performers "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+    finally:
+        await connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--max-performers", type=int, default=10)
+    parser.add_argument("--truncate", action="store_true", help="Remove all users and tasks first")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, for reproducible datasets")
+    args = parser.parse_args()
+    asyncio.run(seed(args.users, args.tasks, args.max_performers, args.truncate, args.seed))
+
+
+if __name__ == "__main__":
+    main()
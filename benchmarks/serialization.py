@@ -0,0 +1,93 @@
+"""
+Serialization benchmark for task list responses.
+
+Compares the previous response path (`parse_obj_as` per task, FastAPI re-validating
+against `response_model`, stdlib json) with the cached `TypeAdapter` + orjson path.
+
+Usage:
+    python -m benchmarks.serialization --tasks 10000 --repeat 5
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Callable, List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter, parse_obj_as
+
+from app.responses import ORJSONResponse
+from app.tasks.helpers import serialize_tasks
+from app.tasks.models import TaskStatus, TaskPriority
+from app.tasks.schemas import STasksResponse
+from app.users.models import Roles
+
+
+def build_tasks(count: int, performers_per_task: int = 3) -> List[SimpleNamespace]:
+    """Build ORM-like task objects with nested users, without touching the database."""
+    now = datetime.now(timezone.utc)
+    users = [
+        SimpleNamespace(id=i, name=f"User{i}", email=f"user{i}@example.com", role=Roles.DEV.value)
+        for i in range(1, 51)
+    ]
+    return [
+        SimpleNamespace(
+            id=i,
+            title=f"Task {i}",
+            description=f"Description of task number {i}",
+            status=TaskStatus.IN_PROGRESS,
+            priority=TaskPriority.HIGH,
+            responsible_user=users[i % len(users)],
+            performers=[users[(i + j) % len(users)] for j in range(performers_per_task)],
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_path(tasks: List[SimpleNamespace]) -> bytes:
+    """parse_obj_as per task, then the response_model round-trip FastAPI performs, then stdlib json."""
+    results = [parse_obj_as(STasksResponse, task) for task in tasks]
+    response_field = TypeAdapter(List[STasksResponse])
+    content = response_field.validate_python([result.model_dump() for result in results])
+    return JSONResponse(response_field.dump_python(content, mode="json")).body
+
+
+def fast_path(tasks: List[SimpleNamespace]) -> bytes:
+    """Cached adapters, no second validation, orjson rendering."""
+    return ORJSONResponse(serialize_tasks(tasks)).body
+
+
+def measure(fn: Callable, tasks: List[SimpleNamespace], repeat: int) -> dict:
+    timings = []
+    body = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(tasks)
+        timings.append(time.perf_counter() - start)
+    return {"best_ms": round(min(timings) * 1000, 2), "mean_ms": round(sum(timings) / repeat * 1000, 2), "bytes": len(body)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tasks = build_tasks(args.tasks)
+    fast_path(tasks[:10])  # Warm up the adapters
+
+    legacy = measure(legacy_path, tasks, args.repeat)
+    fast = measure(fast_path, tasks, args.repeat)
+    print(json.dumps({
+        "tasks": args.tasks,
+        "legacy": legacy,
+        "fast": fast,
+        "speedup": round(legacy["best_ms"] / fast["best_ms"], 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
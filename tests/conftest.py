@@ -0,0 +1,85 @@
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import asyncpg
+import pytest
+
+# The tests get a database of their own, created and migrated here and dropped at the end, so the
+# app has to be pointed at it before `app.config` is first imported
+os.environ["POSTGRES_DB"] = os.environ.get("TEST_POSTGRES_DB", "tasktracker_test")
+
+from sqlalchemy import text  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.database import Base, async_session_maker, dispose_engines  # noqa: E402
+# Registers the jobs table in the metadata `clean_tables` empties
+from app.jobs.models import Jobs  # noqa: E402, F401
+from app.users.dao import UsersDAO  # noqa: E402
+from app.users.models import Roles, Users  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+async def _admin_execute(*statements: str):
+    """Run statements on the `postgres` maintenance database, outside of a transaction."""
+    connection = await asyncpg.connect(
+        host=settings.POSTGRES_HOST,
+        port=settings.POSTGRES_PORT,
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        database="postgres",
+        timeout=5
+    )
+    try:
+        for statement in statements:
+            await connection.execute(statement)
+    finally:
+        await connection.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """Create the test database, migrate it to head and drop it after the session."""
+    name = settings.POSTGRES_DB
+    try:
+        asyncio.run(_admin_execute(f'DROP DATABASE IF EXISTS "{name}"', f'CREATE DATABASE "{name}"'))
+    except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+        pytest.skip(f"Postgres at {settings.POSTGRES_HOST}:{settings.POSTGRES_PORT} is not available: {e}")
+
+    # Migrated the way deployments do it, in a process with an event loop of its own
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=ROOT, check=True)
+    yield name
+    asyncio.run(_admin_execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+
+
+@pytest.fixture(autouse=True)
+async def clean_tables():
+    """Empty every table after a test, and close the pooled connections of its event loop."""
+    yield
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    async with async_session_maker() as session:
+        await session.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+        await session.commit()
+    await dispose_engines()
+
+
+@pytest.fixture
+def create_user():
+    """Factory inserting users with unique emails."""
+    counter = 0
+
+    async def create(role: Roles = Roles.DEV) -> Users:
+        nonlocal counter
+        counter += 1
+        return await UsersDAO.create(
+            name=f"User{counter}",
+            surname="Test",
+            email=f"user{counter}@example.com",
+            password="hashed",
+            role=role
+        )
+
+    return create
@@ -0,0 +1,18 @@
+import pytest
+
+from benchmarks.import_time import lazy_violations, measure
+
+
+@pytest.fixture(scope="module")
+def database():
+    """No database needed, the import runs in a subprocess."""
+
+
+@pytest.fixture
+def clean_tables():
+    """Nothing to clean."""
+
+
+def test_app_import_keeps_heavy_modules_lazy():
+    # The time budget is left to `python -m benchmarks.import_time`, it depends on the machine
+    assert lazy_violations(measure("app.main")) == []
@@ -0,0 +1,111 @@
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy import func, select, update
+
+from app.database import async_session_maker
+from app.jobs.dao import JobsDAO
+from app.jobs.handlers import TasksBulkDeleteHandler
+from app.jobs.models import Jobs, JobStatus
+from app.jobs.runner import run_job_chunks
+from app.tasks.dao import TasksDAO
+from app.tasks.models import Tasks
+from app.users.models import Roles
+
+STALE_AFTER = timedelta(minutes=10)
+
+
+async def set_job(job_id: int, status: JobStatus, idle: timedelta = timedelta(0)):
+    """Put a job in `status`, last updated `idle` ago."""
+    async with async_session_maker() as session:
+        await session.execute(
+            update(Jobs).where(Jobs.id == job_id).values(status=status, updated_at=func.now() - idle)
+        )
+        await session.commit()
+
+
+async def test_concurrent_deliveries_claim_a_job_once():
+    job = await JobsDAO.create_job(TasksBulkDeleteHandler.kind, {"ids": [1]})
+
+    claims = await asyncio.gather(*(JobsDAO.start_job(job.id, STALE_AFTER) for _ in range(5)))
+
+    assert len([claim for claim in claims if claim is not None]) == 1
+    job = await JobsDAO.find_by_id(job.id)
+    assert (job.status, job.attempts) == (JobStatus.RUNNING, 1)
+
+
+async def test_running_job_is_taken_over_only_when_stale():
+    job = await JobsDAO.create_job(TasksBulkDeleteHandler.kind, {"ids": [1]})
+    await set_job(job.id, JobStatus.RUNNING)
+
+    assert await JobsDAO.start_job(job.id, STALE_AFTER) is None
+
+    await set_job(job.id, JobStatus.RUNNING, idle=STALE_AFTER * 2)
+    assert await JobsDAO.start_job(job.id, STALE_AFTER) is not None
+
+
+async def test_finished_jobs_are_not_started():
+    job = await JobsDAO.create_job(TasksBulkDeleteHandler.kind, {"ids": [1]})
+
+    for status in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+        await set_job(job.id, status, idle=STALE_AFTER * 2)
+        assert await JobsDAO.start_job(job.id, STALE_AFTER) is None
+
+
+async def test_reset_picks_up_failed_and_stale_jobs():
+    job = await JobsDAO.create_job(TasksBulkDeleteHandler.kind, {"ids": [1]})
+
+    # A fresh pending job is still queued
+    assert await JobsDAO.reset_job(job.id, STALE_AFTER) is None
+
+    for status in (JobStatus.PENDING, JobStatus.RUNNING):
+        await set_job(job.id, status, idle=STALE_AFTER * 2)
+        assert (await JobsDAO.reset_job(job.id, STALE_AFTER)).status == JobStatus.PENDING
+
+    await set_job(job.id, JobStatus.FAILED)
+    assert (await JobsDAO.reset_job(job.id, STALE_AFTER)).status == JobStatus.PENDING
+
+    await set_job(job.id, JobStatus.SUCCEEDED, idle=STALE_AFTER * 2)
+    assert await JobsDAO.reset_job(job.id, STALE_AFTER) is None
+
+
+async def test_bulk_delete_job_runs_in_chunks(create_user, monkeypatch):
+    monkeypatch.setattr("app.jobs.handlers.settings.TASKS_DELETE_BATCH_SIZE", 2)
+    monkeypatch.setattr("app.jobs.runner.settings.JOBS_CHUNK_PAUSE", 0)
+    pm = await create_user(Roles.PM)
+    for number in range(5):
+        await TasksDAO.add_task_and_performers(title=f"Task {number}", description="", responsible_user_id=pm.id)
+    job = await JobsDAO.create_job(TasksBulkDeleteHandler.kind, {"responsible_user_id": pm.id})
+
+    await run_job_chunks(job.id)
+    # A redelivered message finds the job finished and leaves it alone
+    await run_job_chunks(job.id)
+
+    job = await JobsDAO.find_by_id(job.id)
+    assert (job.status, job.processed, job.total, job.attempts) == (JobStatus.SUCCEEDED, 5, 5, 1)
+    assert job.result == {"deleted": 5, "remaining": 0}
+    assert await TasksDAO.count_tasks(responsible_user_id=pm.id) == 0
+
+
+async def test_bulk_delete_job_reports_locked_rows_left(create_user, monkeypatch):
+    monkeypatch.setattr("app.jobs.handlers.settings.TASKS_DELETE_BATCH_SIZE", 2)
+    monkeypatch.setattr("app.jobs.handlers.settings.TASKS_DELETE_LOCKED_RETRIES", 2)
+    monkeypatch.setattr("app.jobs.handlers.settings.TASKS_DELETE_RETRY_PAUSE", 0)
+    monkeypatch.setattr("app.jobs.runner.settings.JOBS_CHUNK_PAUSE", 0)
+    pm = await create_user(Roles.PM)
+    tasks = [
+        await TasksDAO.add_task_and_performers(title=f"Task {number}", description="", responsible_user_id=pm.id)
+        for number in range(5)
+    ]
+    job = await JobsDAO.create_job(TasksBulkDeleteHandler.kind, {"responsible_user_id": pm.id})
+
+    # Another request holds a row lock for the whole job
+    async with async_session_maker() as session:
+        await session.execute(select(Tasks.id).where(Tasks.id == tasks[2].id).with_for_update())
+        await run_job_chunks(job.id)
+        await session.rollback()
+
+    job = await JobsDAO.find_by_id(job.id)
+    assert (job.status, job.processed, job.total) == (JobStatus.SUCCEEDED, 4, 5)
+    assert job.result == {"deleted": 4, "remaining": 1}
+    assert await TasksDAO.count_tasks(responsible_user_id=pm.id) == 1
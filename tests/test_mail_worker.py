@@ -0,0 +1,65 @@
+import orjson
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from app.config import settings
+from app.services.mail_worker import MailSinkSender, MailWorker, processing_queue_name
+from app.services.send_email.sink import MailSink
+
+
+@pytest.fixture(scope="module")
+def database():
+    """No database needed, the queue lives in a fake Redis."""
+
+
+@pytest.fixture
+def clean_tables():
+    """Nothing to clean."""
+
+
+@pytest.fixture
+def sink(tmp_path):
+    sink = MailSink(tmp_path / "mail.sqlite3")
+    yield sink
+    sink.close()
+
+
+def job(number: int) -> bytes:
+    return orjson.dumps({
+        "id": f"job{number}",
+        "email_to": f"user{number}@example.com",
+        "task_data": {
+            "id": number,
+            "title": f"Task {number}",
+            "status": "completed",
+            "updated_at": "2026-01-01T00:00:00Z",
+            "responsible_user": {"name": f"User{number}"},
+        },
+        "attempts": 0,
+    })
+
+
+async def test_stale_processing_lists_are_requeued(sink):
+    redis = FakeAsyncRedis()
+    crashed, alive = MailWorker(redis, MailSinkSender(sink)), MailWorker(redis, MailSinkSender(sink))
+    await redis.rpush(crashed.processing_queue, job(1), job(2))
+    await redis.rpush(alive.processing_queue, job(3))
+    await alive.beat()
+
+    worker = MailWorker(redis, MailSinkSender(sink))
+
+    assert await worker.reclaim_stale() == 2
+    assert await redis.lrange(settings.NOTIFICATIONS_QUEUE, 0, -1) == [job(1), job(2)]
+    assert await redis.llen(alive.processing_queue) == 1
+    assert await redis.exists(processing_queue_name(crashed.worker_id)) == 0
+
+
+async def test_debug_sends_go_to_the_mail_sink(sink):
+    redis = FakeAsyncRedis()
+    worker = MailWorker(redis, MailSinkSender(sink))
+    await redis.rpush(settings.NOTIFICATIONS_QUEUE, job(1), job(2))
+
+    assert await worker.process(await worker.next_batch()) == 2
+
+    assert [message["email_to"] for message in sink.messages()] == ["user1@example.com", "user2@example.com"]
+    assert await redis.llen(worker.processing_queue) == 0
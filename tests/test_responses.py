@@ -0,0 +1,21 @@
+import json
+
+from app.responses import ORJSONResponse
+from app.tasks.dao import TasksDAO
+from app.tasks.fields import TASK_FIELDS
+from app.tasks.helpers import serialize_task, task_response_adapter
+from app.users.models import Roles
+
+
+async def test_task_response_matches_pydantic_json(create_user):
+    pm, dev = await create_user(Roles.PM), await create_user()
+    created = await TasksDAO.add_task_and_performers(
+        title="Task", description="", responsible_user_id=pm.id, performers=[dev.id]
+    )
+    task = await TasksDAO.find_task_by_id_join_performers(created.id, fields=TASK_FIELDS)
+
+    body = ORJSONResponse(serialize_task(task)).body
+    expected = task_response_adapter.dump_json(task_response_adapter.validate_python(task, from_attributes=True))
+
+    assert json.loads(body) == json.loads(expected)
+    assert json.loads(body)["created_at"].endswith("Z")
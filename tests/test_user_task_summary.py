@@ -0,0 +1,182 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, select
+
+from app.database import async_session_maker
+from app.tasks.dao import TasksDAO, UserTaskSummaryDAO
+from app.tasks.models import TaskPriority, TaskStats, TaskStatus, task_performers
+from app.users.dao import UsersDAO
+from app.users.models import Roles
+
+EMPTY = {
+    "responsible_todo": 0,
+    "responsible_in_progress": 0,
+    "responsible_completed": 0,
+    "performer_todo": 0,
+    "performer_in_progress": 0,
+    "performer_completed": 0,
+}
+
+
+async def summary_of(user_id: int) -> Optional[dict]:
+    """The counters of a user's `user_task_summary` row, None without a row."""
+    summary = await UserTaskSummaryDAO.find_one_or_none(user_id=user_id)
+    if summary is None:
+        return None
+    return {column: getattr(summary, column) for column in EMPTY}
+
+
+async def task_stats() -> list:
+    """The non-zero `task_stats` counters as (status, priority, count), in enum order."""
+    async with async_session_maker() as session:
+        rows = (await session.execute(
+            select(TaskStats.status, TaskStats.priority, TaskStats.tasks_count)
+            .where(TaskStats.tasks_count != 0)
+            .order_by(TaskStats.status, TaskStats.priority)
+        )).all()
+    return [tuple(row) for row in rows]
+
+
+async def add_task(title: str, responsible_user_id: int, performers: list[int], **data):
+    return await TasksDAO.add_task_and_performers(
+        title=title,
+        description="",
+        responsible_user_id=responsible_user_id,
+        performers=performers,
+        **data
+    )
+
+
+async def test_create_counts_responsible_user_and_performers(create_user):
+    pm, dev, qa = await create_user(Roles.PM), await create_user(), await create_user(Roles.QA)
+
+    await add_task("First", pm.id, [dev.id, qa.id])
+    await add_task("Second", pm.id, [dev.id], status=TaskStatus.IN_PROGRESS)
+
+    assert await summary_of(pm.id) == {**EMPTY, "responsible_todo": 1, "responsible_in_progress": 1}
+    assert await summary_of(dev.id) == {**EMPTY, "performer_todo": 1, "performer_in_progress": 1}
+    assert await summary_of(qa.id) == {**EMPTY, "performer_todo": 1}
+
+
+async def test_status_change_moves_every_counter(create_user):
+    pm, dev = await create_user(Roles.PM), await create_user()
+    task = await add_task("Task", pm.id, [dev.id])
+
+    await TasksDAO.update_task_and_performers(task.id, status=TaskStatus.COMPLETED)
+
+    assert await summary_of(pm.id) == {**EMPTY, "responsible_completed": 1}
+    assert await summary_of(dev.id) == {**EMPTY, "performer_completed": 1}
+
+
+async def test_responsible_user_change(create_user):
+    pm, other_pm = await create_user(Roles.PM), await create_user(Roles.PM)
+    task = await add_task("Task", pm.id, [])
+
+    await TasksDAO.update_task_and_performers(task.id, responsible_user_id=other_pm.id)
+
+    assert await summary_of(pm.id) == EMPTY
+    assert await summary_of(other_pm.id) == {**EMPTY, "responsible_todo": 1}
+
+
+async def test_performer_add_and_remove(create_user):
+    pm, dev, qa = await create_user(Roles.PM), await create_user(), await create_user(Roles.QA)
+    task = await add_task("Task", pm.id, [dev.id])
+
+    # Replacing the performers removes `dev` and adds `qa`
+    await TasksDAO.update_task_and_performers(task.id, performers=[qa.id])
+
+    assert await summary_of(dev.id) == EMPTY
+    assert await summary_of(qa.id) == {**EMPTY, "performer_todo": 1}
+
+    async with async_session_maker() as session:
+        await session.execute(delete(task_performers).where(task_performers.c.user_id == qa.id))
+        await session.commit()
+
+    assert await summary_of(qa.id) == EMPTY
+    assert await summary_of(pm.id) == {**EMPTY, "responsible_todo": 1}
+
+
+async def test_task_delete(create_user):
+    pm, dev = await create_user(Roles.PM), await create_user()
+    task = await add_task("Task", pm.id, [dev.id], status=TaskStatus.IN_PROGRESS)
+    await add_task("Kept", pm.id, [dev.id])
+
+    await TasksDAO.delete(task.id)
+
+    assert await summary_of(pm.id) == {**EMPTY, "responsible_todo": 1}
+    assert await summary_of(dev.id) == {**EMPTY, "performer_todo": 1}
+
+
+async def test_bulk_delete(create_user):
+    pm, dev = await create_user(Roles.PM), await create_user()
+    for number in range(5):
+        await add_task(f"Task {number}", pm.id, [dev.id])
+
+    deleted, remaining = await TasksDAO.delete_tasks_in_batches(2, responsible_user_id=pm.id)
+
+    assert (deleted, remaining) == (5, 0)
+    assert await summary_of(pm.id) == EMPTY
+    assert await summary_of(dev.id) == EMPTY
+
+
+async def test_performer_delete_keeps_other_counters(create_user):
+    pm, dev = await create_user(Roles.PM), await create_user()
+    await add_task("Task", pm.id, [dev.id])
+    await add_task("Other task", pm.id, [dev.id])
+
+    await UsersDAO.delete(dev.id)
+
+    assert await summary_of(dev.id) is None
+    assert await summary_of(pm.id) == {**EMPTY, "responsible_todo": 2}
+
+
+async def test_responsible_user_delete(create_user):
+    pm, dev = await create_user(Roles.PM), await create_user()
+    await add_task("Task", pm.id, [dev.id])
+    await add_task("Other task", pm.id, [dev.id], status=TaskStatus.IN_PROGRESS)
+
+    # The user's tasks go through the cascade, which must not recreate the deleted user's row
+    await UsersDAO.delete(pm.id)
+
+    assert await summary_of(pm.id) is None
+    assert await summary_of(dev.id) == EMPTY
+
+
+async def archive_completed(create_user):
+    pm, dev = await create_user(Roles.PM), await create_user()
+    await add_task("Done", pm.id, [dev.id], status=TaskStatus.COMPLETED)
+    await add_task("Open", pm.id, [dev.id])
+    assert await TasksDAO.archive_completed_batch(datetime.now(timezone.utc) + timedelta(seconds=1), 100) == 1
+    return pm, dev
+
+
+async def test_archived_tasks_stay_counted(create_user):
+    pm, dev = await archive_completed(create_user)
+
+    assert await summary_of(pm.id) == {**EMPTY, "responsible_todo": 1, "responsible_completed": 1}
+    assert await summary_of(dev.id) == {**EMPTY, "performer_todo": 1, "performer_completed": 1}
+    assert await task_stats() == [
+        (TaskStatus.TODO, TaskPriority.MEDIUM, 1),
+        (TaskStatus.COMPLETED, TaskPriority.MEDIUM, 1),
+    ]
+
+
+async def test_archived_tasks_leave_the_counters_with_their_users(create_user):
+    pm, dev = await archive_completed(create_user)
+
+    # The archived task goes with its responsible user, and with it the performer's count
+    await UsersDAO.delete(pm.id)
+
+    assert await summary_of(dev.id) == EMPTY
+    assert await task_stats() == []
+
+
+async def test_task_stats_follow_task_writes(create_user):
+    pm = await create_user(Roles.PM)
+    first = await add_task("First", pm.id, [], priority=TaskPriority.HIGH)
+    await add_task("Second", pm.id, [], priority=TaskPriority.HIGH)
+    await TasksDAO.update_task_and_performers(first.id, status=TaskStatus.IN_PROGRESS)
+    await TasksDAO.delete_tasks_in_batches(10, ids=[first.id])
+
+    assert await task_stats() == [(TaskStatus.TODO, TaskPriority.HIGH, 1)]